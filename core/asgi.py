@@ -14,3 +14,11 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_asgi_application()
+
+# Open the pooled database connections of each worker as it starts its first request, not
+# here: a server importing this module before forking (gunicorn --preload) would share them
+from django.core.signals import request_started  # noqa: E402
+from ledger import pool  # noqa: E402
+
+if pool.get_options()["ENABLED"]:
+    request_started.connect(pool.warm_up_worker)
@@ -64,6 +64,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'ledger.middleware.QueryMetricsMiddleware',
+    'ledger.middleware.ReplicaPinningMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -89,13 +91,115 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
+        'ledger.authentication.ApiKeyAuthentication',
         'rest_framework.authentication.BasicAuthentication',
         'rest_framework.authentication.SessionAuthentication',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'ledger.renderers.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 LOGIN_REDIRECT_URL = '/api/deposit/'
 
+# Row locking for transfers, see ledger.posting.transfer
+LEDGER_TRANSFER_LOCKING = {
+    "NOWAIT": env.bool("LEDGER_LOCK_NOWAIT", default=False),
+    "SKIP_LOCKED": env.bool("LEDGER_LOCK_SKIP_LOCKED", default=False),
+    "RETRIES": env.int("LEDGER_LOCK_RETRIES", default=3),
+    "BACKOFF": env.float("LEDGER_LOCK_BACKOFF", default=0.005),
+}
+
+# Operations per database transaction for /api/batch/, see ledger.batch
+LEDGER_BATCH_CHUNK_SIZE = env.int("LEDGER_BATCH_CHUNK_SIZE", default=1000)
+
+# Account name resolution cache, see ledger.cache
+LEDGER_ACCOUNT_CACHE = {
+    "MAXSIZE": env.int("LEDGER_ACCOUNT_CACHE_MAXSIZE", default=10000),
+    "TTL": env.int("LEDGER_ACCOUNT_CACHE_TTL", default=60),
+    "BACKEND": env.str("LEDGER_ACCOUNT_CACHE_BACKEND", default=None),
+}
+
+# Threads running database work for the async views, see ledger.async_views. Each holds a
+# connection while it runs, so with LEDGER_DB_POOL they are capped at the pool's MAX_SIZE
+LEDGER_ASYNC_DB_WORKERS = env.int("LEDGER_ASYNC_DB_WORKERS", default=8)
+
+# Idempotency-Key handling for the posting views, see ledger.idempotency
+LEDGER_IDEMPOTENCY = {
+    "TTL": env.int("LEDGER_IDEMPOTENCY_TTL", default=24 * 60 * 60),
+    "LOCAL_MAXSIZE": env.int("LEDGER_IDEMPOTENCY_LOCAL_MAXSIZE", default=10000),
+    "LOCAL_TTL": env.int("LEDGER_IDEMPOTENCY_LOCAL_TTL", default=5 * 60),
+}
+
+# Write-behind posting queue sharing one commit between requests, see ledger.group_commit
+LEDGER_GROUP_COMMIT = {
+    "ENABLED": env.bool("LEDGER_GROUP_COMMIT", default=False),
+    "BATCH_SIZE": env.int("LEDGER_GROUP_COMMIT_BATCH_SIZE", default=64),
+    "MAX_WAIT": env.float("LEDGER_GROUP_COMMIT_MAX_WAIT", default=0.002),
+    "JOURNAL_MODE": env.str("LEDGER_SQLITE_JOURNAL_MODE", default="WAL"),
+    "SYNCHRONOUS": env.str("LEDGER_SQLITE_SYNCHRONOUS", default="FULL"),
+}
+
+# Sampled per-request query and latency histograms served at /metrics, see ledger.metrics
+LEDGER_METRICS = {
+    "ENABLED": env.bool("LEDGER_METRICS", default=True),
+    "SAMPLE_RATE": env.float("LEDGER_METRICS_SAMPLE_RATE", default=0.1),
+}
+
+# Verified API key cache, see ledger.authentication. Revoking a key or deactivating its user
+# drops the key from the cache of the process that saved the change only; other processes keep
+# accepting it until their entry expires, so a revocation takes up to CACHE_TTL seconds to reach
+# every worker
+LEDGER_API_KEYS = {
+    "CACHE_MAXSIZE": env.int("LEDGER_API_KEYS_CACHE_MAXSIZE", default=10000),
+    "CACHE_TTL": env.int("LEDGER_API_KEYS_CACHE_TTL", default=60),
+}
+
+# Read replicas of every ledger database, filled in below, and how long a user's balance and
+# history reads stay on the primary after they post, see ledger.replicas
+LEDGER_REPLICAS = {
+    "DATABASES": {},
+    "STICKY_SECONDS": env.float("LEDGER_REPLICA_STICKY_SECONDS", default=5.0),
+    "BACKEND": env.str("LEDGER_REPLICA_PIN_BACKEND", default=None),
+}
+
+# Hot accounts spread their balance over slot rows, see ledger.hot and the hot_account command
+LEDGER_HOT_ACCOUNTS = {
+    "REFRESH_SECONDS": env.float("LEDGER_HOT_ACCOUNTS_REFRESH_SECONDS", default=5.0),
+}
+
+# Journal entries older than SETTLE_SECONDS are taken to be committed by the balance snapshots
+# and daily rollups, see ledger.journal.settled_entry_id. Keep it above the longest posting.
+LEDGER_JOURNAL = {
+    "SETTLE_SECONDS": env.float("LEDGER_JOURNAL_SETTLE_SECONDS", default=60.0),
+}
+
+# Transactions older than AFTER_DAYS are moved to per-month archive tables by the
+# archive_transactions command, see ledger.archive
+LEDGER_ARCHIVE = {
+    "AFTER_DAYS": env.int("LEDGER_ARCHIVE_AFTER_DAYS", default=90),
+    "BATCH_SIZE": env.int("LEDGER_ARCHIVE_BATCH_SIZE", default=1000),
+    "REFRESH_SECONDS": env.float("LEDGER_ARCHIVE_REFRESH_SECONDS", default=5.0),
+}
+
+# Per-user rate limits and a per-process concurrency limit on the posting endpoints, see
+# ledger.admission. Set LEDGER_ADMISSION_BACKEND to a cache alias shared by all processes, such as
+# a Redis cache, to count each user's postings across processes instead of per process.
+LEDGER_ADMISSION = {
+    "ENABLED": env.bool("LEDGER_ADMISSION", default=False),
+    "RATE": env.float("LEDGER_ADMISSION_RATE", default=20.0),
+    "BURST": env.int("LEDGER_ADMISSION_BURST", default=40),
+    "BACKEND": env.str("LEDGER_ADMISSION_BACKEND", default=None),
+    "MAX_CONCURRENT": env.int("LEDGER_ADMISSION_MAX_CONCURRENT", default=16),
+    "LATENCY_BUDGET": env.float("LEDGER_ADMISSION_LATENCY_BUDGET", default=0.5),
+}
+
+# Databases the ledger's accounts and transactions are sharded across by user id, see
+# ledger.sharding. Shards after the first are SQLite files next to the default database, each
+# migrated with `manage.py migrate --database shard_<n>` before use.
+LEDGER_SHARDS = ["default"] + ["shard_{}".format(index) for index in range(1, env.int("LEDGER_SHARDS", default=1))]
+
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
@@ -106,6 +210,59 @@ DATABASES = {
     }
 }
 
+for shard in LEDGER_SHARDS[1:]:
+    DATABASES[shard] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_{}.sqlite3'.format(shard),
+    }
+
+# LEDGER_READ_REPLICAS SQLite files per database stand in for replicas, see the
+# sync_replicas command. Tests read the replicas from their primary.
+for primary in list(DATABASES):
+    LEDGER_REPLICAS["DATABASES"][primary] = []
+
+    for index in range(1, env.int("LEDGER_READ_REPLICAS", default=0) + 1):
+        replica = '{}_replica_{}'.format(primary, index)
+        DATABASES[replica] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db_{}.sqlite3'.format(replica),
+            'TEST': {'MIRROR': primary},
+        }
+        LEDGER_REPLICAS["DATABASES"][primary].append(replica)
+
+# Connections are kept open for LEDGER_DB_CONN_MAX_AGE seconds by each thread, or with
+# LEDGER_DB_POOL by a bounded pool per process and database, see ledger.pool. Django 4.0 has no
+# CONN_HEALTH_CHECKS, so the pool checks the connections it hands out itself.
+LEDGER_DB_POOL = {
+    "ENABLED": env.bool("LEDGER_DB_POOL", default=False),
+    "MAX_SIZE": env.int("LEDGER_DB_POOL_MAX_SIZE", default=10),
+    "MIN_SIZE": env.int("LEDGER_DB_POOL_MIN_SIZE", default=2),
+    "TIMEOUT": env.float("LEDGER_DB_POOL_TIMEOUT", default=10.0),
+    "MAX_AGE": env.float("LEDGER_DB_POOL_MAX_AGE", default=600.0),
+    "HEALTH_CHECKS": env.bool("LEDGER_DB_POOL_HEALTH_CHECKS", default=True),
+    "HEALTH_CHECK_IDLE": env.float("LEDGER_DB_POOL_HEALTH_CHECK_IDLE", default=1.0),
+}
+
+POOLED_ENGINES = {
+    'django.db.backends.sqlite3': 'ledger.backends.sqlite3',
+    'django.db.backends.postgresql': 'ledger.backends.postgresql',
+}
+
+for database in DATABASES.values():
+    if LEDGER_DB_POOL["ENABLED"]:
+        database['ENGINE'] = POOLED_ENGINES.get(database['ENGINE'], database['ENGINE'])
+        database['CONN_MAX_AGE'] = 0
+    else:
+        database['CONN_MAX_AGE'] = env.int('LEDGER_DB_CONN_MAX_AGE', default=0)
+
+DATABASE_ROUTERS = []
+
+if len(LEDGER_SHARDS) > 1:
+    DATABASE_ROUTERS.append('ledger.sharding.ShardRouter')
+
+if any(LEDGER_REPLICAS["DATABASES"].values()):
+    DATABASE_ROUTERS.append('ledger.replicas.ReplicaRouter')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
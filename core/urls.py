@@ -15,11 +15,12 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from ledger.views import CreateUser
+from ledger.views import CreateUser, prometheus_metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("api/", include("ledger.urls")),
     path("api-auth/", include("rest_framework.urls")),
     path("api-auth/create-user/", CreateUser.as_view(), name="create-user"),
+    path("metrics", prometheus_metrics, name="metrics"),
 ]
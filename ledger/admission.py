@@ -0,0 +1,264 @@
+# Standard Library Imports
+import functools
+import math
+import threading
+import time
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import caches
+
+# Rest Framework Imports
+from rest_framework import response, status
+
+# App Imports
+from ledger.cache import LRUCache
+
+# Third Part Imports
+from rest_api_payload import error_response
+
+
+DEFAULT_ADMISSION = {
+    "ENABLED": False,
+    # Postings per second each user is allowed on average, and how many they may post at once
+    "RATE": 20.0,
+    "BURST": 40,
+    "BUCKETS_MAXSIZE": 100000,
+    # Alias of a Django cache shared between processes holding per-user counters, or None
+    "BACKEND": None,
+    # Postings running at once per process; the rest queue for up to LATENCY_BUDGET seconds
+    "MAX_CONCURRENT": 16,
+    "LATENCY_BUDGET": 0.5,
+}
+
+KEY_PREFIX = "ledger:admission:"
+
+# Weight of the latest posting in the moving average of posting times
+SERVICE_TIME_WEIGHT = 0.1
+
+
+def get_options() -> dict:
+    return {**DEFAULT_ADMISSION, **getattr(settings, "LEDGER_ADMISSION", {})}
+
+
+class AdmissionStats:
+    """
+    Counters of the postings let through, throttled and shed, and of the time they queued.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.admitted = 0
+            self.throttled = 0
+            self.queued = 0
+            self.shed = 0
+            self.shed_timeouts = 0
+            self.queue_seconds = 0.0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_queue(self, seconds:float) -> None:
+        with self._lock:
+            self.queued += 1
+            self.queue_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "admitted": self.admitted,
+                "throttled": self.throttled,
+                "queued": self.queued,
+                "shed": self.shed,
+                "shed_timeouts": self.shed_timeouts,
+                "queue_seconds": self.queue_seconds,
+            }
+
+
+stats = AdmissionStats()
+
+# Token buckets by client. An entry expires once the bucket would have refilled, which is the
+# same as a full bucket
+buckets = LRUCache(
+    maxsize=get_options()["BUCKETS_MAXSIZE"],
+    ttl=get_options()["BURST"] / get_options()["RATE"] if get_options()["RATE"] else math.inf,
+)
+buckets_lock = threading.Lock()
+
+
+def shared_cache():
+    backend = get_options()["BACKEND"]
+    return caches[backend] if backend else None
+
+
+def take_token(client:str, now:float=None) -> float:
+    """
+    > It takes a token from the client's bucket, which holds up to `BURST` tokens and gains
+    `RATE` of them per second
+
+    :param client: Whom the bucket belongs to
+    :type client: str
+    :return: 0 if a token was taken, otherwise the seconds until the next one
+    """
+    options = get_options()
+    now = time.monotonic() if now is None else now
+
+    with buckets_lock:
+        tokens, updated = buckets.get(client) or (options["BURST"], now)
+        tokens = min(options["BURST"], tokens + (now - updated) * options["RATE"])
+
+        if tokens < 1:
+            buckets.set(client, (tokens, now))
+            return (1 - tokens) / options["RATE"] if options["RATE"] else math.inf
+
+        buckets.set(client, (tokens - 1, now))
+        return 0.0
+
+
+def take_shared_token(client:str, shared, now:float=None) -> float:
+    """
+    > It counts the client's postings in the shared cache, in windows of `BURST / RATE` seconds
+    allowing `BURST` postings each: the same average rate as the bucket, kept with atomic
+    `incr` so every process sees the same count
+
+    :return: 0 if the posting is allowed, otherwise the seconds until the next window
+    """
+    options = get_options()
+    window = options["BURST"] / options["RATE"] if options["RATE"] else math.inf
+    now = time.time() if now is None else now
+    index = int(now // window) if math.isfinite(window) else 0
+    key = "{}{}:{}".format(KEY_PREFIX, client, index)
+
+    timeout = math.ceil(window) + 1 if math.isfinite(window) else None
+    shared.add(key, 0, timeout=timeout)
+
+    try:
+        count = shared.incr(key)
+    except ValueError:
+        # The key expired between add() and incr()
+        shared.add(key, 1, timeout=timeout)
+        count = 1
+
+    if count <= options["BURST"]:
+        return 0.0
+
+    return (index + 1) * window - now if math.isfinite(window) else math.inf
+
+
+def throttle(client:str) -> float:
+    shared = shared_cache()
+    return take_shared_token(client, shared) if shared is not None else take_token(client)
+
+
+class AdmissionGate:
+    """
+    A limit on the postings a process runs at once. Postings over the limit queue in arrival
+    order; one whose expected wait, from the queue ahead of it and the average posting time, is
+    over the latency budget is turned away at once, and one still queued when the budget runs
+    out is turned away then.
+    """
+
+    def __init__(self, max_concurrent:int, latency_budget:float):
+        self.max_concurrent = max_concurrent
+        self.latency_budget = latency_budget
+        self.in_flight = 0
+        self.waiting = 0
+        self.service_time = 0.0
+        self._condition = threading.Condition()
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) * self.service_time / self.max_concurrent
+
+    def enter(self) -> bool:
+        """
+        > It takes a slot, queueing for one if needed
+
+        :return: Whether the posting may run; if so, `leave` must be called once it has
+        """
+        with self._condition:
+            if self.in_flight < self.max_concurrent and not self.waiting:
+                self.in_flight += 1
+                return True
+
+            if self.expected_wait() > self.latency_budget:
+                stats.incr("shed")
+                return False
+
+            started = time.monotonic()
+            deadline = started + self.latency_budget
+            self.waiting += 1
+
+            try:
+                while self.in_flight >= self.max_concurrent:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        stats.incr("shed_timeouts")
+                        return False
+
+                    self._condition.wait(remaining)
+
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+
+        stats.record_queue(time.monotonic() - started)
+        return True
+
+    def leave(self, seconds:float) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self.service_time += SERVICE_TIME_WEIGHT * (seconds - self.service_time)
+            self._condition.notify()
+
+
+gate = AdmissionGate(max_concurrent=get_options()["MAX_CONCURRENT"], latency_budget=get_options()["LATENCY_BUDGET"])
+
+
+def rejected(message:str, status_code:int, retry_after:float) -> response.Response:
+    payload = error_response(status="error", message=message)
+    return response.Response(
+        data=payload, status=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 24 * 60 * 60))))},
+    )
+
+
+def admitted(handler):
+    """
+    > It puts a posting handler behind admission control when `LEDGER_ADMISSION` is enabled: a
+    client over its token bucket gets 429 and the process's postings over `MAX_CONCURRENT`
+    queue, with 503 once the queue would take longer than `LATENCY_BUDGET`. Both carry a
+    `Retry-After` header. Disabled, the handler runs as before
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        if not get_options()["ENABLED"]:
+            return handler(self, request, *args, **kwargs)
+
+        client = "user:{}".format(request.user.pk) if request.user.pk is not None \
+            else "ip:{}".format(request.META.get("REMOTE_ADDR"))
+        retry_after = throttle(client)
+
+        if retry_after:
+            stats.incr("throttled")
+            return rejected("Too many requests, slow down!", status.HTTP_429_TOO_MANY_REQUESTS, retry_after)
+
+        if not gate.enter():
+            return rejected(
+                "The ledger is busy, try again shortly!", status.HTTP_503_SERVICE_UNAVAILABLE, gate.latency_budget
+            )
+
+        stats.incr("admitted")
+        started = time.perf_counter()
+
+        try:
+            return handler(self, request, *args, **kwargs)
+        finally:
+            gate.leave(time.perf_counter() - started)
+
+    return wrapper
@@ -0,0 +1,271 @@
+# Standard Library Imports
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import NamedTuple
+
+# Django Imports
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import OutboxMessage, Transaction
+from ledger.sharding import ShardedQuerySet
+
+
+DEFAULT_ARCHIVE = {
+    # Transactions older than this many days are moved by the archive_transactions command
+    "AFTER_DAYS": 90,
+    # Transactions moved per database transaction
+    "BATCH_SIZE": 1000,
+    # How long a process keeps its list of archive tables before reading it again
+    "REFRESH_SECONDS": 5.0,
+}
+
+TABLE_PREFIX = Transaction._meta.db_table + "_archive_"
+TABLE_PATTERN = re.compile(r"^{}(\d{{4}})_(\d{{2}})$".format(re.escape(TABLE_PREFIX)))
+
+
+def get_options() -> dict:
+    return {**DEFAULT_ARCHIVE, **getattr(settings, "LEDGER_ARCHIVE", {})}
+
+
+class Partition(NamedTuple):
+    start: datetime
+    end: datetime
+    model: type
+
+
+# Archive tables by database alias, replicas included
+registry = LRUCache(maxsize=len(settings.DATABASES), ttl=get_options()["REFRESH_SECONDS"])
+models_lock = threading.Lock()
+archive_models = {}
+
+
+def month_start(value:datetime) -> datetime:
+    value = value.astimezone(dt_timezone.utc) if timezone.is_aware(value) else value.replace(tzinfo=dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_month(start:datetime) -> datetime:
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def table_name(start:datetime) -> str:
+    return "{}{:04d}_{:02d}".format(TABLE_PREFIX, start.year, start.month)
+
+
+def archived_field(field:models.Field) -> models.Field:
+    """
+    > It copies a field of `Transaction` for an archive table. Relations keep their columns but
+    get no constraint, index or reverse accessor, and deleting an account leaves its archived
+    transactions alone
+    """
+    _, _, args, kwargs = field.deconstruct()
+
+    if field.is_relation:
+        kwargs.update(related_name="+", db_constraint=False, db_index=False, on_delete=models.DO_NOTHING)
+
+    return field.__class__(*args, **kwargs)
+
+
+def archive_model(start:datetime) -> type:
+    """
+    > It returns the model of the archive table of the month starting at `start`, a copy of
+    `Transaction` with the same columns and history indexes. Rows keep their primary keys
+    """
+    table = table_name(start)
+
+    with models_lock:
+        model = archive_models.get(table)
+
+        if model is None:
+            suffix = "{:04d}{:02d}".format(start.year, start.month)
+            attrs = {
+                field.name: archived_field(field) for field in Transaction._meta.local_fields
+            }
+            attrs.update(
+                __module__=__name__,
+                objects=ShardedQuerySet.as_manager(),
+                Meta=type("Meta", (), {
+                    "app_label": Transaction._meta.app_label,
+                    "db_table": table,
+                    "managed": False,
+                    "indexes": [
+                        models.Index(fields=index.fields, name="tx_{}_{}".format(suffix, index.name.split("_", 1)[1]))
+                        for index in Transaction._meta.indexes
+                    ],
+                }),
+            )
+            model = archive_models[table] = type("TransactionArchive" + suffix, (models.Model,), attrs)
+
+        return model
+
+
+def partitions(using:str=None) -> list:
+    """
+    > It returns the archive tables of a shard as `Partition`s, oldest first. A table holds the
+    transactions created in `[start, end)`, in UTC. The list is read once per `REFRESH_SECONDS`
+    """
+    using = using or DEFAULT_DB_ALIAS
+    found = registry.get(using)
+
+    if found is None:
+        found = []
+
+        for table in sorted(connections[using].introspection.table_names()):
+            match = TABLE_PATTERN.match(table)
+
+            if match:
+                start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)
+                found.append(Partition(start, next_month(start), archive_model(start)))
+
+        registry.set(using, found)
+
+    return found
+
+
+def create_partition(start:datetime, using:str) -> bool:
+    """
+    > It creates the archive table of a month on a shard unless it exists
+
+    :return: Whether the table was created
+    """
+    model = archive_model(start)
+    connection = connections[using]
+
+    if model._meta.db_table in connection.introspection.table_names():
+        return False
+
+    with connection.schema_editor() as editor:
+        editor.create_model(model)
+
+        # The schema editor leaves out the indexes of unmanaged models
+        for index in model._meta.indexes:
+            editor.add_index(model, index)
+
+    registry.delete(using)
+    return True
+
+
+def archivable(cutoff:datetime, using:str):
+    """
+    > It returns the transactions of a shard created before `cutoff` that can be moved: all of
+    them but the transfers whose outbox message is still pending, which the relay still reads
+    """
+    return Transaction.objects.using(using).filter(date_created__lt=cutoff).filter(
+        ~Exists(OutboxMessage.objects.using(using).filter(
+            transaction_id=OuterRef("pk"), date_delivered__isnull=True, date_failed__isnull=True,
+        ))
+    )
+
+
+def move(by_month:dict, using:str) -> int:
+    """
+    > It copies transactions into their month's archive table and deletes them from
+    `transactions` in one atomic block, with an `INSERT ... SELECT` and a `DELETE` per month, so
+    a reader sees every transaction in exactly one of the two. Journal entries, outbox and inbox
+    messages keep pointing at the archived primary keys. A transaction another run has moved
+    already is skipped
+
+    :param by_month: The primary keys of the transactions to move by month start
+    :type by_month: dict
+    :param using: The shard
+    :type using: str
+    :return: The number of transactions moved
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(field.column) for field in Transaction._meta.concrete_fields)
+    moved = 0
+
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for start, pks in by_month.items():
+            placeholders = ", ".join(["%s"] * len(pks))
+            cursor.execute(
+                "INSERT INTO {} ({}) SELECT {} FROM {} WHERE {} IN ({})".format(
+                    quote(table_name(start)), columns, columns,
+                    quote(Transaction._meta.db_table), quote(Transaction._meta.pk.column), placeholders,
+                ),
+                pks,
+            )
+            moved += cursor.rowcount
+            cursor.execute(
+                "DELETE FROM {} WHERE {} IN ({})".format(
+                    quote(Transaction._meta.db_table), quote(Transaction._meta.pk.column), placeholders,
+                ),
+                pks,
+            )
+
+    return moved
+
+
+def archive(cutoff:datetime, batch_size:int=None, pause:float=0.0, using:str=None) -> int:
+    """
+    > It moves a shard's transactions created before `cutoff` into per-month archive tables,
+    `batch_size` of them (and one short transaction) at a time, oldest first, so `transactions`
+    and the indexes every posting writes to only hold recent history. Balances, the journal and
+    the rollups are not touched; history reads the archive tables too, see `ledger.history`.
+
+    A new archive table is created before any row is moved into it, and the first batch for it
+    waits `REFRESH_SECONDS`, so every process lists the table before its rows leave
+    `transactions`
+
+    :param cutoff: Transactions created before this are moved
+    :type cutoff: datetime
+    :param batch_size: The number of transactions moved per database transaction
+    :type batch_size: int
+    :param pause: Seconds to sleep between batches, to leave the database to postings
+    :type pause: float
+    :param using: The shard to archive
+    :type using: str
+    :return: The number of transactions moved
+    """
+    using = using or DEFAULT_DB_ALIAS
+    batch_size = batch_size or get_options()["BATCH_SIZE"]
+    moved = 0
+
+    while True:
+        # Old rows have the low primary keys, so this walks the start of the primary key index
+        # instead of needing an index on date_created that every posting would pay for
+        rows = list(archivable(cutoff, using).order_by("pk").values_list("pk", "date_created")[:batch_size])
+
+        if not rows:
+            return moved
+
+        by_month = defaultdict(list)
+
+        for pk, date_created in rows:
+            by_month[month_start(date_created)].append(pk)
+
+        created = [start for start in sorted(by_month) if create_partition(start, using)]
+
+        if created:
+            time.sleep(get_options()["REFRESH_SECONDS"])
+
+        moved += move(by_month, using)
+
+        if pause:
+            time.sleep(pause)
+
+
+def querysets(build, using:str=None, start:datetime=None, end:datetime=None, descending:bool=False) -> list:
+    """
+    > It returns a queryset per archive table of a shard, built by `build(model)`, for the
+    tables that may hold transactions created from `start` to `end`, oldest table first or
+    newest first
+    """
+    found = [
+        partition for partition in partitions(using)
+        if (start is None or partition.end > start) and (end is None or partition.start <= end)
+    ]
+
+    if descending:
+        found.reverse()
+
+    return [build(partition.model).using(using) for partition in found]
@@ -0,0 +1,194 @@
+# Standard Library Imports
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Django Imports
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpRequest, JsonResponse
+from django.utils.cache import get_conditional_response
+
+# Rest Framework Imports
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotAuthenticated
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+# App Imports
+from ledger.models import Account, UserSummary
+from ledger.serializers import FastAccountSerializer
+from ledger.sharding import shard_for_user
+from ledger.views import Deposit, Withdraw, AccountToAccountTransfer, AccountToUserTransfer, balance_etag
+from ledger import hot, metrics, pool, replicas
+
+# Third Part Imports
+from rest_api_payload import success_response, error_response
+
+
+def db_workers() -> int:
+    """
+    > It returns the number of database worker threads: `LEDGER_ASYNC_DB_WORKERS`, capped at the
+    pool's `MAX_SIZE` when connections are pooled. Every worker holds a connection while it runs,
+    so workers past the pool size would only queue for one and risk a `PoolTimeout`
+    """
+    workers = getattr(settings, "LEDGER_ASYNC_DB_WORKERS", 8)
+    options = pool.get_options()
+    return min(workers, options["MAX_SIZE"]) if options["ENABLED"] else workers
+
+
+DB_WORKERS = db_workers()
+
+# Django 4.0 has no async ORM, so database work runs on this bounded pool instead of the single
+# thread asgiref uses for thread-sensitive sync code. With 0 workers it falls back to that thread.
+executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="ledger-db") if DB_WORKERS else None
+
+
+def in_sample(func, *args, **kwargs):
+    # The request's metrics sample, when it has one, counts the queries run on this thread
+    with metrics.count_queries(metrics.current.get()):
+        return func(*args, **kwargs)
+
+
+def in_db_thread(func, *args, **kwargs):
+    close_old_connections()
+
+    try:
+        return in_sample(func, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    > It awaits a synchronous function that touches the database without blocking the event loop
+    """
+    if executor is None:
+        return await sync_to_async(in_sample, thread_sensitive=True)(func, *args, **kwargs)
+
+    # Unlike `sync_to_async`, `run_in_executor` does not carry the context over to the worker
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor, functools.partial(contextvars.copy_context().run, in_db_thread, func, *args, **kwargs)
+    )
+
+
+def authenticate(request:HttpRequest):
+    """
+    > It runs the configured DRF authentication classes, raising `NotAuthenticated` for anonymous
+    requests, and returns the user
+    """
+    user = Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    ).user
+
+    if not user.is_authenticated:
+        raise NotAuthenticated()
+
+    return user
+
+
+def api_error(error:APIException) -> JsonResponse:
+    payload = error_response(status="error", message=str(error.detail))
+    return JsonResponse(payload, status=error.status_code)
+
+
+def load_user_balance(request:HttpRequest) -> tuple:
+    user = authenticate(request)
+    using = replicas.read_db(shard_for_user(user.pk), user.pk)
+    balance = UserSummary.objects.using(using).filter(user=user).values_list("balance", flat=True).first()
+
+    if balance is not None:
+        balance += hot.user_slot_balance(user.pk, using=using)
+
+    return user, balance
+
+
+def load_account(request:HttpRequest, name:str) -> tuple:
+    user = authenticate(request)
+    using = replicas.read_db(shard_for_user(user.pk), user.pk)
+    account = Account.objects.using(using).filter(name=name, user=user).only("id", "name", "available_amount").first()
+
+    if account is not None:
+        account.available_amount = hot.account_balance(account, using=using)
+
+    return user, account
+
+
+async def get_user_balance(request:HttpRequest) -> JsonResponse:
+    """
+    > The async counterpart of `GetUserBalance`: one hop to the database pool to authenticate and
+    read the user's `UserSummary`, with the ETag check and rendering done on the event loop
+    """
+    try:
+        user, balance = await run_db(load_user_balance, request)
+    except APIException as error:
+        return api_error(error)
+
+    etag = balance_etag(user.pk, balance)
+    not_modified = get_conditional_response(request, etag=etag)
+
+    if not_modified is not None:
+        not_modified["ETag"] = etag
+        return not_modified
+
+    payload = success_response(
+        status="success",
+        message="Your total balance is ₦{}".format(balance),
+        data={}
+    )
+    return JsonResponse(payload, status=status.HTTP_202_ACCEPTED, headers={"ETag": etag})
+
+
+async def get_account_balance(request:HttpRequest, name:str) -> JsonResponse:
+    """
+    > The async counterpart of `GetAccountBalance`
+    """
+    try:
+        user, account = await run_db(load_account, request, name)
+    except APIException as error:
+        return api_error(error)
+
+    if account is None:
+        payload = error_response(status="error", message="Opps. Account does not exist!")
+        return JsonResponse(payload, status=status.HTTP_400_BAD_REQUEST)
+
+    payload = success_response(
+        status="success",
+        message="You have ₦{} in your wallet.".format(account.available_amount),
+        data=FastAccountSerializer(account).data
+    )
+    return JsonResponse(payload, status=status.HTTP_202_ACCEPTED)
+
+
+def render_view(view, request:HttpRequest, *args, **kwargs):
+    response = view(request, *args, **kwargs)
+
+    if hasattr(response, "render"):
+        response.render()
+
+    return response
+
+
+def async_posting_view(view_class):
+    """
+    > It wraps a posting view so the whole DRF pipeline (authentication, validation, the posting
+    transaction and rendering) runs as one job on the database pool, while the event loop only
+    awaits it. Postings behave exactly like their synchronous endpoints
+    """
+    view = view_class.as_view()
+
+    async def posting_view(request:HttpRequest, *args, **kwargs):
+        return await run_db(render_view, view, request, *args, **kwargs)
+
+    # DRF enforces CSRF itself for session-authenticated requests
+    posting_view.csrf_exempt = True
+    return posting_view
+
+
+deposit = async_posting_view(Deposit)
+withdraw = async_posting_view(Withdraw)
+account_to_account_transfer = async_posting_view(AccountToAccountTransfer)
+account_to_user_transfer = async_posting_view(AccountToUserTransfer)
@@ -0,0 +1,187 @@
+# Standard Library Imports
+import hashlib
+import hmac
+import secrets
+import threading
+
+# Django Imports
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import ApiKey
+
+
+KEYWORD = "ApiKey"
+
+DEFAULT_API_KEYS = {
+    "CACHE_MAXSIZE": 10000,
+    "CACHE_TTL": 60,
+}
+
+# Stats figures that describe the current state rather than count events
+GAUGES = ("size",)
+
+# The user fields loaded with a key, in model order as `User.from_db` expects; anything else is
+# read from the database on first access
+USER_FIELDS = ("id", "is_superuser", "username", "is_staff", "is_active")
+
+
+def get_options() -> dict:
+    return {**DEFAULT_API_KEYS, **getattr(settings, "LEDGER_API_KEYS", {})}
+
+
+class ApiKeyStats:
+    """
+    Hit/miss counters for the verified key cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.failures = 0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "failures": self.failures, "size": len(local)}
+
+
+stats = ApiKeyStats()
+
+# Verified keys by prefix, as `(digest, expires_at, user field values)`
+local = LRUCache(maxsize=get_options()["CACHE_MAXSIZE"], ttl=get_options()["CACHE_TTL"])
+
+# The prefixes cached for each user, so a change to the user finds their keys without a query
+user_prefixes = LRUCache(maxsize=get_options()["CACHE_MAXSIZE"], ttl=get_options()["CACHE_TTL"])
+user_prefixes_lock = threading.Lock()
+
+
+def make_digest(key:str) -> str:
+    # Keys are 256 random bits, so a fast hash is enough; there is nothing to brute force
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def generate(user:User, name:str="", expires_at=None) -> tuple:
+    """
+    > It creates an API key for `user` and returns it with the plain key, which is not stored and
+    cannot be shown again
+
+    :param user: The owner of the key
+    :type user: User
+    :param name: A label for the key
+    :type name: str
+    :param expires_at: When the key stops working, never if not given
+    :return: The `ApiKey` row and the key to send as `Authorization: ApiKey <key>`
+    """
+    prefix = secrets.token_hex(6)
+    key = "{}.{}".format(prefix, secrets.token_urlsafe(32))
+    api_key = ApiKey.objects.create(
+        user=user, name=name, prefix=prefix, digest=make_digest(key), expires_at=expires_at
+    )
+    return api_key, key
+
+
+def invalidate(prefix:str) -> None:
+    local.delete(prefix)
+
+
+def invalidate_user(user:User) -> None:
+    """
+    > It drops the cached keys of a user whose cached fields no longer match the saved user, as
+    when they are deactivated, without a query. Saves that change none of `USER_FIELDS`, like
+    the `last_login` update of every login, leave the keys cached
+
+    :param user: The saved user
+    :type user: User
+    """
+    # A deferred field is missing from __dict__, so it never matches and the keys are dropped
+    values = tuple(user.__dict__.get(field) for field in USER_FIELDS)
+
+    for prefix in user_prefixes.get(user.pk) or ():
+        entry = local.get(prefix)
+
+        if entry is not None and entry[2] != values:
+            local.delete(prefix)
+
+
+def load(prefix:str):
+    entry = local.get(prefix)
+
+    if entry is not None:
+        stats.incr("hits")
+        return entry
+
+    stats.incr("misses")
+    row = ApiKey.objects.filter(prefix=prefix, revoked=False)\
+        .values_list("digest", "expires_at", *("user__{}".format(field) for field in USER_FIELDS)).first()
+
+    if row is None:
+        return None
+
+    entry = (row[0], row[1], row[2:])
+    local.set(prefix, entry)
+
+    with user_prefixes_lock:
+        user_prefixes.set(entry[2][0], (user_prefixes.get(entry[2][0]) or frozenset()) | {prefix})
+
+    return entry
+
+
+class ApiKeyAuthentication(BaseAuthentication):
+    """
+    Authenticates `Authorization: ApiKey <prefix>.<secret>` headers. Verified keys are cached in
+    process by prefix, so a warm request costs one sha256 and no query, instead of the password
+    hasher of basic auth or the session and user lookups of session auth.
+    """
+    keyword = KEYWORD
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid API key header.")
+
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Invalid API key header.")
+
+        entry = load(key.partition(".")[0])
+
+        if entry is None or not hmac.compare_digest(entry[0], make_digest(key)):
+            stats.incr("failures")
+            raise exceptions.AuthenticationFailed("Invalid API key.")
+
+        digest, expires_at, values = entry
+
+        if expires_at is not None and expires_at <= timezone.now():
+            raise exceptions.AuthenticationFailed("API key has expired.")
+
+        # A fresh instance per request, so no two requests share a mutable user
+        user = User.from_db(None, USER_FIELDS, values)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+
+        return user, None
+
+    def authenticate_header(self, request) -> str:
+        return self.keyword
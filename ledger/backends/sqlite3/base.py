@@ -0,0 +1,11 @@
+# Django Imports
+from django.db.backends.sqlite3 import base
+
+# App Imports
+from ledger.pool import PooledDatabaseWrapper
+
+
+class DatabaseWrapper(PooledDatabaseWrapper, base.DatabaseWrapper):
+    """
+    The SQLite backend, with its connections kept in `ledger.pool`.
+    """
@@ -0,0 +1,178 @@
+# Standard Library Imports
+import functools
+from collections import defaultdict
+from decimal import Decimal
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+
+# App Imports
+from ledger.models import Account, JournalEntry, OutboxMessage, Transaction
+from ledger.sharding import get_shards, shard_for_id, shard_for_user
+from ledger import outbox, posting
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def resolve_accounts(names:list, chunk_size:int=DEFAULT_CHUNK_SIZE) -> dict:
+    """
+    > It looks up every account name with one query per `chunk_size` names and shard
+
+    :param names: The account names to resolve
+    :type names: list
+    :param chunk_size: The number of names per query
+    :type chunk_size: int
+    :return: A dictionary of account name to `(account pk, user pk)`
+    """
+    names = sorted(set(names))
+    accounts = {}
+
+    for shard in get_shards():
+        for start in range(0, len(names), chunk_size):
+            accounts.update(
+                (name, (pk, user_id))
+                for name, pk, user_id in Account.objects.using(shard).filter(
+                    name__in=names[start:start + chunk_size]
+                ).values_list("name", "pk", "user_id")
+            )
+
+    return accounts
+
+
+def journal_entries(created:Transaction) -> list:
+    if created.type == "transfer" and shard_for_id(created.to_account_id) != created._state.db:
+        # The receiver is credited on its own shard, see ledger.outbox
+        changes = [(created.account_id, -created.amount)]
+    elif created.type == "transfer":
+        changes = [(created.account_id, -created.amount), (created.to_account_id, created.amount)]
+    else:
+        changes = [(created.account_id, created.amount if created.type == "deposit" else -created.amount)]
+
+    return JournalEntry.entries_for(changes, transaction_id=created.pk)
+
+
+def post_chunk(user, operations:list, accounts:dict, offset:int=0, batch_size:int=None) -> list:
+    """
+    > It nets the balance changes of a chunk of operations per account and applies them, together
+    with one `Transaction` row and its journal entries per operation, inside one atomic block on
+    the user's shard. Transfers to another shard also get an outbox message, delivered after commit
+
+    :param user: The user posting the operations, who must own every sending account. With `None`,
+    each operation is posted on behalf of its sending account's owner, and all of them must be on
+    the shard of the first one
+    :param operations: Validated `BatchOperationSerializer` data
+    :type operations: list
+    :param accounts: Resolved accounts, as returned by `resolve_accounts`
+    :type accounts: dict
+    :param offset: The index of the first operation of the chunk within the batch
+    :type offset: int
+    :param batch_size: The number of rows per bulk statement
+    :type batch_size: int
+    :return: One result per operation
+    """
+    if user is not None:
+        using = shard_for_user(user.pk)
+    else:
+        first = accounts.get(operations[0]["account"]) if operations else None
+        using = shard_for_user(first[1] if first else None)
+
+    deltas = defaultdict(Decimal)
+    transactions = []
+    results = []
+
+    for index, operation in enumerate(operations, start=offset):
+        account = accounts.get(operation["account"])
+        to_account = accounts.get(operation.get("to_account"))
+        amount = operation["amount"]
+
+        if account is None or (user is not None and account[1] != user.pk) or \
+                (operation["type"] == "transfer" and to_account is None):
+            results.append({"index": index, "status": "error", "message": "Opps. Account does not exist!"})
+            continue
+
+        user_id = account[1]
+
+        if operation["type"] == "deposit":
+            deltas[account[0]] += amount
+            transactions.append(
+                Transaction(account_id=account[0], user_id=user_id, amount=amount, type="deposit")
+            )
+
+        elif operation["type"] == "withdraw":
+            deltas[account[0]] -= amount
+            transactions.append(
+                Transaction(account_id=account[0], user_id=user_id, amount=amount, type="withdraw")
+            )
+
+        else:
+            deltas[account[0]] -= amount
+
+            if shard_for_id(to_account[0]) == using:
+                deltas[to_account[0]] += amount
+
+            transactions.append(
+                Transaction(
+                    account_id=account[0], to_account_id=to_account[0],
+                    user_id=user_id, to_user_id=to_account[1],
+                    amount=amount, type="transfer"
+                )
+            )
+
+        results.append({"index": index, "status": "success", "message": None})
+
+    if transactions:
+        with transaction.atomic(using=using):
+            posting.post_deltas(deltas, batch_size=batch_size, using=using)
+            Transaction.objects.using(using).bulk_create(transactions, batch_size=batch_size)
+            JournalEntry.objects.using(using).bulk_create(
+                [entry for created in transactions for entry in journal_entries(created)],
+                batch_size=batch_size,
+            )
+            messages = OutboxMessage.objects.using(using).bulk_create([
+                OutboxMessage(transaction=created, destination=shard_for_id(created.to_account_id))
+                for created in transactions
+                if created.type == "transfer" and shard_for_id(created.to_account_id) != using
+            ], batch_size=batch_size)
+
+            for message in messages:
+                transaction.on_commit(functools.partial(outbox.deliver_pending, using, message.pk), using=using)
+
+    created = iter(transactions)
+
+    for result in results:
+        result["id"] = next(created).pk if result["status"] == "success" else None
+
+    return results
+
+
+def post_batch(user, operations:list, chunk_size:int=None) -> list:
+    """
+    > It resolves every account name of the batch up front, then posts the operations one chunk
+    (and one transaction) at a time so locks are never held for the whole batch
+
+    :param user: The user posting the operations
+    :param operations: Validated `BatchOperationSerializer` data
+    :type operations: list
+    :param chunk_size: The number of operations per database transaction
+    :type chunk_size: int
+    :return: One result per operation, in submission order
+    """
+    chunk_size = chunk_size or getattr(settings, "LEDGER_BATCH_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    accounts = resolve_accounts(
+        [operation["account"] for operation in operations] +
+        [operation["to_account"] for operation in operations if operation.get("to_account")],
+        chunk_size=chunk_size,
+    )
+    results = []
+
+    for start in range(0, len(operations), chunk_size):
+        results.extend(
+            post_chunk(
+                user, operations[start:start + chunk_size], accounts,
+                offset=start, batch_size=chunk_size,
+            )
+        )
+
+    return results
@@ -0,0 +1,104 @@
+# Standard Library Imports
+import statistics
+import time
+
+# Django Imports
+from django.core.signals import request_started
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(latencies:list, fraction:float) -> float:
+    latencies = sorted(latencies)
+    return latencies[int(fraction * (len(latencies) - 1))]
+
+
+class Benchmark:
+    """
+    A small stand-in for the pytest-benchmark `benchmark` fixture: it calls a function a number of
+    rounds after some warm-up rounds and keeps the latency and query count of every round.
+    """
+
+    def __init__(self, name:str, **extra):
+        self.name = name
+        self.extra = extra
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def __call__(self, function, *args, **kwargs):
+        return self.pedantic(function, args=args, kwargs=kwargs)
+
+    def pedantic(self, function, args:tuple=(), kwargs:dict=None, rounds:int=1, warmup_rounds:int=0):
+        """
+        > It calls `function` `warmup_rounds` times without measuring, then `rounds` times while
+        recording each call's latency and the queries it ran. A call returning False counts as an
+        error
+
+        :param function: The operation to measure
+        :param rounds: The number of measured calls
+        :type rounds: int
+        :param warmup_rounds: The number of calls made before measuring
+        :type warmup_rounds: int
+        :return: The result of the last call
+        """
+        kwargs = kwargs or {}
+        result = None
+
+        for _ in range(warmup_rounds):
+            function(*args, **kwargs)
+
+        # The test client resets the query log at the start of every request
+        request_started.disconnect(reset_queries)
+
+        try:
+            for _ in range(rounds):
+                # The query log is a bounded deque, so a full log would make every count zero
+                reset_queries()
+
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    result = function(*args, **kwargs)
+                    latency = time.perf_counter() - started
+
+                self.latencies.append(latency)
+                self.queries.append(len(queries))
+                self.elapsed += latency
+                self.errors += int(result is False)
+        finally:
+            request_started.connect(reset_queries)
+
+        return result
+
+    @classmethod
+    def combine(cls, name:str, benchmarks, **extra):
+        combined = cls(name, **extra)
+
+        for benchmark in benchmarks:
+            combined.latencies.extend(benchmark.latencies)
+            combined.queries.extend(benchmark.queries)
+            combined.errors += benchmark.errors
+            combined.elapsed += benchmark.elapsed
+
+        return combined
+
+    @property
+    def stats(self) -> dict:
+        if not self.latencies:
+            return {"name": self.name, **self.extra, "rounds": 0}
+
+        return {
+            "name": self.name,
+            **self.extra,
+            "rounds": len(self.latencies),
+            "errors": self.errors,
+            "requests_per_second": len(self.latencies) / self.elapsed if self.elapsed else 0.0,
+            "mean_ms": statistics.fmean(self.latencies) * 1e3,
+            "min_ms": min(self.latencies) * 1e3,
+            "p50_ms": percentile(self.latencies, 0.5) * 1e3,
+            "p99_ms": percentile(self.latencies, 0.99) * 1e3,
+            "max_ms": max(self.latencies) * 1e3,
+            "queries_per_request": statistics.fmean(self.queries),
+            "max_queries": max(self.queries),
+        }
@@ -0,0 +1,197 @@
+# Standard Library Imports
+import base64
+import random
+from decimal import Decimal
+from typing import NamedTuple
+
+# Django Imports
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import Client, override_settings
+
+# Rest Framework Imports
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+# App Imports
+from ledger.models import Account
+from ledger.serializers import UserSerializer
+from ledger import authentication, views
+
+
+OPERATIONS = ("deposit", "withdraw", "account_transfer", "user_transfer")
+DEFAULT_MIX = {"deposit": 4, "withdraw": 2, "account_transfer": 2, "user_transfer": 2}
+OPENING_BALANCE = Decimal("1000000.00")
+AMOUNT = "1.00"
+
+
+class Request(NamedTuple):
+    operation: str
+    user: User
+    view: type
+    path: str
+    data: dict
+    kwargs: dict
+
+
+def parse_mix(value:str) -> dict:
+    """
+    > It parses a mix such as "deposit=4,withdraw=1" into operation weights
+
+    :param value: Comma separated `operation=weight` pairs
+    :type value: str
+    :return: The weight of each operation
+    """
+    mix = {}
+
+    for pair in filter(None, value.split(",")):
+        operation, _, weight = pair.partition("=")
+
+        if operation.strip() not in OPERATIONS:
+            raise ValueError("Unknown operation {!r}, expected one of {}.".format(operation, ", ".join(OPERATIONS)))
+
+        mix[operation.strip()] = int(weight or 1)
+
+    return mix
+
+
+def seed(users:int, accounts_per_user:int, prefix:str="bench", fast_passwords:bool=True) -> list:
+    """
+    > It creates `users` users through `UserSerializer`, each with `accounts_per_user` accounts
+    holding `OPENING_BALANCE`. Every password is the username, hashed with a fast hasher unless
+    `fast_passwords` is off, for benchmarks of basic authentication
+
+    :param users: The number of users to create
+    :type users: int
+    :param accounts_per_user: The number of accounts per user
+    :type accounts_per_user: int
+    :param prefix: The prefix of the usernames and account names
+    :type prefix: str
+    :param fast_passwords: Hash the passwords with MD5 instead of the configured hasher
+    :type fast_passwords: bool
+    :return: A list of `(user, accounts)` tuples
+    """
+    seeded = []
+
+    hashers = ["django.contrib.auth.hashers.MD5PasswordHasher"] if fast_passwords else settings.PASSWORD_HASHERS
+
+    with override_settings(PASSWORD_HASHERS=hashers):
+        for index in range(users):
+            serializer = UserSerializer(data={
+                "username": "{}-{}".format(prefix, index),
+                "email": "{}-{}@example.com".format(prefix, index),
+                "password": "{}-{}".format(prefix, index),
+            })
+            serializer.is_valid(raise_exception=True)
+            user = serializer.save()
+
+            accounts = [
+                Account.objects.create(
+                    name="{}-{}-{}".format(prefix, index, number),
+                    user=user,
+                    available_amount=OPENING_BALANCE,
+                )
+                for number in range(accounts_per_user)
+            ]
+            seeded.append((user, accounts))
+
+    return seeded
+
+
+def build_request(operation:str, seeded:list, rng:random.Random) -> Request:
+    user, accounts = rng.choice(seeded)
+    account = rng.choice(accounts)
+
+    if operation == "deposit":
+        return Request(operation, user, views.Deposit, "/api/deposit/",
+                       {"account": account.pk, "amount": AMOUNT, "type": "deposit"}, {})
+
+    if operation == "withdraw":
+        return Request(operation, user, views.Withdraw, "/api/withdraw/",
+                       {"account": account.pk, "amount": AMOUNT, "type": "withdraw"}, {})
+
+    if operation == "account_transfer":
+        to_account = rng.choice([other for other in accounts if other.pk != account.pk])
+        return Request(operation, user, views.AccountToAccountTransfer, "/api/account-to-account-transfer/",
+                       {"account": account.pk, "to_account": to_account.pk, "amount": AMOUNT, "type": "transfer"}, {})
+
+    to_user, to_accounts = rng.choice([other for other in seeded if other[0].pk != user.pk])
+    to_account = rng.choice(to_accounts)
+    kwargs = {"user_account": to_account.name, "to_user": to_user.pk}
+    return Request(operation, user, views.AccountToUserTransfer,
+                   "/api/account-to-user-transfer/{user_account}/{to_user}/".format(**kwargs),
+                   {"account": account.pk, "amount": AMOUNT, "type": "transfer"}, kwargs)
+
+
+def generate(mix:dict, seeded:list, requests:int, seed_value:int=0) -> list:
+    """
+    > It draws `requests` requests from the operation weights of `mix` with a seeded random
+    generator, so two runs with the same arguments send the same requests. Account transfers need
+    two accounts per user and user transfers two users, otherwise they are left out of the mix
+    """
+    rng = random.Random(seed_value)
+    mix = {
+        operation: weight for operation, weight in mix.items()
+        if weight > 0
+        and (operation != "account_transfer" or len(seeded[0][1]) > 1)
+        and (operation != "user_transfer" or len(seeded) > 1)
+    }
+    operations = rng.choices(list(mix), weights=list(mix.values()), k=requests)
+    return [build_request(operation, seeded, rng) for operation in operations]
+
+
+class ClientDriver:
+    """
+    Sends requests through the Django test client, so they pass through the URL resolver and
+    the whole middleware stack. `auth` picks how each request authenticates: "session" logs the
+    user in once, "basic" sends the username and password, and "apikey" an API key.
+    """
+    name = "client"
+    AUTH = ("session", "basic", "apikey")
+
+    def __init__(self, auth:str="session"):
+        self.auth = auth
+        self.clients = {}
+
+    def client(self, user:User) -> Client:
+        if user.pk in self.clients:
+            return self.clients[user.pk]
+
+        client = Client()
+
+        if self.auth == "session":
+            client.force_login(user)
+            headers = {}
+        elif self.auth == "basic":
+            credentials = base64.b64encode("{0}:{0}".format(user.username).encode()).decode()
+            headers = {"HTTP_AUTHORIZATION": "Basic {}".format(credentials)}
+        else:
+            headers = {"HTTP_AUTHORIZATION": "{} {}".format(authentication.KEYWORD, authentication.generate(user)[1])}
+
+        self.clients[user.pk] = (client, headers)
+        return self.clients[user.pk]
+
+    def __call__(self, request:Request) -> bool:
+        client, headers = self.client(request.user)
+        response = client.post(request.path, request.data, content_type="application/json", **headers)
+        return response.status_code == 201
+
+
+class ViewDriver:
+    """
+    Calls the views directly with requests from `APIRequestFactory`, skipping the URL resolver,
+    the middleware and session authentication.
+    """
+    name = "view"
+
+    def __init__(self):
+        self.factory = APIRequestFactory()
+        self.handlers = {}
+
+    def __call__(self, request:Request) -> bool:
+        if request.view not in self.handlers:
+            self.handlers[request.view] = request.view.as_view()
+
+        api_request = self.factory.post(request.path, request.data, format="json")
+        force_authenticate(api_request, user=request.user)
+        return self.handlers[request.view](api_request, **request.kwargs).status_code == 201
+
@@ -0,0 +1,237 @@
+# Standard Library Imports
+import threading
+import time
+from collections import OrderedDict
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import caches
+
+# App Imports
+from ledger.models import Account
+from ledger.sharding import get_shards, shard_for_id, shard_for_user
+
+
+DEFAULT_ACCOUNT_CACHE = {
+    "MAXSIZE": 10000,
+    "TTL": 60,
+    # Alias of a Django cache (locmem, file, redis, ...) shared between processes, or None
+    "BACKEND": None,
+}
+
+KEY_PREFIX = "ledger:account:"
+
+# Stats figures that describe the current state rather than count events
+GAUGES = ("size",)
+
+
+class LRUCache:
+    """
+    A thread-safe, size-bounded LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize:int, ttl:float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is None:
+                return None
+
+            expires, value = entry
+
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class AccountCacheStats:
+    """
+    Hit/miss counters for account resolution.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.shared_hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "size": len(local),
+            }
+
+
+def get_options() -> dict:
+    return {**DEFAULT_ACCOUNT_CACHE, **getattr(settings, "LEDGER_ACCOUNT_CACHE", {})}
+
+
+def shared_cache():
+    backend = get_options()["BACKEND"]
+    return caches[backend] if backend else None
+
+
+stats = AccountCacheStats()
+local = LRUCache(maxsize=get_options()["MAXSIZE"], ttl=get_options()["TTL"])
+
+
+def make_keys(pk:int, name:str, user_id:int) -> list:
+    return [
+        KEY_PREFIX + "pk:{}".format(pk),
+        KEY_PREFIX + "name:{}".format(name),
+        KEY_PREFIX + "user:{}:name:{}".format(user_id, name),
+    ]
+
+
+def make_key(pk:int=None, name:str=None, user_id:int=None) -> str:
+    if pk is not None:
+        return KEY_PREFIX + "pk:{}".format(pk)
+
+    if user_id is not None:
+        return KEY_PREFIX + "user:{}:name:{}".format(user_id, name)
+
+    return KEY_PREFIX + "name:{}".format(name)
+
+
+def to_account(entry:tuple) -> Account:
+    """
+    > It builds an `Account` from a cached `(pk, name, user_id)` entry. The balance is left
+    deferred, so reading it goes to the database instead of returning a stale cached value
+    """
+    return Account.from_db(shard_for_id(entry[0]), ["id", "name", "user_id"], entry)
+
+
+def remember(entry:tuple) -> None:
+    shared = shared_cache()
+
+    for key in make_keys(*entry):
+        local.set(key, entry)
+
+        if shared is not None:
+            shared.set(key, entry, timeout=get_options()["TTL"])
+
+
+def get_account(pk:int=None, name:str=None, user_id:int=None, read_db=None) -> Account:
+    """
+    > It resolves an account by primary key, by name, or by user and name, checking the
+    in-process LRU cache, then the shared Django cache, then the database
+
+    :param pk: The primary key of the account
+    :type pk: int
+    :param name: The (slugified) name of the account
+    :type name: str
+    :param user_id: The primary key of the account's owner
+    :type user_id: int
+    :param read_db: Maps a shard to the database alias to read it from, e.g. `replicas.read_db`
+    :return: An `Account` with its balance deferred
+    """
+    key = make_key(pk=pk, name=name, user_id=user_id)
+    entry = local.get(key)
+
+    if entry is not None:
+        stats.incr("hits")
+        return to_account(entry)
+
+    shared = shared_cache()
+    entry = shared.get(key) if shared is not None else None
+
+    if entry is not None:
+        stats.incr("shared_hits")
+        local.set(key, entry)
+        return to_account(entry)
+
+    stats.incr("misses")
+    lookup = {"pk": pk} if pk is not None else {"name": name}
+
+    if pk is not None:
+        shards = [shard_for_id(pk)]
+    elif user_id is not None:
+        lookup["user_id"] = user_id
+        shards = [shard_for_user(user_id)]
+    else:
+        # Only a name: ask the shards in turn
+        shards = get_shards()
+
+    entry = None
+
+    for shard in shards:
+        entry = Account.objects.using(read_db(shard) if read_db else shard).filter(**lookup).values_list("pk", "name", "user_id").first()
+
+        if entry is not None:
+            break
+
+    if entry is None:
+        raise Account.DoesNotExist("Account matching {} does not exist.".format(lookup))
+
+    remember(entry)
+    return to_account(entry)
+
+
+def invalidate(account:Account) -> None:
+    """
+    > It evicts every key of an account, including the keys of its previous name when the
+    account was renamed
+
+    :param account: The saved or deleted account
+    :type account: Account
+    """
+    shared = shared_cache()
+    key = make_key(pk=account.pk)
+    entries = {(account.pk, account.name, account.user_id), local.get(key)}
+
+    if shared is not None:
+        entries.add(shared.get(key))
+
+    for entry in entries - {None}:
+        for key in make_keys(*entry):
+            local.delete(key)
+
+            if shared is not None:
+                shared.delete(key)
+
+    stats.incr("invalidations")
+
+
+def clear() -> None:
+    local.clear()
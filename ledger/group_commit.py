@@ -0,0 +1,203 @@
+# Standard Library Imports
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Django Imports
+from django.conf import settings
+from django.db import connections, transaction
+
+
+DEFAULT_GROUP_COMMIT = {
+    "ENABLED": False,
+    "BATCH_SIZE": 64,
+    "MAX_WAIT": 0.002,
+    "JOURNAL_MODE": "WAL",
+    "SYNCHRONOUS": "FULL",
+}
+
+# Stats figures that describe the current state rather than count events
+GAUGES = ("largest_batch", "postings_per_batch")
+
+
+def get_options() -> dict:
+    return {**DEFAULT_GROUP_COMMIT, **getattr(settings, "LEDGER_GROUP_COMMIT", {})}
+
+
+class GroupCommitStats:
+    """
+    Process-wide counters for the group commit writer, used to measure how many postings
+    share each commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.batches = 0
+            self.postings = 0
+            self.failed_batches = 0
+            self.largest_batch = 0
+            self.commit_seconds = 0.0
+
+    def record(self, size:int, seconds:float, failed:bool=False) -> None:
+        with self._lock:
+            self.batches += 1
+            self.postings += size
+            self.failed_batches += int(failed)
+            self.largest_batch = max(self.largest_batch, size)
+            self.commit_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "postings": self.postings,
+                "failed_batches": self.failed_batches,
+                "largest_batch": self.largest_batch,
+                "postings_per_batch": self.postings / self.batches if self.batches else 0.0,
+                "commit_seconds": self.commit_seconds,
+            }
+
+
+stats = GroupCommitStats()
+
+
+class GroupCommitQueue:
+    """
+    An in-process queue of one database's writes drained by a single writer thread. The writer
+    takes up to `batch_size` items, waiting at most `max_wait` seconds after the first one for
+    more, and runs each of them in its own savepoint of one shared transaction, so the whole batch
+    costs one commit. Each item's future resolves only once that commit has succeeded.
+    """
+
+    def __init__(self, using:str, batch_size:int, max_wait:float):
+        self.using = using
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.pending = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._writer = None
+
+    def start(self) -> None:
+        with self._lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self.drain, name="ledger-group-commit-{}".format(self.using), daemon=True
+                )
+                self._writer.start()
+
+    def submit(self, work, *args, **kwargs) -> Future:
+        future = Future()
+        self.pending.put((functools.partial(work, *args, **kwargs), future))
+        self.start()
+        return future
+
+    def run(self, work, *args, **kwargs):
+        return self.submit(work, *args, **kwargs).result()
+
+    def collect(self) -> list:
+        batch = [self.pending.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+
+            try:
+                batch.append(self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def drain(self) -> None:
+        while True:
+            self.commit(self.collect())
+
+    def commit(self, batch:list) -> None:
+        """
+        > It runs every item of the batch inside one transaction, each in its own savepoint so a
+        failing item is rolled back alone, and settles the futures after the commit. If the
+        commit itself fails, every item of the batch fails with its error
+        """
+        started = time.perf_counter()
+        outcomes = []
+
+        try:
+            with transaction.atomic(using=self.using):
+                for work, future in batch:
+                    if not future.set_running_or_notify_cancel():
+                        continue
+
+                    try:
+                        with transaction.atomic(using=self.using):
+                            outcomes.append((future, work(), None))
+                    except Exception as error:
+                        outcomes.append((future, None, error))
+        except Exception as error:
+            stats.record(len(batch), time.perf_counter() - started, failed=True)
+            connections[self.using].close()
+
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        stats.record(len(batch), time.perf_counter() - started)
+
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+writers = {}
+writers_lock = threading.Lock()
+
+
+def get_writer(using:str) -> GroupCommitQueue:
+    with writers_lock:
+        if using not in writers:
+            writers[using] = GroupCommitQueue(
+                using, batch_size=get_options()["BATCH_SIZE"], max_wait=get_options()["MAX_WAIT"]
+            )
+
+        return writers[using]
+
+
+def run(using:str, work):
+    """
+    > It runs a posting's database writes in one transaction on `using`. When
+    `LEDGER_GROUP_COMMIT` is enabled they are handed to the writer of that database and share a
+    commit with other requests' writes, returning once the commit is durable; validation and
+    building the response stay on the request's thread. Disabled, `work` runs in its own atomic
+    block on the calling thread
+
+    :param using: The shard the writes go to
+    :type using: str
+    :param work: A callable doing the writes, whose exceptions roll them back
+    :return: What `work` returns
+    """
+    if not get_options()["ENABLED"]:
+        with transaction.atomic(using=using):
+            return work()
+
+    return get_writer(using).run(work)
+
+
+def tune_sqlite(sqlite_connection) -> None:
+    """
+    > It switches a SQLite connection to the journal mode and `synchronous` level of
+    `LEDGER_GROUP_COMMIT`. In WAL mode readers do not block the writer, and with `FULL` every
+    commit is still synced to disk, which group commit makes affordable
+    """
+    options = get_options()
+
+    with sqlite_connection.cursor() as cursor:
+        cursor.execute("PRAGMA journal_mode={}".format(options["JOURNAL_MODE"]))
+        cursor.execute("PRAGMA synchronous={}".format(options["SYNCHRONOUS"]))
@@ -0,0 +1,231 @@
+# Standard Library Imports
+import base64
+import csv
+import heapq
+import json
+from datetime import datetime
+from itertools import chain, islice
+from operator import attrgetter, itemgetter
+
+# Django Imports
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# App Imports
+from ledger.models import Account, Transaction
+from ledger.sharding import shard_for_id
+from ledger import archive, cache
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = (
+    "id", "date_created", "type", "amount",
+    "account__name", "to_account__name", "user__username", "to_user__username",
+)
+
+
+def encode_cursor(transaction) -> str:
+    value = "{}|{}".format(transaction.date_created.isoformat(), transaction.id)
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor:str) -> tuple:
+    """
+    > It turns a cursor back into the `(date_created, id)` of the last transaction of a page,
+    raising `ValueError` for anything that is not a cursor this module made
+    """
+    try:
+        date_created, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(date_created), int(pk)
+    except (TypeError, ValueError) as error:
+        raise ValueError("Invalid cursor.") from error
+
+
+def account_querysets(account_id:int, queryset, using:str=None) -> list:
+    """
+    > It splits an account's history into the transactions it sent and the ones it received, so
+    each half walks its own `(account, date_created, id)` index instead of an OR over both. Both
+    are read from the account's shard, which holds a copy of every transfer it received
+    """
+    queryset = queryset.using(using or shard_for_id(account_id))
+    return [queryset.filter(account_id=account_id), queryset.filter(to_account_id=account_id)]
+
+
+def account_streams(account_id:int, build, read, key, descending:bool=False, before:datetime=None, using:str=None) -> list:
+    """
+    > It returns the sorted streams an account's history is merged from: the transactions it sent
+    and received in `transactions`, and one stream running through the archive tables a month at
+    a time. Months do not overlap, so that stream is sorted too, and a month's table is only
+    queried once the merge has used up the months before it
+
+    :param account_id: The primary key of the account
+    :type account_id: int
+    :param build: Builds the queryset to read from a model, `Transaction` or an archive table's
+    :param read: Turns a queryset into the iterable of rows it streams
+    :param key: The sort key of a row
+    :param descending: Whether the history is read newest first
+    :type descending: bool
+    :param before: The newest transaction date the streams need to reach, when reading from a
+    cursor
+    :type before: datetime
+    :param using: The database to read, the account's shard if not given
+    :type using: str
+    :return: A list of iterables of rows
+    """
+    using = using or shard_for_id(account_id)
+    streams = [read(qs) for qs in account_querysets(account_id, build(Transaction), using=using)]
+    archived = archive.querysets(build, using, end=before, descending=descending)
+
+    if archived:
+        streams.append(chain.from_iterable(
+            merge([read(qs) for qs in account_querysets(account_id, queryset, using=using)], key, descending=descending)
+            for queryset in archived
+        ))
+
+    return streams
+
+
+def account_name(account_id:int):
+    try:
+        return cache.get_account(pk=account_id).name
+    except Account.DoesNotExist:
+        return None
+
+
+def attach_counterparties(transactions:list) -> list:
+    """
+    > It fills in the accounts the join could not find because they live on another shard
+    """
+    for transaction in transactions:
+        for field in ("account", "to_account"):
+            if getattr(transaction, field + "_id") is not None and getattr(transaction, field) is None:
+                try:
+                    setattr(transaction, field, cache.get_account(pk=getattr(transaction, field + "_id")))
+                except Account.DoesNotExist:
+                    pass
+
+    return transactions
+
+
+def merge(streams:list, key, descending:bool=False):
+    """
+    > It merges streams that are each sorted by `key` into one sorted stream, dropping the second
+    copy of transfers from an account to itself
+    """
+    last = None
+
+    for row in heapq.merge(*streams, key=key, reverse=descending):
+        if key(row) != last:
+            last = key(row)
+            yield row
+
+
+def page(account_id:int, cursor:str=None, page_size:int=DEFAULT_PAGE_SIZE, using:str=None) -> tuple:
+    """
+    > It returns one page of an account's history, newest first, using keyset pagination on
+    `(date_created, id)` so deep pages cost the same as the first one
+
+    :param account_id: The primary key of the account
+    :type account_id: int
+    :param cursor: The `next_cursor` of the previous page
+    :type cursor: str
+    :param page_size: The number of transactions per page
+    :type page_size: int
+    :param using: The database to read, the account's shard if not given
+    :type using: str
+    :return: The transactions of the page and the cursor of the next page, or None
+    """
+    date_created = pk = None
+
+    if cursor:
+        date_created, pk = decode_cursor(cursor)
+
+    def build(model):
+        queryset = model.objects.select_related(
+            "account", "to_account", "user", "to_user"
+        ).only(
+            "id", "date_created", "type", "amount",
+            "account__name", "to_account__name", "user__username", "to_user__username",
+        ).order_by("-date_created", "-id")
+
+        if cursor:
+            # The redundant upper bound on date_created lets the index range stop at the cursor
+            queryset = queryset.filter(
+                Q(date_created__lt=date_created) | Q(date_created=date_created, id__lt=pk),
+                date_created__lte=date_created,
+            )
+
+        return queryset
+
+    key = attrgetter("date_created", "id")
+    streams = account_streams(
+        account_id, build, lambda queryset: queryset[:page_size + 1], key,
+        descending=True, before=date_created, using=using,
+    )
+    transactions = attach_counterparties(list(
+        islice(merge(streams, key=key, descending=True), page_size + 1)
+    ))
+
+    if len(transactions) > page_size:
+        return transactions[:page_size], encode_cursor(transactions[page_size - 1])
+
+    return transactions, None
+
+
+def export_rows(account_id:int, chunk_size:int=EXPORT_CHUNK_SIZE, using:str=None):
+    """
+    > It streams an account's whole history, oldest first, as tuples of `EXPORT_FIELDS` read with
+    `.iterator(chunk_size=...)`, so memory use does not grow with the history
+    """
+    streams = account_streams(
+        account_id,
+        lambda model: model.objects.order_by("date_created", "id").values_list(*EXPORT_FIELDS, "account_id", "to_account_id"),
+        lambda queryset: queryset.iterator(chunk_size=chunk_size),
+        itemgetter(1, 0),
+        using=using,
+    )
+    return with_account_names(merge(streams, key=itemgetter(1, 0)))
+
+
+def with_account_names(rows):
+    """
+    > It turns rows of `EXPORT_FIELDS` followed by the account and receiving account ids into
+    rows of `EXPORT_FIELDS`, looking up the names of accounts on another shard that the join
+    could not find
+    """
+    for row in rows:
+        *row, from_id, to_id = row
+
+        # Accounts on another shard are missing from the join
+        if row[4] is None and from_id is not None:
+            row[4] = account_name(from_id)
+
+        if row[5] is None and to_id is not None:
+            row[5] = account_name(to_id)
+
+        yield tuple(row)
+
+
+def export_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+class Echo:
+    """
+    A file-like object whose `write` returns the value instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+
+    for row in rows:
+        yield writer.writerow(row)
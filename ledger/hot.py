@@ -0,0 +1,234 @@
+# Standard Library Imports
+import random
+import threading
+from decimal import Decimal
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import Account, BalanceSlot, UserSummary, ZERO
+from ledger.sharding import get_shards, shard_for_id, shard_for_user
+
+
+DEFAULT_HOT_ACCOUNTS = {
+    # How long a process keeps its list of hot accounts before reading it again
+    "REFRESH_SECONDS": 5.0,
+}
+
+# Leg lookups a slot can be found from without reading the account
+SLOT_LOOKUPS = {"pk", "id", "user", "user_id"}
+
+
+def get_options() -> dict:
+    return {**DEFAULT_HOT_ACCOUNTS, **getattr(settings, "LEDGER_HOT_ACCOUNTS", {})}
+
+
+class HotAccountStats:
+    """
+    Counters of the postings to hot accounts, by where they were applied.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.slot_credits = 0
+            self.slot_debits = 0
+            self.account_postings = 0
+            self.refreshes = 0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "slot_credits": self.slot_credits,
+                "slot_debits": self.slot_debits,
+                "account_postings": self.account_postings,
+                "refreshes": self.refreshes,
+            }
+
+
+stats = HotAccountStats()
+registry = LRUCache(maxsize=len(get_shards()), ttl=get_options()["REFRESH_SECONDS"])
+
+
+def hot_accounts(using:str) -> dict:
+    """
+    > It returns the hot accounts of a shard, the ones with balance slots, as a dictionary of
+    account primary key to `(number of slots, user pk)`. The list is read once per
+    `REFRESH_SECONDS`; a posting that goes by a stale list still lands on the right balance,
+    only on the account row instead of a slot or the other way round
+    """
+    accounts = registry.get(using)
+
+    if accounts is None:
+        accounts = {
+            pk: (slots, user_id)
+            for pk, user_id, slots in BalanceSlot.objects.using(using)
+            .values("account_id", "account__user_id").annotate(slots=Count("id"))
+            .values_list("account_id", "account__user_id", "slots")
+        }
+        registry.set(using, accounts)
+        stats.incr("refreshes")
+
+    return accounts
+
+
+def slot_count(pk:int, using:str=None) -> int:
+    slots, _ = hot_accounts(using or shard_for_id(pk)).get(pk, (0, None))
+    return slots
+
+
+def credit(pk:int, amount:Decimal, slots:int, using:str) -> bool:
+    return bool(
+        BalanceSlot.objects.using(using).filter(account_id=pk, slot=random.randrange(slots))
+        .update(amount=F("amount") + amount)
+    )
+
+
+def debit(pk:int, amount:Decimal, slots:int, using:str) -> bool:
+    """
+    > It takes `amount` from one slot that holds at least that much: a random one first, then
+    the others that had enough when they were listed. Each attempt is a conditional UPDATE, so two
+    debits never take the same funds
+    """
+    first = random.randrange(slots)
+    queryset = BalanceSlot.objects.using(using).filter(account_id=pk, amount__gte=amount)
+
+    if queryset.filter(slot=first).update(amount=F("amount") - amount):
+        return True
+
+    for slot in queryset.exclude(slot=first).values_list("slot", flat=True):
+        if queryset.filter(slot=slot).update(amount=F("amount") - amount):
+            return True
+
+    return False
+
+
+def apply_leg(leg, using:str) -> bool:
+    """
+    > It applies a leg to one of its account's balance slots, leaving the account row, the
+    single row every posting would otherwise wait on, untouched. The slots are not part of the
+    owner's `UserSummary` balance, so that row is left alone too
+
+    :param leg: A `ledger.posting.Leg` looking its account up by primary key
+    :param using: The shard of the account
+    :type using: str
+    :return: Whether the leg was applied; if not, it is posted to the account row as usual. That
+    is the case for a cold account, a lookup by anything else, and a debit no slot can cover
+    """
+    pk = leg.lookup.get("pk", leg.lookup.get("id"))
+
+    if pk is None or not set(leg.lookup) <= SLOT_LOOKUPS:
+        return False
+
+    slots, user_id = hot_accounts(using).get(pk, (0, None))
+    owner = leg.lookup.get("user_id", leg.lookup.get("user"))
+
+    # The account row enforces the owner, and fails the posting, when it is not this one
+    if not slots or (owner is not None and getattr(owner, "pk", owner) != user_id):
+        return False
+
+    if leg.amount >= 0:
+        applied = credit(pk, leg.amount, slots, using)
+    else:
+        applied = debit(pk, -leg.amount, slots, using)
+
+    stats.incr(("slot_credits" if leg.amount >= 0 else "slot_debits") if applied else "account_postings")
+    return applied
+
+
+def slot_balances(account_ids:list, using:str=None) -> dict:
+    """
+    > It sums the balance slots of the given accounts, keyed by account primary key. Accounts
+    without slots are left out
+    """
+    return dict(
+        BalanceSlot.objects.using(using).filter(account_id__in=account_ids)
+        .values("account_id").annotate(total=Sum("amount"))
+        .values_list("account_id", "total")
+    )
+
+
+def account_balance(account:Account, using:str=None) -> Decimal:
+    """
+    > It returns an account's balance, its available amount plus its slots. A cold account
+    costs no extra query
+
+    :param account: The account, read from `using`
+    :type account: Account
+    :param using: The database to read the slots from, which may be a replica of the shard
+    :type using: str
+    :return: The balance
+    """
+    if not slot_count(account.pk):
+        return account.available_amount
+
+    return account.available_amount + slot_balances([account.pk], using=using).get(account.pk, ZERO)
+
+
+def user_slot_balance(user_id:int, using:str=None) -> Decimal:
+    """
+    > It returns the total of the balance slots of a user's hot accounts, which their
+    `UserSummary` balance leaves out
+    """
+    account_ids = [
+        pk for pk, (_, owner) in hot_accounts(shard_for_user(user_id)).items() if owner == user_id
+    ]
+
+    if not account_ids:
+        return ZERO
+
+    return sum(slot_balances(account_ids, using=using).values(), ZERO)
+
+
+def set_slots(account:Account, count:int) -> Decimal:
+    """
+    > It gives an account `count` balance slots, numbered from 0. Slots beyond `count` are folded
+    back into the account row and its owner's `UserSummary` balance, so `count=0` turns a hot
+    account back into a cold one. The balance itself does not change
+
+    :param account: The account
+    :type account: Account
+    :param count: The number of slots to keep or create
+    :type count: int
+    :return: The amount folded back into the account row
+    """
+    using = shard_for_id(account.pk)
+
+    with transaction.atomic(using=using):
+        user_id = Account.objects.using(using).select_for_update()\
+            .values_list("user_id", flat=True).get(pk=account.pk)
+        slots = list(
+            BalanceSlot.objects.using(using).select_for_update()
+            .filter(account_id=account.pk).order_by("slot")
+        )
+        retired = [slot for slot in slots if slot.slot >= count]
+        folded = sum((slot.amount for slot in retired), ZERO)
+
+        if retired:
+            BalanceSlot.objects.using(using).filter(pk__in=[slot.pk for slot in retired]).delete()
+
+        if folded:
+            Account.objects.using(using).filter(pk=account.pk).update(
+                available_amount=F("available_amount") + folded, date_update=timezone.now()
+            )
+            UserSummary.objects.using(using).filter(user_id=user_id).update(balance=F("balance") + folded)
+
+        existing = {slot.slot for slot in slots}
+        BalanceSlot.objects.using(using).bulk_create(
+            [BalanceSlot(account_id=account.pk, slot=slot) for slot in range(count) if slot not in existing]
+        )
+
+    registry.delete(using)
+    return folded
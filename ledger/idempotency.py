@@ -0,0 +1,195 @@
+# Standard Library Imports
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+# Django Imports
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework import response, status
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import IdempotencyKey
+from ledger.sharding import get_shards, shard_for_user
+
+# Third Part Imports
+from rest_api_payload import error_response
+
+
+HEADER = "Idempotency-Key"
+
+DEFAULT_IDEMPOTENCY = {
+    "TTL": 24 * 60 * 60,
+    "LOCAL_MAXSIZE": 10000,
+    "LOCAL_TTL": 5 * 60,
+}
+
+
+def get_options() -> dict:
+    return {**DEFAULT_IDEMPOTENCY, **getattr(settings, "LEDGER_IDEMPOTENCY", {})}
+
+
+# Stored responses of recent keys, so most retries are answered without a query
+local = LRUCache(maxsize=get_options()["LOCAL_MAXSIZE"], ttl=get_options()["LOCAL_TTL"])
+
+
+def fingerprint(request) -> str:
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256("{} {}\n{}".format(request.method, request.path, body).encode()).hexdigest()
+
+
+def lookup(user_id:int, key:str):
+    """
+    > It returns the stored `(fingerprint, status code, response data)` of a key from the local
+    cache or the `idempotency_keys` table of the user's shard, dropping the row if it has expired
+    """
+    stored = local.get((user_id, key))
+
+    if stored is not None:
+        return stored
+
+    keys = IdempotencyKey.objects.using(shard_for_user(user_id))
+    row = keys.filter(user_id=user_id, key=key)\
+        .values_list("fingerprint", "status_code", "response", "expires_at").first()
+
+    if row is None:
+        return None
+
+    if row[3] <= timezone.now():
+        keys.filter(user_id=user_id, key=key, expires_at__lte=timezone.now()).delete()
+        return None
+
+    # A claimed key has no response until its request has finished
+    if row[1] is not None:
+        local.set((user_id, key), row[:3])
+
+    return row[:3]
+
+
+def replay(stored:tuple, request_fingerprint:str) -> response.Response:
+    if stored[0] != request_fingerprint:
+        payload = error_response(
+            status="error",
+            message="This Idempotency-Key was already used for a different request!"
+        )
+        return response.Response(data=payload, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    if stored[1] is None:
+        payload = error_response(
+            status="error",
+            message="A request with this Idempotency-Key is still being processed!"
+        )
+        return response.Response(data=payload, status=status.HTTP_409_CONFLICT)
+
+    return response.Response(data=stored[2], status=stored[1], headers={"Idempotent-Replayed": "true"})
+
+
+def claim(request, using:str) -> None:
+    """
+    > It claims the request's `Idempotency-Key`, if it has one, by inserting its row without a
+    response. Call it in the transaction of the posting's writes, so the claim commits or rolls
+    back with them. A key claimed by a concurrent request raises `IntegrityError`, which rolls
+    this posting back; `idempotent` then answers with the other request's outcome
+
+    :param request: The request being posted, as passed to an `idempotent` handler
+    :param using: The shard the posting is written to, the user's
+    :type using: str
+    """
+    pending = getattr(request, "idempotency", None)
+
+    if pending is None:
+        return
+
+    user_id, key, request_fingerprint = pending
+    IdempotencyKey.objects.using(using).create(
+        user_id=user_id,
+        key=key,
+        fingerprint=request_fingerprint,
+        expires_at=timezone.now() + timedelta(seconds=get_options()["TTL"]),
+    )
+
+
+def complete(user_id:int, key:str, request_fingerprint:str, result:response.Response) -> None:
+    """
+    > It stores the response of a request whose key was claimed. A claim that was rolled back
+    leaves no row to update, and the response is not stored
+    """
+    stored = IdempotencyKey.objects.using(shard_for_user(user_id))\
+        .filter(user_id=user_id, key=key, fingerprint=request_fingerprint, status_code__isnull=True)\
+        .update(status_code=result.status_code, response=result.data)
+
+    if stored:
+        local.set((user_id, key), (request_fingerprint, result.status_code, result.data))
+
+
+def idempotent(handler):
+    """
+    > It makes a posting handler honor the `Idempotency-Key` header. A replayed key returns the
+    stored response without running the handler. A new key is handed to the handler, which claims
+    it with `claim` in the transaction of its writes, on the user's shard, and the response is
+    stored once the handler returns. If a concurrent request claimed the key first, this posting
+    is rolled back and the other request's response returned instead, or 409 while that request
+    is still running
+    """
+    @functools.wraps(handler)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        user_id = request.user.pk
+
+        if not key or user_id is None:
+            return handler(self, request, *args, **kwargs)
+
+        if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+            payload = error_response(status="error", message="Idempotency-Key is too long!")
+            return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+
+        request_fingerprint = fingerprint(request)
+        stored = lookup(user_id, key)
+
+        if stored is not None:
+            return replay(stored, request_fingerprint)
+
+        request.idempotency = (user_id, key, request_fingerprint)
+
+        try:
+            result = handler(self, request, *args, **kwargs)
+        except IntegrityError:
+            stored = lookup(user_id, key)
+
+            if stored is None:
+                raise
+
+            return replay(stored, request_fingerprint)
+
+        complete(user_id, key, request_fingerprint, result)
+        return result
+
+    return wrapper
+
+
+def prune(batch_size:int=1000) -> int:
+    """
+    > It deletes the expired keys of every shard in batches of `batch_size` rows, so no single
+    statement holds locks on a large part of the table
+
+    :return: The number of keys deleted
+    """
+    deleted = 0
+
+    for shard in get_shards():
+        keys = IdempotencyKey.objects.using(shard)
+
+        while True:
+            pks = list(keys.filter(expires_at__lte=timezone.now()).values_list("pk", flat=True)[:batch_size])
+
+            if not pks:
+                break
+
+            deleted += keys.filter(pk__in=pks).delete()[0]
+
+    return deleted
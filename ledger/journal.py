@@ -0,0 +1,202 @@
+# Standard Library Imports
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import NamedTuple
+
+# Django Imports
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.utils import timezone
+
+# App Imports
+from ledger.models import Account, BalanceSnapshot, JournalEntry, ZERO
+from ledger.reconciliation import Mismatch, MINOR_UNITS, minor_units
+from ledger.sharding import shard_for_id
+from ledger import hot
+
+
+DEFAULT_CHUNK_SIZE = 1000
+
+DEFAULT_JOURNAL = {
+    # Journal entries older than this many seconds are taken to be committed, see `settled_entry_id`
+    "SETTLE_SECONDS": 60.0,
+}
+
+
+class VerificationResult(NamedTuple):
+    accounts: int
+    mismatches: list
+    unbalanced: list
+
+
+def get_options() -> dict:
+    return {**DEFAULT_JOURNAL, **getattr(settings, "LEDGER_JOURNAL", {})}
+
+
+def to_money(total) -> Decimal:
+    return Decimal(total or 0) / MINOR_UNITS
+
+
+def high_water_mark(using:str=None) -> int:
+    return BalanceSnapshot.objects.using(using).aggregate(last=Max("last_entry_id"))["last"] or 0
+
+
+def settled_entry_id(using:str=None) -> int:
+    """
+    > It returns the id up to which the journal is settled, the highest id of the entries created
+    more than `SETTLE_SECONDS` ago. Ids are handed out when entries are inserted, but a posting
+    can commit after others that took higher ids, so the newest id is no safe high-water mark: an
+    entry committing late below it would be skipped by every later run. Every entry at or below
+    the settled id has committed, as long as no posting stays open for `SETTLE_SECONDS`
+
+    :param using: The shard to read
+    :type using: str
+    :return: The settled id, 0 if no entry is old enough
+    """
+    cutoff = timezone.now() - timedelta(seconds=get_options()["SETTLE_SECONDS"])
+
+    # Walks the primary key index back from the newest entry, over the last SETTLE_SECONDS only
+    return JournalEntry.objects.using(using).filter(date_created__lte=cutoff)\
+        .order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def latest_snapshots(account_ids:list, using:str=None) -> dict:
+    """
+    > It returns the balance of the newest snapshot of each account, keyed by account primary key
+    """
+    newest = BalanceSnapshot.objects.using(using).filter(account_id=OuterRef("account_id"))\
+        .order_by("-date_created", "-id").values("pk")[:1]
+
+    return dict(
+        BalanceSnapshot.objects.using(using).filter(account_id__in=account_ids, pk=Subquery(newest))
+        .values_list("account_id", "balance")
+    )
+
+
+def entry_totals(entries) -> dict:
+    return {
+        account_id: to_money(total)
+        for account_id, total in entries.values("account_id")
+        .annotate(total=Sum(minor_units("amount"))).values_list("account_id", "total")
+    }
+
+
+def balance_as_of(account_id:int, when:datetime=None, using:str=None) -> Decimal:
+    """
+    > It rebuilds an account's balance at a point in time from the newest snapshot taken by then
+    and the journal entries written after it, instead of replaying the whole journal
+
+    :param account_id: The primary key of the account
+    :type account_id: int
+    :param when: The point in time, now if not given
+    :type when: datetime
+    :param using: The database to read, the account's shard if not given
+    :type using: str
+    :return: The balance of the account at that time
+    """
+    when = when or timezone.now()
+    using = using or shard_for_id(account_id)
+    balance, last_entry_id = BalanceSnapshot.objects.using(using).filter(
+        account_id=account_id, date_created__lte=when
+    ).order_by("-date_created", "-id").values_list("balance", "last_entry_id").first() or (ZERO, 0)
+
+    tail = JournalEntry.objects.using(using).filter(
+        account_id=account_id, id__gt=last_entry_id, date_created__lte=when
+    ).aggregate(total=Sum(minor_units("amount")))["total"]
+
+    return balance + to_money(tail)
+
+
+def take_snapshots(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None) -> int:
+    """
+    > It snapshots every account with journal entries written since the last run, adding those
+    entries to the account's previous snapshot, so each run only reads the new part of the journal.
+    Runs stop at the settled part of the journal, see `settled_entry_id`
+
+    :param chunk_size: The number of accounts snapshotted per query
+    :type chunk_size: int
+    :param using: The shard to snapshot
+    :type using: str
+    :return: The number of snapshots taken
+    """
+    with transaction.atomic(using=using):
+        high_water = high_water_mark(using=using)
+        last_entry_id = settled_entry_id(using=using)
+
+        if last_entry_id <= high_water:
+            return 0
+
+        changes = entry_totals(
+            JournalEntry.objects.using(using).filter(
+                id__gt=high_water, id__lte=last_entry_id, account__isnull=False
+            )
+        )
+        account_ids = sorted(changes)
+
+        for start in range(0, len(account_ids), chunk_size):
+            chunk = account_ids[start:start + chunk_size]
+            previous = latest_snapshots(chunk, using=using)
+            BalanceSnapshot.objects.using(using).bulk_create([
+                BalanceSnapshot(
+                    account_id=account_id,
+                    balance=previous.get(account_id, ZERO) + changes[account_id],
+                    last_entry_id=last_entry_id,
+                )
+                for account_id in chunk
+            ])
+
+    return len(account_ids)
+
+
+def verify(full:bool=False, chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None) -> VerificationResult:
+    """
+    > It checks that every account's available amount equals its balance in the journal, and that
+    the entries of every transaction sum to zero. By default the journal balances start from the
+    latest snapshots and only the entries after them are read; `full` replays the whole journal
+
+    :param full: Ignore the snapshots and read every journal entry
+    :type full: bool
+    :param chunk_size: The number of accounts read per query
+    :type chunk_size: int
+    :param using: The shard to verify
+    :type using: str
+    :return: The number of accounts checked, the accounts that disagree with the journal and the
+    primary keys of the transactions whose entries do not balance
+    """
+    high_water = 0 if full else high_water_mark(using=using)
+    entries = JournalEntry.objects.using(using).filter(id__gt=high_water)
+    tail = entry_totals(entries.filter(account__isnull=False))
+
+    unbalanced = list(
+        entries.filter(transaction__isnull=False).values("transaction_id")
+        .annotate(total=Sum(minor_units("amount"))).exclude(total=0)
+        .order_by("transaction_id").values_list("transaction_id", flat=True)
+    )
+
+    accounts = 0
+    mismatches = []
+    last_pk = 0
+
+    while True:
+        rows = list(
+            Account.objects.using(using).filter(pk__gt=last_pk).order_by("pk")
+            .values_list("pk", "available_amount")[:chunk_size]
+        )
+
+        if not rows:
+            break
+
+        last_pk = rows[-1][0]
+        accounts += len(rows)
+        snapshots = {} if full else latest_snapshots([pk for pk, _ in rows], using=using)
+        slots = hot.slot_balances([pk for pk, _ in rows], using=using)
+
+        for pk, stored in rows:
+            stored += slots.get(pk, ZERO)
+            expected = snapshots.get(pk, ZERO) + tail.get(pk, ZERO)
+
+            if stored != expected:
+                mismatches.append(Mismatch(account_id=pk, stored=stored, expected=expected))
+
+    return VerificationResult(accounts, mismatches, unbalanced)
@@ -0,0 +1,57 @@
+# Standard Library Imports
+import time
+from datetime import timedelta
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# App Imports
+from ledger import archive
+from ledger.management.commands.export_transactions import parse_moment
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Moves old transactions out of the transactions table into per-month archive tables, in batches. Meant to run periodically, e.g. from cron, or with --interval."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--before", default=None, help="ISO date or datetime; archive the transactions created before it.")
+        parser.add_argument("--older-than-days", type=int, default=None, help="Archive the transactions older than this. Defaults to LEDGER_ARCHIVE AFTER_DAYS.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Transactions moved per database transaction.")
+        parser.add_argument("--pause", type=float, default=0.0, help="Seconds to sleep between batches.")
+        parser.add_argument("--interval", type=float, default=None, help="Keep archiving every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        if options["before"] is not None and options["older_than_days"] is not None:
+            raise CommandError("Pass either --before or --older-than-days.")
+
+        try:
+            before = parse_moment(options["before"]) if options["before"] else None
+        except ValueError as error:
+            raise CommandError("Invalid date: {}".format(error))
+
+        days = options["older_than_days"] if options["older_than_days"] is not None else archive.get_options()["AFTER_DAYS"]
+
+        while True:
+            started = time.perf_counter()
+            cutoff = before or timezone.now() - timedelta(days=days)
+            moved = 0
+
+            for shard in get_shards():
+                moved_now = archive.archive(cutoff, batch_size=options["batch_size"], pause=options["pause"], using=shard)
+                moved += moved_now
+                self.stdout.write("{}: archived {} transactions, {} archive tables.".format(
+                    shard, moved_now, len(archive.partitions(shard))
+                ))
+
+            self.stdout.write(self.style.SUCCESS(
+                "Archived {} transactions created before {} in {:.2f}s.".format(
+                    moved, cutoff.isoformat(), time.perf_counter() - started
+                )
+            ))
+
+            if options["interval"] is None:
+                break
+
+            time.sleep(options["interval"])
@@ -0,0 +1,80 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.signals import request_started
+from django.db import connection, reset_queries, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+# App Imports
+from ledger import posting
+from ledger.models import Account
+
+
+class Command(BaseCommand):
+    help = "Reports the queries spent per deposit by the old per-row save, the F() update the posting engine runs and the deposit endpoint, inside a transaction that is rolled back."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=100)
+
+    def measure(self, label:str, iterations:int, deposit) -> None:
+        # The test client resets the query log at the start of every request
+        request_started.disconnect(reset_queries)
+        started = time.perf_counter()
+
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(iterations):
+                    deposit()
+        finally:
+            request_started.connect(reset_queries)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            "{:<28} {:>6.2f} queries/deposit {:>9.1f} us/deposit".format(
+                label, len(queries) / iterations, elapsed / iterations * 1e6
+            )
+        )
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+
+        with transaction.atomic(), override_settings(ALLOWED_HOSTS=["testserver"]):
+            user = User.objects.create_user(username="benchmark-deposit-queries")
+            account = Account.objects.create(name="benchmark-deposit-queries", user=user)
+
+            client = Client()
+            client.force_login(user)
+
+            # How deposits used to change the balance: load the account, add, save every field. The
+            # old Account.save() counted the user's accounts for the cap on every save, so the count
+            # is replayed here; today's save() only checks the cap on creation
+            def save_deposit():
+                user_account = Account.objects.get(pk=account.pk)
+                user_account.available_amount += 1
+                Account.objects.filter(user=user_account.user_id).count()
+                user_account.save()
+
+            # How `ledger.posting` changes it: one UPDATE, without loading the account
+            def update_deposit():
+                posting.apply_leg(posting.credit(1, pk=account.pk))
+
+            def api_deposit():
+                response = client.post(
+                    "/api/deposit/",
+                    {"account": account.pk, "amount": 1, "type": "deposit"},
+                    content_type="application/json",
+                )
+                assert response.status_code == 201, response.content
+
+            # Warm the account cache and the session before measuring
+            api_deposit()
+
+            self.measure("Account.save() (old)", iterations, save_deposit)
+            self.measure("F() update (new)", iterations, update_deposit)
+            self.measure("POST /api/deposit/", iterations, api_deposit)
+
+            transaction.set_rollback(True)
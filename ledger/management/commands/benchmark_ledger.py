@@ -0,0 +1,132 @@
+# Standard Library Imports
+import json
+import platform
+import time
+import uuid
+
+# Django Imports
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+from django.utils import timezone
+
+# App Imports
+from ledger.benchmarks import workload
+from ledger.benchmarks.harness import Benchmark
+from ledger import group_commit
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds users and accounts, drives a mix of postings through the test client and direct view "
+        "calls, and reports requests/sec, p50/p99 latency and queries per request. Everything runs "
+        "in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--accounts-per-user", type=int, default=2)
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument(
+            "--mix", default=",".join("{}={}".format(*item) for item in workload.DEFAULT_MIX.items()),
+            help="Comma separated operation=weight pairs of {}.".format(", ".join(workload.OPERATIONS)),
+        )
+        parser.add_argument("--driver", choices=("client", "view", "both"), default="both")
+        parser.add_argument(
+            "--auth", choices=workload.ClientDriver.AUTH, default="session",
+            help="How the client driver authenticates; the view driver always forces authentication.",
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Seed of the request generator.")
+        parser.add_argument("--output", help="Write the results as JSON to this file, - for stdout.")
+
+    def report(self, stats:dict) -> None:
+        self.stdout.write(
+            "{:<7} {:<17} {:>6} req {:>8.1f} req/s   p50 {:>7.2f} ms   p99 {:>7.2f} ms   {:>5.2f} queries/req   {} errors".format(
+                stats["driver"], stats["name"], stats["rounds"], stats["requests_per_second"],
+                stats["p50_ms"], stats["p99_ms"], stats["queries_per_request"], stats["errors"],
+            )
+        )
+
+    def run_driver(self, driver, requests:list, warmup:list) -> list:
+        """
+        > It sends every request through `driver`, keeping one `Benchmark` per operation and one
+        for the whole mix, and returns their stats
+        """
+        for request in warmup:
+            driver(request)
+
+        benchmarks = {}
+
+        for request in requests:
+            if request.operation not in benchmarks:
+                benchmarks[request.operation] = Benchmark(request.operation, driver=driver.name)
+
+            benchmarks[request.operation](driver, request)
+
+        mix = Benchmark.combine("mix", benchmarks.values(), driver=driver.name)
+        return [benchmark.stats for benchmark in (mix, *benchmarks.values())]
+
+    def handle(self, *args, **options):
+        try:
+            mix = workload.parse_mix(options["mix"])
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if options["users"] < 1 or options["accounts_per_user"] < 1:
+            raise CommandError("At least one user with one account is needed.")
+
+        drivers = ["client", "view"] if options["driver"] == "both" else [options["driver"]]
+        results = []
+
+        # The writer thread of group commit could not see the rolled back seed data
+        with transaction.atomic(), override_settings(
+            ALLOWED_HOSTS=["testserver"],
+            LEDGER_GROUP_COMMIT={**group_commit.get_options(), "ENABLED": False},
+        ):
+            started = time.perf_counter()
+            seeded = workload.seed(
+                options["users"], options["accounts_per_user"], prefix="bench-{}".format(uuid.uuid4().hex[:8]),
+                fast_passwords=options["auth"] != "basic",
+            )
+            seed_seconds = time.perf_counter() - started
+
+            for name in drivers:
+                requests = workload.generate(mix, seeded, options["requests"], seed_value=options["seed"])
+                warmup = workload.generate(mix, seeded, options["warmup"], seed_value=options["seed"] + 1)
+
+                driver = workload.ClientDriver(auth=options["auth"]) if name == "client" else workload.ViewDriver()
+
+                for stats in self.run_driver(driver, requests, warmup):
+                    self.report(stats)
+                    results.append(stats)
+
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            document = json.dumps({
+                "meta": {
+                    "date": timezone.now().isoformat(),
+                    "python": platform.python_version(),
+                    "django": django.get_version(),
+                    "database": connection.vendor,
+                    "debug": settings.DEBUG,
+                    "seed_seconds": seed_seconds,
+                    "options": {
+                        key: options[key] for key in
+                        ("users", "accounts_per_user", "requests", "warmup", "driver", "auth", "seed")
+                    },
+                    "mix": mix,
+                },
+                "results": results,
+            }, indent=2)
+
+            if options["output"] == "-":
+                self.stdout.write(document)
+            else:
+                with open(options["output"], "w") as output:
+                    output.write(document + "\n")
+
+                self.stdout.write(self.style.SUCCESS("Wrote {} results to {}.".format(len(results), options["output"])))
@@ -0,0 +1,37 @@
+# Django Imports
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+
+# App Imports
+from ledger.models import UserSummary
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Compares the maintained per-user balances with the live sum of each user's accounts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tolerance", type=Decimal, default=Decimal("0.00"))
+        parser.add_argument("--fix", action="store_true", help="Rebuild the summaries that drifted.")
+
+    def handle(self, *args, **options):
+        drift = []
+
+        for shard in get_shards():
+            shard_drift = UserSummary.find_drift(tolerance=options["tolerance"], using=shard)
+
+            for user_id, summary_balance, live_balance in shard_drift:
+                self.stdout.write(
+                    "user {}: summary {} != live {}".format(user_id, summary_balance, live_balance)
+                )
+
+            if shard_drift and options["fix"]:
+                UserSummary.rebuild([user_id for user_id, _, _ in shard_drift], using=shard)
+
+            drift.extend(shard_drift)
+
+        if drift and options["fix"]:
+            self.stdout.write(self.style.SUCCESS("Rebuilt {} user summaries.".format(len(drift))))
+
+        elif not drift:
+            self.stdout.write(self.style.SUCCESS("All user summaries match their accounts."))
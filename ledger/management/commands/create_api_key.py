@@ -0,0 +1,39 @@
+# Standard Library Imports
+from datetime import timedelta
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+# App Imports
+from ledger import authentication
+
+
+class Command(BaseCommand):
+    help = "Creates an API key for a user and prints it once."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--name", default="")
+        parser.add_argument("--expires-in-days", type=int, help="Never expires if not given.")
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError("User {} does not exist.".format(options["username"]))
+
+        expires_at = None
+
+        if options["expires_in_days"] is not None:
+            expires_at = timezone.now() + timedelta(days=options["expires_in_days"])
+
+        api_key, key = authentication.generate(user, name=options["name"], expires_at=expires_at)
+
+        self.stdout.write(self.style.SUCCESS(
+            "Created API key {} for {}. Send it as `Authorization: {} <key>`; it will not be shown again:".format(
+                api_key.prefix, user, authentication.KEYWORD
+            )
+        ))
+        self.stdout.write(key)
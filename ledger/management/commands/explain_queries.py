@@ -0,0 +1,57 @@
+# Standard Library Imports
+import re
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# App Imports
+from ledger.models import Account, Transaction, UserSummary
+
+
+# A full table or index scan, or a sort that no index could satisfy
+SLOW_PLAN = re.compile(r"\bSCAN\b(?! CONSTANT ROW)|USE TEMP B-TREE")
+
+
+def view_queries() -> list:
+    """
+    > It builds the querysets the ledger views and the posting engine run, with placeholder values
+    """
+    return [
+        ("account by pk and user (posting legs)", Account.objects.filter(pk=1, user_id=1)),
+        ("account by name (transfer receiver)", Account.objects.filter(name="account")),
+        ("account by user and name (account balance)", Account.objects.filter(name="account", user_id=1)),
+        ("accounts by name (batch)", Account.objects.filter(name__in=["account", "other-account"])),
+        ("accounts of a user", Account.objects.filter(user_id=1)),
+        ("user summary (user balance)", UserSummary.objects.filter(user_id=1)),
+        ("history by account", Transaction.objects.filter(account_id=1).order_by("date_created", "id")),
+        ("history by receiving account", Transaction.objects.filter(to_account_id=1).order_by("date_created", "id")),
+        ("history by user", Transaction.objects.filter(user_id=1).order_by("-date_created", "-id")),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Runs EXPLAIN on the ledger's view queries and fails if any of them scans a whole table."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Plans are only checked against SQLite, not {}.".format(connection.vendor))
+
+        slow = []
+
+        for label, queryset in view_queries():
+            plan = queryset.explain()
+            is_slow = bool(SLOW_PLAN.search(plan))
+
+            self.stdout.write("{} {}".format("SCAN" if is_slow else "ok  ", label))
+
+            for line in plan.splitlines():
+                self.stdout.write("       {}".format(line))
+
+            if is_slow:
+                slow.append(label)
+
+        if slow:
+            raise CommandError("{} queries scan instead of using an index: {}".format(len(slow), ", ".join(slow)))
+
+        self.stdout.write(self.style.SUCCESS("Every view query uses an index."))
@@ -0,0 +1,70 @@
+# Standard Library Imports
+import sys
+import time
+from datetime import datetime
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+# App Imports
+from ledger import history, settlement
+
+
+def parse_moment(value:str) -> datetime:
+    moment = parse_datetime(value)
+
+    if moment is None and parse_date(value) is not None:
+        moment = datetime.combine(parse_date(value), datetime.min.time())
+
+    if moment is None:
+        raise ValueError(value)
+
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
+
+
+class Command(BaseCommand):
+    help = "Streams the transactions created in a date range to a CSV or NDJSON settlement file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start", required=True, help="ISO date or datetime, inclusive.")
+        parser.add_argument("--to", dest="end", required=True, help="ISO date or datetime, exclusive.")
+        parser.add_argument("--format", choices=settlement.FORMATS, default="csv")
+        parser.add_argument("--output", default="-", help="The file to write, - for stdout.")
+        parser.add_argument("--chunk-size", type=int, default=history.EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            start, end = parse_moment(options["start"]), parse_moment(options["end"])
+        except ValueError as error:
+            raise CommandError("Invalid date: {}".format(error))
+
+        render = history.export_csv if options["format"] == "csv" else history.export_ndjson
+        output = sys.stdout if options["output"] == "-" else open(options["output"], "w", newline="", encoding="utf-8")
+        started = time.perf_counter()
+        rows = 0
+
+        def counted(source):
+            nonlocal rows
+
+            for row in source:
+                rows += 1
+
+                if not rows % options["chunk_size"]:
+                    elapsed = time.perf_counter() - started
+                    self.stderr.write("{} rows, {:.0f} rows/s".format(rows, rows / elapsed if elapsed else 0))
+
+                yield row
+
+        try:
+            for line in render(counted(settlement.export_rows(start, end, chunk_size=options["chunk_size"]))):
+                output.write(line)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+
+        elapsed = time.perf_counter() - started
+        self.stderr.write(self.style.SUCCESS(
+            "Exported {} transactions in {:.2f}s ({:.0f} rows/s).".format(rows, elapsed, rows / elapsed if elapsed else 0)
+        ))
@@ -0,0 +1,31 @@
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.text import slugify
+
+# App Imports
+from ledger.models import Account
+from ledger import cache, hot
+
+
+class Command(BaseCommand):
+    help = "Spreads an account's balance over slot rows, so concurrent postings to it do not all wait on one row. --slots 0 turns it back into a plain account."
+
+    def add_arguments(self, parser):
+        parser.add_argument("name", help="Name of the account.")
+        parser.add_argument("--slots", type=int, default=16, help="Number of balance slots. Throughput on the account grows with it.")
+
+    def handle(self, *args, **options):
+        if options["slots"] < 0:
+            raise CommandError("--slots cannot be negative.")
+
+        try:
+            account = cache.get_account(name=slugify(options["name"]))
+        except Account.DoesNotExist:
+            raise CommandError("Account {} does not exist.".format(options["name"]))
+
+        folded = hot.set_slots(account, options["slots"])
+
+        if folded:
+            self.stdout.write("Folded ₦{} from retired slots back into the account.".format(folded))
+
+        self.stdout.write(self.style.SUCCESS("Account {} has {} balance slots.".format(account.name, options["slots"])))
@@ -0,0 +1,68 @@
+# Standard Library Imports
+import csv
+import sys
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+
+# App Imports
+from ledger import settlement
+
+
+class Command(BaseCommand):
+    help = "Posts the deposits, withdrawals and transfers of a CSV or NDJSON settlement file, streaming it in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The settlement file, or - for stdin.")
+        parser.add_argument("--format", choices=settlement.FORMATS, default=None, help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=settlement.DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--errors", default=None, help="Write the rejected lines as CSV to this file.")
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or options["path"].rsplit(".", 1)[-1].lower()
+
+        if file_format not in settlement.FORMATS:
+            raise CommandError("Pass --format, the format of {} is not known.".format(options["path"]))
+
+        stream = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        errors = open(options["errors"], "w", newline="") if options["errors"] else None
+        error_writer = csv.writer(errors) if errors else None
+        started = time.perf_counter()
+        rows = failed = 0
+
+        try:
+            if error_writer:
+                error_writer.writerow(("line", "message"))
+
+            for results in settlement.import_rows(settlement.read_rows(stream, file_format), chunk_size=options["chunk_size"]):
+                for number, transaction_id, message in results:
+                    if transaction_id is None:
+                        failed += 1
+
+                        if error_writer:
+                            error_writer.writerow((number, message))
+                        else:
+                            self.stdout.write("line {}: {}".format(number, message))
+
+                rows += len(results)
+                elapsed = time.perf_counter() - started
+                self.stderr.write(
+                    "{} rows, {} rejected, {:.0f} rows/s".format(rows, failed, rows / elapsed if elapsed else 0)
+                )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+            if errors:
+                errors.close()
+
+        elapsed = time.perf_counter() - started
+        summary = "Posted {} of {} rows in {:.2f}s ({:.0f} rows/s).".format(
+            rows - failed, rows, elapsed, rows / elapsed if elapsed else 0
+        )
+
+        if failed:
+            raise CommandError(summary + " {} rows were rejected.".format(failed))
+
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,94 @@
+# Standard Library Imports
+import asyncio
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+
+# App Imports
+from ledger.benchmarks.harness import percentile
+from ledger.models import Account
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares requests/sec and latency of the synchronous views served over WSGI and ASGI with "
+        "the async views. Creates a throwaway user in the configured database and deletes it after."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+
+    def report(self, server:str, label:str, elapsed:float, latencies:list) -> None:
+        self.stdout.write(
+            "{:<11} {:<14} {:>8.1f} req/s   p50 {:>7.2f} ms   p99 {:>7.2f} ms".format(
+                server, label, len(latencies) / elapsed,
+                percentile(latencies, 0.5) * 1e3, percentile(latencies, 0.99) * 1e3,
+            )
+        )
+
+    def run_wsgi(self, user, method:str, path:str, data, requests:int, concurrency:int) -> tuple:
+        local = threading.local()
+
+        def send(_):
+            if not hasattr(local, "client"):
+                local.client = Client()
+                local.client.force_login(user)
+
+            started = time.perf_counter()
+            getattr(local.client, method)(path, data, content_type="application/json")
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(send, range(requests)))
+
+        return time.perf_counter() - started, latencies
+
+    def run_asgi(self, user, method:str, path:str, data, requests:int, concurrency:int) -> tuple:
+        client = AsyncClient()
+        client.force_login(user)
+
+        async def send(semaphore):
+            async with semaphore:
+                started = time.perf_counter()
+                await getattr(client, method)(path, data, content_type="application/json")
+                return time.perf_counter() - started
+
+        async def send_all():
+            semaphore = asyncio.Semaphore(concurrency)
+            return await asyncio.gather(*(send(semaphore) for _ in range(requests)))
+
+        started = time.perf_counter()
+        latencies = asyncio.run(send_all())
+        return time.perf_counter() - started, latencies
+
+    def handle(self, *args, **options):
+        requests, concurrency = options["requests"], options["concurrency"]
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            user = User.objects.create_user(username="loadtest-{}".format(uuid.uuid4().hex[:12]))
+            account = Account.objects.create(name=user.username, user=user)
+            deposit = {"account": account.pk, "amount": "1.00", "type": "deposit"}
+
+            endpoints = [
+                ("user balance", "get", "/api/user-balance/", "/api/async/user-balance/", None),
+                ("deposit", "post", "/api/deposit/", "/api/async/deposit/", deposit),
+            ]
+
+            try:
+                for label, method, sync_path, async_path, data in endpoints:
+                    get_data = data if method == "post" else {}
+
+                    self.report("wsgi", label, *self.run_wsgi(user, method, sync_path, get_data, requests, concurrency))
+                    self.report("asgi sync", label, *self.run_asgi(user, method, sync_path, get_data, requests, concurrency))
+                    self.report("asgi async", label, *self.run_asgi(user, method, async_path, get_data, requests, concurrency))
+            finally:
+                user.delete()
@@ -0,0 +1,16 @@
+# Django Imports
+from django.core.management.base import BaseCommand
+
+# App Imports
+from ledger import idempotency
+
+
+class Command(BaseCommand):
+    help = "Deletes expired idempotency keys. Meant to run periodically, e.g. from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = idempotency.prune(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS("Deleted {} expired idempotency keys.".format(deleted)))
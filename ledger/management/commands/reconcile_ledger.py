@@ -0,0 +1,56 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+
+# App Imports
+from ledger import reconciliation
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Recomputes every account's balance from the transactions table and reports mismatches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=reconciliation.DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--engine", choices=("auto", "numpy", "python"), default="auto")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+
+        try:
+            results = [
+                reconciliation.reconcile(chunk_size=options["chunk_size"], engine=options["engine"], using=shard)
+                for shard in get_shards()
+            ]
+        except ImportError as error:
+            raise CommandError(str(error))
+
+        result = reconciliation.ReconciliationResult(
+            engine=results[0].engine,
+            transactions=sum(result.transactions for result in results),
+            accounts=sum(result.accounts for result in results),
+            mismatches=[mismatch for result in results for mismatch in result.mismatches],
+        )
+
+        elapsed = time.perf_counter() - started
+
+        for mismatch in result.mismatches:
+            self.stdout.write(
+                "account {}: stored {} != expected {}".format(
+                    mismatch.account_id, mismatch.stored, mismatch.expected
+                )
+            )
+
+        self.stdout.write(
+            "Checked {} transactions and {} accounts with the {} engine in {:.2f}s ({:.0f} rows/s).".format(
+                result.transactions, result.accounts, result.engine, elapsed,
+                result.transactions / elapsed if elapsed else 0,
+            )
+        )
+
+        if result.mismatches:
+            raise CommandError("{} accounts do not match their transactions.".format(len(result.mismatches)))
+
+        self.stdout.write(self.style.SUCCESS("Every account matches its transactions."))
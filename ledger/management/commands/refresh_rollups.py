@@ -0,0 +1,28 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand
+
+# App Imports
+from ledger import rollups
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Rolls the journal entries written since the last run up into per-account daily totals. Meant to run periodically."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=rollups.DEFAULT_CHUNK_SIZE, help="Journal entries rolled up per transaction.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = 0
+
+        for shard in get_shards():
+            written += rollups.refresh(chunk_size=options["chunk_size"], using=shard)
+            self.stdout.write("{}: rollups up to journal entry {}.".format(shard, rollups.high_water_mark(using=shard)))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Wrote {} daily rollups in {:.2f}s.".format(written, time.perf_counter() - started)
+        ))
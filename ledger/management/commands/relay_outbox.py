@@ -0,0 +1,22 @@
+# Django Imports
+from django.core.management.base import BaseCommand
+
+# App Imports
+from ledger import outbox
+
+
+class Command(BaseCommand):
+    help = "Delivers the cross-shard transfers whose credit did not reach the receiving shard, refunding those whose receiving account does not exist. Meant to run periodically."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--limit", type=int, default=None, help="Messages read per shard.")
+
+    def handle(self, *args, **options):
+        delivered, refunded = outbox.relay(limit=options["limit"])
+
+        if refunded:
+            self.stdout.write(self.style.WARNING(
+                "Refunded {} transfers whose receiving account does not exist.".format(refunded)
+            ))
+
+        self.stdout.write(self.style.SUCCESS("Delivered {} outbox messages.".format(delivered)))
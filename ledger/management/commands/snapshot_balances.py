@@ -0,0 +1,28 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand
+
+# App Imports
+from ledger import journal
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Snapshots the balance of every account with journal entries since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=journal.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        taken = 0
+
+        for shard in get_shards():
+            taken += journal.take_snapshots(chunk_size=options["chunk_size"], using=shard)
+            self.stdout.write("{}: snapshots up to journal entry {}.".format(shard, journal.high_water_mark(using=shard)))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Took {} snapshots in {:.2f}s.".format(taken, time.perf_counter() - started)
+        ))
@@ -0,0 +1,46 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections
+
+# App Imports
+from ledger import replicas
+
+
+class Command(BaseCommand):
+    help = "Refreshes SQLite replica files from their primaries, standing in for replication in local setups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--interval", type=float, default=None, help="Keep syncing every INTERVAL seconds.")
+
+    def handle(self, *args, **options):
+        pairs = [
+            (primary, replica)
+            for primary, aliases in replicas.get_options()["DATABASES"].items()
+            for replica in aliases
+        ]
+
+        if not pairs:
+            raise CommandError("No replicas are configured, see LEDGER_READ_REPLICAS.")
+
+        if any(connections[alias].vendor != "sqlite" for pair in pairs for alias in pair):
+            raise CommandError("Only SQLite replicas can be synced by copying.")
+
+        while True:
+            for primary, replica in pairs:
+                try:
+                    seconds, entries = replicas.lag(primary, replica)
+                except DatabaseError:
+                    seconds, entries = 0.0, "all"
+
+                replicas.copy_sqlite(primary, replica)
+                self.stdout.write("{} -> {}: caught up {} entries, {:.2f}s behind.".format(primary, replica, entries, seconds))
+
+            if options["interval"] is None:
+                break
+
+            time.sleep(options["interval"])
+
+        self.stdout.write(self.style.SUCCESS("Synced {} replicas.".format(len(pairs))))
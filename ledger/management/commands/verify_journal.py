@@ -0,0 +1,55 @@
+# Standard Library Imports
+import time
+
+# Django Imports
+from django.core.management.base import BaseCommand, CommandError
+
+# App Imports
+from ledger import journal
+from ledger.sharding import get_shards
+
+
+class Command(BaseCommand):
+    help = "Checks every account's available amount against the journal and that every transaction balances."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=journal.DEFAULT_CHUNK_SIZE)
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Replay the whole journal instead of starting from the latest snapshots.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        results = [
+            journal.verify(full=options["full"], chunk_size=options["chunk_size"], using=shard)
+            for shard in get_shards()
+        ]
+        result = journal.VerificationResult(
+            accounts=sum(result.accounts for result in results),
+            mismatches=[mismatch for result in results for mismatch in result.mismatches],
+            unbalanced=[transaction_id for result in results for transaction_id in result.unbalanced],
+        )
+
+        for mismatch in result.mismatches:
+            self.stdout.write(
+                "account {}: stored {} != journal {}".format(
+                    mismatch.account_id, mismatch.stored, mismatch.expected
+                )
+            )
+
+        for transaction_id in result.unbalanced:
+            self.stdout.write("transaction {}: entries do not sum to zero".format(transaction_id))
+
+        self.stdout.write(
+            "Checked {} accounts in {:.2f}s.".format(result.accounts, time.perf_counter() - started)
+        )
+
+        if result.mismatches or result.unbalanced:
+            raise CommandError(
+                "{} accounts and {} transactions disagree with the journal.".format(
+                    len(result.mismatches), len(result.unbalanced)
+                )
+            )
+
+        self.stdout.write(self.style.SUCCESS("Every account matches the journal."))
@@ -0,0 +1,253 @@
+# Standard Library Imports
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+# Django Imports
+from django.conf import settings
+from django.db import connections
+
+# App Imports
+from ledger import admission, authentication, cache, group_commit, hot, pool, posting, replicas
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_METRICS = {
+    "ENABLED": True,
+    "SAMPLE_RATE": 0.1,
+}
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+QUERY_BUCKETS = (0, 1, 2, 4, 6, 8, 12, 16, 32, 64, 128)
+
+
+def get_options() -> dict:
+    return {**DEFAULT_METRICS, **getattr(settings, "LEDGER_METRICS", {})}
+
+
+class Sample:
+    """
+    The database, serializer and rendering work of one sampled request. It is installed with
+    `connection.execute_wrapper`, so every query run on the request's thread passes through it.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+# The sample of the request being handled, None when it is not sampled
+current = contextvars.ContextVar("ledger_metrics_sample", default=None)
+
+
+@contextmanager
+def count_queries(sample:Sample):
+    """
+    > It installs the sample on every configured database connection of the calling thread, and
+    does nothing when the request is not sampled
+
+    :param sample: The sample of the request, or None
+    :type sample: Sample
+    """
+    with ExitStack() as stack:
+        if sample is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(sample))
+
+        yield
+
+
+@contextmanager
+def timed(field:str):
+    """
+    > It adds the time spent in the block, or in the decorated function, to one of the times of
+    the sampled request, and does nothing when the request is not sampled
+
+    :param field: The `Sample` attribute to add to, e.g. `serializer_seconds`
+    :type field: str
+    """
+    sample = current.get()
+
+    if sample is None:
+        yield
+        return
+
+    started = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        setattr(sample, field, getattr(sample, field) + time.perf_counter() - started)
+
+
+class Histogram:
+    """
+    A Prometheus histogram with one series per label set. Bucket counts are kept
+    non-cumulative and summed up when rendered.
+    """
+
+    def __init__(self, name:str, help_text:str, buckets:tuple):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.series = {}
+
+    def observe(self, labels:tuple, value:float) -> None:
+        with self._lock:
+            counts, total = self.series.get(labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.series[labels] = (counts, total + value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.series = {}
+
+    def render(self, label_names:tuple) -> list:
+        lines = [
+            "# HELP {} {}".format(self.name, self.help_text),
+            "# TYPE {} histogram".format(self.name),
+        ]
+
+        with self._lock:
+            series = sorted((labels, list(counts), total) for labels, (counts, total) in self.series.items())
+
+        for labels, counts, total in series:
+            label_text = ",".join('{}="{}"'.format(name, escape(value)) for name, value in zip(label_names, labels))
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(self.name, label_text, bound, cumulative))
+
+            lines.append("{}_sum{{{}}} {}".format(self.name, label_text, total))
+            lines.append("{}_count{{{}}} {}".format(self.name, label_text, cumulative))
+
+        return lines
+
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+LABELS = ("view", "method")
+
+request_seconds = Histogram("ledger_request_seconds", "Total time spent handling sampled requests.", SECONDS_BUCKETS)
+db_seconds = Histogram("ledger_db_seconds", "Time spent in SQL queries per sampled request.", SECONDS_BUCKETS)
+serializer_seconds = Histogram(
+    "ledger_serializer_seconds", "Time spent validating and representing data in compiled serializers per sampled request.",
+    SECONDS_BUCKETS,
+)
+render_seconds = Histogram("ledger_render_seconds", "Time spent rendering the response body per sampled request.", SECONDS_BUCKETS)
+db_queries = Histogram("ledger_db_queries", "SQL queries per sampled request.", QUERY_BUCKETS)
+
+HISTOGRAMS = (request_seconds, db_seconds, serializer_seconds, render_seconds, db_queries)
+
+
+def observe(view:str, method:str, sample:Sample, total_seconds:float) -> None:
+    labels = (view, method)
+    request_seconds.observe(labels, total_seconds)
+    db_seconds.observe(labels, sample.db_seconds)
+    serializer_seconds.observe(labels, sample.serializer_seconds)
+    render_seconds.observe(labels, sample.render_seconds)
+    db_queries.observe(labels, sample.queries)
+
+
+def reset() -> None:
+    for histogram in HISTOGRAMS:
+        histogram.clear()
+
+
+def counters(prefix:str, help_text:str, snapshot:dict, gauges:tuple=()) -> list:
+    """
+    > It renders a stats snapshot, the values named in `gauges` as gauges and the rest, which
+    only ever grow, as counters
+    """
+    lines = []
+
+    for name, value in sorted(snapshot.items()):
+        kind = "gauge" if name in gauges else "counter"
+        metric = "{}_{}{}".format(prefix, name, "_total" if kind == "counter" else "")
+        lines.append("# HELP {} {}".format(metric, help_text))
+        lines.append("# TYPE {} {}".format(metric, kind))
+        lines.append("{} {}".format(metric, value))
+
+    return lines
+
+
+def replica_lags() -> list:
+    lines = [
+        "# HELP ledger_replica_lag_seconds Age of the oldest journal entry a replica does not have yet.",
+        "# TYPE ledger_replica_lag_seconds gauge",
+        "# HELP ledger_replica_lag_entries Journal entries a replica does not have yet.",
+        "# TYPE ledger_replica_lag_entries gauge",
+    ]
+
+    for (primary, replica), (seconds, entries) in sorted(replicas.lags().items()):
+        labels = 'primary="{}",replica="{}"'.format(escape(primary), escape(replica))
+        lines.append("ledger_replica_lag_seconds{{{}}} {}".format(labels, seconds))
+        lines.append("ledger_replica_lag_entries{{{}}} {}".format(labels, entries))
+
+    return lines
+
+
+def pool_metrics() -> list:
+    """
+    > It renders the state and counters of every database connection pool, labelled with the
+    database alias
+    """
+    snapshots = pool.snapshots()
+    lines = []
+
+    for name in sorted({name for snapshot in snapshots.values() for name in snapshot}):
+        kind = "gauge" if name in pool.GAUGES else "counter"
+        metric = "ledger_db_pool_{}{}".format(name, "_total" if kind == "counter" else "")
+        lines.append("# HELP {} Database connection pool {}, see ledger.pool.".format(metric, kind))
+        lines.append("# TYPE {} {}".format(metric, kind))
+
+        for alias, snapshot in sorted(snapshots.items()):
+            lines.append('{}{{alias="{}"}} {}'.format(metric, escape(alias), snapshot[name]))
+
+    return lines
+
+
+def render() -> str:
+    """
+    > It renders the request histograms, the sample rate they were taken at and the counters of
+    the posting engine, the account cache and the group commit writer in the Prometheus text
+    exposition format, with the lag of every read replica measured at scrape time and the state
+    of the database connection pools
+    """
+    lines = [
+        "# HELP ledger_metrics_sample_rate Fraction of requests recorded in the request histograms.",
+        "# TYPE ledger_metrics_sample_rate gauge",
+        "ledger_metrics_sample_rate {}".format(get_options()["SAMPLE_RATE"]),
+    ]
+
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render(LABELS))
+
+    lines.extend(counters("ledger_posting", "Posting engine counter, see ledger.posting.", posting.stats.snapshot()))
+    lines.extend(counters("ledger_account_cache", "Account cache counter, see ledger.cache.", cache.stats.snapshot(), cache.GAUGES))
+    lines.extend(counters("ledger_api_key_cache", "API key cache counter, see ledger.authentication.", authentication.stats.snapshot(), authentication.GAUGES))
+    lines.extend(counters("ledger_group_commit", "Group commit counter, see ledger.group_commit.", group_commit.stats.snapshot(), group_commit.GAUGES))
+    lines.extend(counters("ledger_replica", "Read routing counter, see ledger.replicas.", replicas.stats.snapshot()))
+    lines.extend(counters("ledger_hot_account", "Hot account posting counter, see ledger.hot.", hot.stats.snapshot()))
+    lines.extend(counters("ledger_admission", "Admission control counter, see ledger.admission.", admission.stats.snapshot()))
+    lines.extend(replica_lags())
+    lines.extend(pool_metrics())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,126 @@
+# Standard Library Imports
+import asyncio
+import random
+import time
+
+# Django Imports
+from asgiref.sync import sync_to_async
+
+# App Imports
+from ledger import metrics, replicas
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class HybridMiddleware:
+    """
+    A middleware that runs in whichever mode the rest of the chain uses, so Django never has to
+    adapt it (or the handler under it) with `sync_to_async`/`async_to_sync`. Subclasses implement
+    both `handle` and `ahandle`.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if asyncio.iscoroutinefunction(get_response):
+            # Marks the instance as a coroutine function, as Django's `MiddlewareMixin` does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.ahandle(request)
+
+        return self.handle(request)
+
+
+class QueryMetricsMiddleware(HybridMiddleware):
+    """
+    Records the query count, database, serializer, render and total time of a sampled fraction
+    of requests into the histograms of `ledger.metrics`, labelled by view name and method.
+    Queries are counted with `connection.execute_wrapper` on every configured database of the
+    request's thread. Under ASGI the request's database work runs on other threads, so only the
+    queries `ledger.async_views.run_db` runs there are counted.
+    """
+
+    def handle(self, request):
+        if not self.sampled():
+            return self.get_response(request)
+
+        sample = metrics.Sample()
+        token = metrics.current.set(sample)
+        started = time.perf_counter()
+
+        try:
+            with metrics.count_queries(sample):
+                response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+
+        self.observe(request, sample, started)
+        return response
+
+    async def ahandle(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        sample = metrics.Sample()
+        token = metrics.current.set(sample)
+        started = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+
+        self.observe(request, sample, started)
+        return response
+
+    def sampled(self) -> bool:
+        options = metrics.get_options()
+        return options["ENABLED"] and random.random() < options["SAMPLE_RATE"]
+
+    def observe(self, request, sample:metrics.Sample, started:float) -> None:
+        match = getattr(request, "resolver_match", None)
+        metrics.observe(
+            match.view_name if match else "unmatched", request.method, sample,
+            time.perf_counter() - started,
+        )
+
+
+class ReplicaPinningMiddleware(HybridMiddleware):
+    """
+    Pins a user's replica-eligible reads to the primary for `STICKY_SECONDS` after any successful
+    unsafe request of theirs, so a balance read right after a posting never comes from a replica
+    that has not caught up. DRF sets the user it authenticated on the underlying request, so API
+    key and basic auth users are pinned too.
+    """
+
+    def handle(self, request):
+        response = self.get_response(request)
+
+        if self.should_pin(request, response):
+            self.pin(request)
+
+        return response
+
+    async def ahandle(self, request):
+        response = await self.get_response(request)
+
+        # The user may still be the lazy session user, and the shared pins live in a Django cache
+        if self.should_pin(request, response):
+            await sync_to_async(self.pin)(request)
+
+        return response
+
+    def should_pin(self, request, response) -> bool:
+        return request.method not in SAFE_METHODS and response.status_code < 400 and \
+            any(replicas.get_options()["DATABASES"].values())
+
+    def pin(self, request) -> None:
+        user = getattr(request, "user", None)
+
+        if user is not None and user.is_authenticated:
+            replicas.pin(user.pk)
@@ -0,0 +1,39 @@
+# Generated by Django 4.0.5 on 2026-10-18 19:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def count_accounts(apps, schema_editor):
+    Account = apps.get_model("ledger", "Account")
+    UserSummary = apps.get_model("ledger", "UserSummary")
+
+    UserSummary.objects.bulk_create(
+        UserSummary(user_id=row["user"], account_count=row["count"])
+        for row in Account.objects.values("user").annotate(count=models.Count("id"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ledger', '0008_alter_account_user_alter_transaction_to_user_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('account_count', models.PositiveIntegerField(default=0)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'User Summaries',
+                'db_table': 'user_summaries',
+            },
+        ),
+        migrations.RunPython(count_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.5 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+def sum_balances(apps, schema_editor):
+    Account = apps.get_model("ledger", "Account")
+    UserSummary = apps.get_model("ledger", "UserSummary")
+
+    for row in Account.objects.values("user").annotate(total=models.Sum("available_amount")):
+        UserSummary.objects.filter(user_id=row["user"]).update(balance=row["total"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0009_usersummary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersummary',
+            name='balance',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.RunPython(sum_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.5 on 2026-10-18 19:52
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def round_to_minor_units(apps, schema_editor):
+    for model_name, field_name in (
+        ("Account", "available_amount"),
+        ("Transaction", "amount"),
+        ("UserSummary", "balance"),
+    ):
+        apps.get_model("ledger", model_name).objects.update(
+            **{field_name: Round(models.F(field_name), 2)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0010_usersummary_balance'),
+    ]
+
+    operations = [
+        migrations.RunPython(round_to_minor_units, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='account',
+            name='available_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19),
+        ),
+        migrations.AlterField(
+            model_name='usersummary',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19),
+        ),
+    ]
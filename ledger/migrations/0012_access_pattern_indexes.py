@@ -0,0 +1,52 @@
+# Generated by Django 4.0.5 on 2026-10-18 19:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ledger', '0011_money_decimal'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='account',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='account',
+            field=models.ForeignKey(db_index=False, help_text='sender', null=True, on_delete=django.db.models.deletion.CASCADE, to='ledger.account'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='to_account',
+            field=models.ForeignKey(db_index=False, help_text='receiver', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transfer_to', to='ledger.account'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='user',
+            field=models.ForeignKey(db_index=False, help_text='sender', null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['user', 'name'], name='accounts_user_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['account', 'date_created', 'id'], name='transactions_account_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['to_account', 'date_created', 'id'], name='transactions_to_acct_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date_created', 'id'], name='transactions_user_date_idx'),
+        ),
+    ]
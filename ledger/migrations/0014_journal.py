@@ -0,0 +1,65 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def open_balances(apps, schema_editor):
+    # Earlier history cannot be replayed into signed legs, so every account starts the journal
+    # with its current balance, brought in from outside the ledger
+    Account = apps.get_model("ledger", "Account")
+    JournalEntry = apps.get_model("ledger", "JournalEntry")
+    entries = []
+
+    for pk, balance in Account.objects.exclude(available_amount=0).values_list("pk", "available_amount").iterator():
+        entries.append(JournalEntry(account_id=pk, amount=balance))
+        entries.append(JournalEntry(account_id=None, amount=-balance))
+
+    JournalEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0013_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JournalEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, help_text='credit if positive, debit if negative', max_digits=19)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(db_index=False, help_text='null for money entering or leaving the ledger', null=True, on_delete=django.db.models.deletion.CASCADE, to='ledger.account')),
+                ('transaction', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='ledger.transaction')),
+            ],
+            options={
+                'verbose_name_plural': 'Journal Entries',
+                'db_table': 'journal_entries',
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=19)),
+                ('last_entry_id', models.BigIntegerField(db_index=True, help_text='the last journal entry included in the balance')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='ledger.account')),
+            ],
+            options={
+                'verbose_name_plural': 'Balance Snapshots',
+                'db_table': 'balance_snapshots',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='journalentry',
+            index=models.Index(fields=['account', 'id'], name='journal_account_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='balancesnapshot',
+            index=models.Index(fields=['account', 'date_created'], name='snapshots_account_date_idx'),
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
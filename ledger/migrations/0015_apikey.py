@@ -0,0 +1,33 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ledger', '0014_journal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApiKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, max_length=255)),
+                ('prefix', models.CharField(help_text='public part of the key, used to look it up', max_length=16, unique=True)),
+                ('digest', models.CharField(help_text='sha256 of the whole key', max_length=64)),
+                ('revoked', models.BooleanField(default=False)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='api_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'API Keys',
+                'db_table': 'api_keys',
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0015_apikey'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transaction',
+            name='account',
+            field=models.ForeignKey(db_constraint=False, db_index=False, help_text='sender', null=True, on_delete=django.db.models.deletion.CASCADE, to='ledger.account'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='to_account',
+            field=models.ForeignKey(db_constraint=False, db_index=False, help_text='receiver', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='transfer_to', to='ledger.account'),
+        ),
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('destination', models.CharField(help_text='database alias of the receiving shard', max_length=100)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('date_delivered', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='outbox_message', to='ledger.transaction')),
+            ],
+            options={
+                'verbose_name_plural': 'Outbox Messages',
+                'db_table': 'outbox_messages',
+            },
+        ),
+        migrations.CreateModel(
+            name='InboxMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='database alias of the sending shard', max_length=100)),
+                ('message_id', models.BigIntegerField(help_text='the OutboxMessage on the sending shard')),
+                ('date_created', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_message', to='ledger.transaction')),
+            ],
+            options={
+                'verbose_name_plural': 'Inbox Messages',
+                'db_table': 'inbox_messages',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='inboxmessage',
+            constraint=models.UniqueConstraint(fields=('source', 'message_id'), name='inbox_messages_source_message_uniq'),
+        ),
+    ]
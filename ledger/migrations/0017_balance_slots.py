@@ -0,0 +1,32 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:32
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0016_sharding'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slot', models.PositiveSmallIntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19)),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='balance_slots', to='ledger.account')),
+            ],
+            options={
+                'verbose_name_plural': 'Balance Slots',
+                'db_table': 'balance_slots',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='balanceslot',
+            constraint=models.UniqueConstraint(fields=('account', 'slot'), name='balance_slots_account_slot_uniq'),
+        ),
+    ]
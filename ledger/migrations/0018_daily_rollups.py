@@ -0,0 +1,37 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:35
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0017_balance_slots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('credits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19)),
+                ('debits', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='total of the debits, as a positive amount', max_digits=19)),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('opening_balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19)),
+                ('closing_balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=19)),
+                ('last_entry_id', models.BigIntegerField(db_index=True, help_text='the last journal entry included in the rollups')),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='ledger.account')),
+            ],
+            options={
+                'verbose_name_plural': 'Daily Rollups',
+                'db_table': 'daily_rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(fields=('account', 'day'), name='daily_rollups_account_day_uniq'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0018_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inboxmessage',
+            name='transaction',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='inbox_message', to='ledger.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='journalentry',
+            name='transaction',
+            field=models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='ledger.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='transaction',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_message', to='ledger.transaction'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.0.5 on 2026-10-18 20:59
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0019_archive_transactions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='response',
+            field=models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, null=True),
+        ),
+        migrations.AlterField(
+            model_name='idempotencykey',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(help_text='null while the request claiming the key runs', null=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.0.5 on 2026-10-18 21:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0020_idempotency_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='date_failed',
+            field=models.DateTimeField(blank=True, help_text='set once the receiver turned out not to exist', null=True),
+        ),
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='refund',
+            field=models.OneToOneField(blank=True, db_constraint=False, help_text='the credit back to the sender of a failed message', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='refunded_message', to='ledger.transaction'),
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='type',
+            field=models.CharField(choices=[('deposit', 'desposit'), ('withdraw', 'withdraw'), ('transfer', 'transfer'), ('refund', 'refund')], max_length=10),
+        ),
+    ]
@@ -1,17 +1,118 @@
 # Django Imports
-from django.db import models
+from decimal import Decimal
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, router, transaction
+from django.db.models import F, Sum
 from django.contrib.auth.models import User
 from django.forms import ValidationError
 from django.utils.text import slugify
 
 # App Imports
+from ledger.sharding import ShardedQuerySet, get_shards, shard_for_user
 from ledger.timestamps import TimeStampModel
+
+
+MAX_ACCOUNTS_PER_USER = 10
+
+# Money is stored as fixed-point decimals with this many digits after the point
+MONEY_MAX_DIGITS = 19
+MONEY_DECIMAL_PLACES = 2
+ZERO = Decimal("0.00")
+
+
+class UserSummary(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="ledger_summary")
+    account_count = models.PositiveIntegerField(default=0)
+    balance = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    
+    def __str__(self) -> str:
+        return "{}'s summary".format(self.user)
+    
+    @classmethod
+    def reserve_account(cls, user_id:int, balance:Decimal=ZERO) -> None:
+        """
+        > It takes one of the user's account slots with a single conditional UPDATE, creating the
+        summary row the first time the user opens an account
+        
+        :param user_id: The primary key of the user opening an account
+        :type user_id: int
+        :param balance: The opening balance of the new account
+        :type balance: Decimal
+        """
+        summaries = cls.objects.using(shard_for_user(user_id))
+        
+        def increment() -> int:
+            return summaries.filter(
+                user_id=user_id, account_count__lt=MAX_ACCOUNTS_PER_USER
+            ).update(account_count=F("account_count") + 1, balance=F("balance") + balance)
+        
+        if not increment():
+            summaries.get_or_create(user_id=user_id)
+            
+            if not increment():
+                raise ValidationError("You can only have {} accounts!".format(MAX_ACCOUNTS_PER_USER))
+    
+    @classmethod
+    def release_account(cls, user_id:int, balance:Decimal=ZERO) -> None:
+        cls.objects.using(shard_for_user(user_id)).filter(user_id=user_id, account_count__gt=0)\
+            .update(account_count=F("account_count") - 1, balance=F("balance") - balance)
+    
+    @classmethod
+    def live_balances(cls, using:str=None) -> dict:
+        return dict(
+            Account.objects.using(using).values("user").annotate(total=Sum("available_amount"))
+            .values_list("user", "total")
+        )
+    
+    @classmethod
+    def find_drift(cls, tolerance:Decimal=ZERO, using:str=None) -> list:
+        """
+        > It compares every user's maintained balance with the live sum of their accounts
+        
+        :param tolerance: The largest difference that is not reported
+        :type tolerance: Decimal
+        :param using: The shard to check
+        :type using: str
+        :return: A list of `(user_id, summary balance, live balance)` tuples that disagree
+        """
+        live = cls.live_balances(using=using)
+        summaries = dict(cls.objects.using(using).values_list("user_id", "balance"))
+        
+        return [
+            (user_id, summaries.get(user_id), live.get(user_id, ZERO))
+            for user_id in sorted(set(live) | set(summaries))
+            if summaries.get(user_id) is None
+            or abs(summaries[user_id] - live.get(user_id, ZERO)) > tolerance
+        ]
+    
+    @classmethod
+    def rebuild(cls, user_ids:list, using:str=None) -> None:
+        """
+        > It resets the balances of the given users to the live sum of their accounts
+        """
+        with transaction.atomic(using=using):
+            live = cls.live_balances(using=using)
+            
+            for user_id in user_ids:
+                cls.objects.using(using).update_or_create(
+                    user_id=user_id,
+                    defaults={
+                        "balance": live.get(user_id, ZERO),
+                        "account_count": Account.objects.using(using).filter(user_id=user_id).count(),
+                    },
+                )
+    
+    class Meta:
+        verbose_name_plural = "User Summaries"
+        db_table = "user_summaries"
            
             
 class Account(TimeStampModel):
     name = models.CharField(max_length=255, unique=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    available_amount = models.FloatField(default=0.0)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    available_amount = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    
+    objects = ShardedQuerySet.as_manager()
     
     def __str__(self) -> str:
         return self.name
@@ -21,17 +122,50 @@ class Account(TimeStampModel):
         if self.name:
             self.name = slugify(self.name)
         
-         
-        user_accounts = Account.objects.filter(user=self.user)
+        # Only a new account takes one of the user's slots, balance updates cost no extra query
+        if not self._state.adding:
+            return super(Account, self).save(*args, **kwargs)
         
-        if user_accounts.count() > 10:
-            raise ValidationError("You can only have 10 accounts!")
+        using = kwargs.get("using") or router.db_for_write(Account, instance=self)
         
-        super(Account, self).save(*args, **kwargs)
+        with transaction.atomic(using=using):
+            # Names are unique within a shard's table, so a sharded ledger also checks the others
+            for shard in get_shards():
+                if shard != using and Account.objects.using(shard).filter(name=self.name).exists():
+                    raise ValidationError("An account named {} already exists!".format(self.name))
+            
+            UserSummary.reserve_account(self.user_id, balance=self.available_amount)
+            super(Account, self).save(*args, **kwargs)
+            
+            # An opening balance comes from outside the ledger, so it is journaled as such
+            if self.available_amount:
+                JournalEntry.record([(self.pk, self.available_amount)], using=using)
         
     class Meta:
         verbose_name_plural = "User Accounts"
         db_table = "accounts"
+        # (user, name) also serves the user-only lookups, so the FK gets no index of its own
+        indexes = [
+            models.Index(fields=["user", "name"], name="accounts_user_name_idx"),
+        ]
+        
+        
+class BalanceSlot(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, related_name="balance_slots", db_index=False)
+    slot = models.PositiveSmallIntegerField()
+    amount = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    
+    def __str__(self) -> str:
+        return "{}'s balance slot {}".format(self.account, self.slot)
+    
+    class Meta:
+        verbose_name_plural = "Balance Slots"
+        db_table = "balance_slots"
+        # Part of a hot account's balance, see ledger.hot; the account's balance is its available
+        # amount plus the amounts of its slots
+        constraints = [
+            models.UniqueConstraint(fields=["account", "slot"], name="balance_slots_account_slot_uniq"),
+        ]
         
         
 class Transaction(TimeStampModel):
@@ -39,20 +173,198 @@ class Transaction(TimeStampModel):
     TRANSACTION_TYPES = (
         ("deposit", "desposit"),
         ("withdraw", "withdraw"),
-        ("transfer", "transfer")
+        ("transfer", "transfer"),
+        ("refund", "refund")
     )
-    account = models.ForeignKey(Account, on_delete=models.CASCADE, help_text="sender", null=True)
-    to_account = models.ForeignKey(Account, on_delete=models.CASCADE, help_text="receiver", null=True, related_name="transfer_to")
+    # A transfer between shards refers to an account of the other shard, so neither is a constraint
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, help_text="sender", null=True, db_index=False, db_constraint=False)
+    to_account = models.ForeignKey(Account, on_delete=models.CASCADE, help_text="receiver", null=True, related_name="transfer_to", db_index=False, db_constraint=False)
     slug = models.SlugField(null=True)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="sender", null=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="sender", null=True, db_index=False)
     to_user = models.ForeignKey(User, on_delete=models.CASCADE, help_text="receiver", null=True, related_name="to_user")
-    amount = models.FloatField(default=0.0)
+    amount = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
     type = models.CharField(choices=TRANSACTION_TYPES, max_length=10)
     
+    objects = ShardedQuerySet.as_manager()
+    
     def __str__(self) -> str:
         return "{}'s transaction".format(self.account)
         
     class Meta:
         verbose_name_plural = "User Transactions"
         db_table = "transactions"
+        # History is read per account, receiving account or user, newest or oldest first, with the
+        # id as the keyset tie-breaker. The composites replace the plain FK indexes.
+        indexes = [
+            models.Index(fields=["account", "date_created", "id"], name="transactions_account_date_idx"),
+            models.Index(fields=["to_account", "date_created", "id"], name="transactions_to_acct_date_idx"),
+            models.Index(fields=["user", "date_created", "id"], name="transactions_user_date_idx"),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64, help_text="sha256 of the request")
+    status_code = models.PositiveSmallIntegerField(null=True, help_text="null while the request claiming the key runs")
+    response = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self) -> str:
+        return "{}'s idempotency key {}".format(self.user, self.key)
+    
+    class Meta:
+        verbose_name_plural = "Idempotency Keys"
+        db_table = "idempotency_keys"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="idempotency_keys_user_key_uniq"),
+        ]
+
+
+class JournalEntry(models.Model):
+    # Archived transactions leave `transactions` while their entries stay, see ledger.archive
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, null=True, related_name="entries", db_constraint=False)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, null=True, db_index=False, help_text="null for money entering or leaving the ledger")
+    amount = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, help_text="credit if positive, debit if negative")
+    date_created = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self) -> str:
+        return "{} {} on {}".format("credit" if self.amount > 0 else "debit", abs(self.amount), self.account)
     
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValidationError("Journal entries cannot be changed!")
+        
+        super(JournalEntry, self).save(*args, **kwargs)
+        
+    def delete(self, *args, **kwargs):
+        raise ValidationError("Journal entries cannot be deleted!")
+    
+    @classmethod
+    def entries_for(cls, changes:list, transaction_id:int=None) -> list:
+        """
+        > It builds one entry per `(account_id, amount)` change, plus a counter-entry without an
+        account for whatever the changes do not net to, so every posting sums to zero
+        
+        :param changes: The signed amount added to each account
+        :type changes: list
+        :param transaction_id: The primary key of the `Transaction` the changes belong to
+        :type transaction_id: int
+        :return: A list of unsaved journal entries
+        """
+        entries = [
+            cls(transaction_id=transaction_id, account_id=account_id, amount=amount)
+            for account_id, amount in changes
+        ]
+        outside = sum((amount for _, amount in changes), ZERO)
+        
+        if outside:
+            entries.append(cls(transaction_id=transaction_id, account_id=None, amount=-outside))
+        
+        return entries
+    
+    @classmethod
+    def record(cls, changes:list, transaction_id:int=None, using:str=None) -> list:
+        return cls.objects.using(using).bulk_create(cls.entries_for(changes, transaction_id=transaction_id))
+    
+    class Meta:
+        verbose_name_plural = "Journal Entries"
+        db_table = "journal_entries"
+        # Balances are replayed per account in entry order, from a snapshot's last entry onwards
+        indexes = [
+            models.Index(fields=["account", "id"], name="journal_account_id_idx"),
+        ]
+
+
+class BalanceSnapshot(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, db_index=False)
+    balance = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES)
+    last_entry_id = models.BigIntegerField(db_index=True, help_text="the last journal entry included in the balance")
+    date_created = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self) -> str:
+        return "{}'s balance at entry {}".format(self.account, self.last_entry_id)
+    
+    class Meta:
+        verbose_name_plural = "Balance Snapshots"
+        db_table = "balance_snapshots"
+        indexes = [
+            models.Index(fields=["account", "date_created"], name="snapshots_account_date_idx"),
+        ]
+
+
+class DailyRollup(models.Model):
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, db_index=False)
+    day = models.DateField()
+    credits = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    debits = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO, help_text="total of the debits, as a positive amount")
+    entries = models.PositiveIntegerField(default=0)
+    opening_balance = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    closing_balance = models.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, default=ZERO)
+    last_entry_id = models.BigIntegerField(db_index=True, help_text="the last journal entry included in the rollups")
+    
+    def __str__(self) -> str:
+        return "{}'s rollup of {}".format(self.account, self.day)
+    
+    class Meta:
+        verbose_name_plural = "Daily Rollups"
+        db_table = "daily_rollups"
+        # (account, day) serves the statement range reads
+        constraints = [
+            models.UniqueConstraint(fields=["account", "day"], name="daily_rollups_account_day_uniq"),
+        ]
+
+
+class ApiKey(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="api_keys")
+    name = models.CharField(max_length=255, blank=True)
+    prefix = models.CharField(max_length=16, unique=True, help_text="public part of the key, used to look it up")
+    digest = models.CharField(max_length=64, help_text="sha256 of the whole key")
+    revoked = models.BooleanField(default=False)
+    expires_at = models.DateTimeField(null=True, blank=True)
+    date_created = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self) -> str:
+        return "{}'s API key {}".format(self.user, self.prefix)
+    
+    class Meta:
+        verbose_name_plural = "API Keys"
+        db_table = "api_keys"
+
+
+class OutboxMessage(models.Model):
+    transaction = models.OneToOneField(Transaction, on_delete=models.CASCADE, related_name="outbox_message", db_constraint=False)
+    destination = models.CharField(max_length=100, help_text="database alias of the receiving shard")
+    attempts = models.PositiveIntegerField(default=0)
+    date_created = models.DateTimeField(auto_now_add=True)
+    date_delivered = models.DateTimeField(null=True, blank=True, db_index=True)
+    date_failed = models.DateTimeField(null=True, blank=True, help_text="set once the receiver turned out not to exist")
+    refund = models.OneToOneField(
+        Transaction, on_delete=models.SET_NULL, null=True, blank=True, related_name="refunded_message",
+        db_constraint=False, help_text="the credit back to the sender of a failed message",
+    )
+    
+    def __str__(self) -> str:
+        return "Outbox message {} to {}".format(self.pk, self.destination)
+    
+    class Meta:
+        verbose_name_plural = "Outbox Messages"
+        db_table = "outbox_messages"
+
+
+class InboxMessage(models.Model):
+    source = models.CharField(max_length=100, help_text="database alias of the sending shard")
+    message_id = models.BigIntegerField(help_text="the OutboxMessage on the sending shard")
+    transaction = models.OneToOneField(Transaction, on_delete=models.CASCADE, related_name="inbox_message", db_constraint=False)
+    date_created = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self) -> str:
+        return "Inbox message {} from {}".format(self.message_id, self.source)
+    
+    class Meta:
+        verbose_name_plural = "Inbox Messages"
+        db_table = "inbox_messages"
+        constraints = [
+            models.UniqueConstraint(fields=["source", "message_id"], name="inbox_messages_source_message_uniq"),
+        ]
@@ -0,0 +1,144 @@
+# Standard Library Imports
+import functools
+import logging
+
+# Django Imports
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+# App Imports
+from ledger.models import Account, InboxMessage, OutboxMessage, Transaction
+from ledger.sharding import get_shards, shard_for_id
+from ledger import posting
+
+
+logger = logging.getLogger(__name__)
+
+
+def send(source:Transaction, *legs:posting.Leg) -> OutboxMessage:
+    """
+    > It posts the legs of a transfer that are on the sender's shard and, in the same transaction,
+    records an outbox message for the receiving shard. The message is delivered once the sender's
+    transaction commits; if that fails, `relay` delivers it later
+
+    :param source: The saved transfer, on the sender's shard
+    :type source: Transaction
+    :param legs: The sender's side of the transfer
+    :type legs: Leg
+    :return: The outbox message
+    """
+    using = source._state.db
+    posting.transfer(*legs, source=source)
+    message = OutboxMessage.objects.using(using).create(
+        transaction=source, destination=shard_for_id(source.to_account_id)
+    )
+    transaction.on_commit(functools.partial(deliver_pending, using, message.pk), using=using)
+    return message
+
+
+def deliver(message:OutboxMessage) -> bool:
+    """
+    > It credits the receiver of an outbox message on its shard, together with a copy of the
+    transfer for the receiver's history and an inbox row that makes a second delivery of the
+    same message fail, then marks the message delivered. If the receiving account does not exist
+    no retry can succeed, so the message is marked failed and the sender refunded, see `refund`
+
+    :param message: The outbox message, read from the sender's shard
+    :type message: OutboxMessage
+    :return: Whether the receiver has been credited, by this call or an earlier one
+    """
+    source_shard = message._state.db
+    sent = message.transaction
+
+    try:
+        with transaction.atomic(using=message.destination):
+            received = Transaction.objects.using(message.destination).create(
+                account_id=sent.account_id, to_account_id=sent.to_account_id,
+                user_id=sent.user_id, to_user_id=sent.to_user_id,
+                amount=sent.amount, type=sent.type,
+            )
+            InboxMessage.objects.using(message.destination).create(
+                source=source_shard, message_id=message.pk, transaction=received
+            )
+            posting.post(posting.credit(sent.amount, pk=sent.to_account_id, user_id=sent.to_user_id), source=received)
+    except IntegrityError:
+        if not InboxMessage.objects.using(message.destination).filter(source=source_shard, message_id=message.pk).exists():
+            raise
+    except Account.DoesNotExist:
+        logger.error(
+            "Outbox message %s from %s: account %s does not exist, refunding the sender.",
+            message.pk, source_shard, sent.to_account_id,
+        )
+        refund(message)
+        return False
+
+    OutboxMessage.objects.using(source_shard).filter(pk=message.pk)\
+        .update(attempts=F("attempts") + 1, date_delivered=timezone.now())
+    return True
+
+
+def refund(message:OutboxMessage) -> bool:
+    """
+    > It marks an outbox message failed and credits the transfer back to the sender on the
+    sender's shard, under a refund transaction for the sender's history, in one atomic block. A
+    message already delivered or failed is left alone, so the sender is refunded at most once
+
+    :param message: The outbox message, read from the sender's shard
+    :type message: OutboxMessage
+    :return: Whether the sender has been refunded by this call
+    """
+    using = message._state.db
+    sent = message.transaction
+
+    with transaction.atomic(using=using):
+        # The update locks the message, so a second refund waits here and then finds it failed
+        failed = OutboxMessage.objects.using(using)\
+            .filter(pk=message.pk, date_delivered__isnull=True, date_failed__isnull=True)\
+            .update(attempts=F("attempts") + 1, date_failed=timezone.now())
+
+        if not failed:
+            return False
+
+        refunded = Transaction.objects.using(using).create(
+            account_id=sent.account_id, user_id=sent.user_id, amount=sent.amount, type="refund",
+        )
+        posting.post(posting.credit(sent.amount, pk=sent.account_id, user_id=sent.user_id), source=refunded)
+        OutboxMessage.objects.using(using).filter(pk=message.pk).update(refund=refunded)
+
+    return True
+
+
+def deliver_pending(using:str, pk:int) -> None:
+    message = OutboxMessage.objects.using(using).select_related("transaction")\
+        .filter(pk=pk, date_delivered__isnull=True, date_failed__isnull=True).first()
+
+    if message is not None:
+        try:
+            deliver(message)
+        except Exception:
+            # The transfer is committed on the sender's shard, `relay` retries the credit
+            logger.exception("Outbox message %s from %s was not delivered.", pk, using)
+
+
+def relay(limit:int=None) -> tuple:
+    """
+    > It delivers the undelivered outbox messages of every shard, oldest first
+
+    :param limit: The largest number of messages read per shard
+    :type limit: int
+    :return: The number of messages delivered and the number refunded to their sender
+    """
+    delivered = refunded = 0
+
+    for shard in get_shards():
+        messages = OutboxMessage.objects.using(shard).select_related("transaction")\
+            .filter(date_delivered__isnull=True, date_failed__isnull=True).order_by("pk")[:limit]
+
+        for message in messages:
+            if deliver(message):
+                delivered += 1
+            else:
+                refunded += 1
+
+    return delivered, refunded
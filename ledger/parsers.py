@@ -0,0 +1,33 @@
+# Standard Library Imports
+import codecs
+import json
+
+# Django Imports
+from django.conf import settings
+
+# Rest Framework Imports
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parses newline-delimited JSON into a list with one item per non-empty line.
+    """
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None) -> list:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        if stream is None:
+            return []
+
+        try:
+            return [
+                json.loads(line)
+                for line in codecs.getreader(encoding)(stream)
+                if line.strip()
+            ]
+        except ValueError as exc:
+            raise ParseError("NDJSON parse error - %s" % str(exc))
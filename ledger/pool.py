@@ -0,0 +1,385 @@
+# Standard Library Imports
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+# Django Imports
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_POOL = {
+    "ENABLED": False,
+    # Connections per database and process, shared by all its threads
+    "MAX_SIZE": 10,
+    # Connections opened per database by `warm_up`
+    "MIN_SIZE": 2,
+    # How long a request waits for a free connection before failing
+    "TIMEOUT": 10.0,
+    # Connections older than this many seconds are closed instead of reused, or None
+    "MAX_AGE": 600.0,
+    # Reused connections that have been idle this many seconds are checked with `SELECT 1` first
+    "HEALTH_CHECKS": True,
+    "HEALTH_CHECK_IDLE": 1.0,
+}
+
+# Pool figures that describe the current state rather than count events
+GAUGES = ("size", "in_use", "idle", "max_size", "peak_in_use", "utilization")
+
+
+def get_options() -> dict:
+    return {**DEFAULT_DB_POOL, **getattr(settings, "LEDGER_DB_POOL", {})}
+
+
+class PoolTimeout(DatabaseError):
+    """
+    Raised when no pooled connection became free within `TIMEOUT` seconds.
+    """
+
+
+class PoolStats:
+    """
+    Counters of one pool's checkouts, how long they waited and the connections it opened and
+    closed, used to size the pool against the number of worker threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.timeouts = 0
+            self.opened = 0
+            self.closed = 0
+            self.health_check_failures = 0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_checkout(self, seconds:float, waited:bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.waits += int(waited)
+            self.wait_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "timeouts": self.timeouts,
+                "opened": self.opened,
+                "closed": self.closed,
+                "health_check_failures": self.health_check_failures,
+            }
+
+
+class PooledConnection:
+    __slots__ = ("raw", "created", "last_used")
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created = self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    A bounded pool of the raw DB-API connections of one database, shared by the threads of a
+    process. A thread checks a connection out when Django connects and returns it when Django
+    closes the connection, at the end of every request. At most `max_size` connections are open
+    at a time and a thread finding none free waits up to `timeout` seconds.
+    """
+
+    def __init__(self, name:str, options:dict):
+        self.name = name
+        self.pid = os.getpid()
+        self.max_size = options["MAX_SIZE"]
+        self.timeout = options["TIMEOUT"]
+        self.max_age = options["MAX_AGE"]
+        self.health_check_idle = options["HEALTH_CHECK_IDLE"] if options["HEALTH_CHECKS"] else None
+        self.stats = PoolStats()
+        self.size = 0
+        self.peak_in_use = 0
+        self._idle = deque()
+        self._in_use = {}
+        self._condition = threading.Condition()
+
+    def expired(self, pooled:PooledConnection) -> bool:
+        return self.max_age is not None and time.monotonic() - pooled.created >= self.max_age
+
+    def healthy(self, pooled:PooledConnection) -> bool:
+        if self.health_check_idle is None or time.monotonic() - pooled.last_used < self.health_check_idle:
+            return True
+
+        try:
+            cursor = pooled.raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            return True
+        except Exception:
+            self.stats.incr("health_check_failures")
+            return False
+
+    def discard(self, pooled:PooledConnection) -> None:
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+
+        with self._condition:
+            self.size -= 1
+            self._condition.notify()
+
+        self.stats.incr("closed")
+
+    def checkout(self, deadline:float) -> tuple:
+        """
+        > It takes the most recently returned idle connection, or a free slot to open a new one
+        in, waiting until `deadline` for either
+
+        :return: A `(pooled connection or None for a free slot, whether it waited)` tuple
+        """
+        waited = False
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    return self._idle.pop(), waited
+
+                if self.size < self.max_size:
+                    self.size += 1
+                    return None, waited
+
+                remaining = deadline - time.monotonic()
+
+                if remaining <= 0:
+                    self.stats.incr("timeouts")
+                    raise PoolTimeout("No connection to {} became free within {}s.".format(self.name, self.timeout))
+
+                waited = True
+                self._condition.wait(remaining)
+
+    def acquire(self, connect):
+        """
+        > It hands out a connection: an idle one that is neither too old nor failing its health
+        check, or a new one from `connect` while the pool has room
+
+        :param connect: Opens a new raw connection
+        :return: A raw DB-API connection
+        """
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        waited = False
+
+        while True:
+            pooled, waited_now = self.checkout(deadline)
+            waited = waited or waited_now
+
+            if pooled is None:
+                try:
+                    pooled = PooledConnection(connect())
+                except Exception:
+                    with self._condition:
+                        self.size -= 1
+                        self._condition.notify()
+                    raise
+
+                self.stats.incr("opened")
+                break
+
+            if not self.expired(pooled) and self.healthy(pooled):
+                break
+
+            self.discard(pooled)
+
+        with self._condition:
+            self._in_use[id(pooled.raw)] = pooled
+            self.peak_in_use = max(self.peak_in_use, len(self._in_use))
+
+        self.stats.record_checkout(time.perf_counter() - started, waited)
+        return pooled.raw
+
+    def release(self, raw, reusable:bool=True) -> None:
+        """
+        > It takes a connection back, rolling back whatever transaction it was left in. Broken
+        and expired connections are closed instead
+        """
+        with self._condition:
+            pooled = self._in_use.pop(id(raw), None)
+
+        if pooled is None:
+            raw.close()
+            return
+
+        try:
+            raw.rollback()
+        except Exception:
+            reusable = False
+
+        if not reusable or self.expired(pooled):
+            self.discard(pooled)
+            return
+
+        pooled.last_used = time.monotonic()
+
+        with self._condition:
+            self._idle.append(pooled)
+            self._condition.notify()
+
+    def fill(self, connect, count:int) -> int:
+        """
+        > It opens connections until the pool holds `count` of them, or is full
+        """
+        opened = 0
+
+        while True:
+            with self._condition:
+                if self.size >= min(count, self.max_size):
+                    return opened
+
+                self.size += 1
+
+            try:
+                pooled = PooledConnection(connect())
+            except Exception:
+                with self._condition:
+                    self.size -= 1
+                raise
+
+            self.stats.incr("opened")
+            opened += 1
+
+            with self._condition:
+                self._idle.append(pooled)
+                self._condition.notify()
+
+    def close_idle(self) -> None:
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+
+        for pooled in idle:
+            self.discard(pooled)
+
+    def snapshot(self) -> dict:
+        with self._condition:
+            in_use, idle, size = len(self._in_use), len(self._idle), self.size
+
+        return {
+            "size": size,
+            "in_use": in_use,
+            "idle": idle,
+            "max_size": self.max_size,
+            "peak_in_use": self.peak_in_use,
+            "utilization": in_use / self.max_size if self.max_size else 0.0,
+            **self.stats.snapshot(),
+        }
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def get_pool(wrapper) -> ConnectionPool:
+    """
+    > It returns the pool of a database connection's alias, starting a new one when the
+    database it points at has changed, as it does when the test runner creates test databases,
+    or when the process has forked since the pool was started
+    """
+    name = str(wrapper.settings_dict["NAME"])
+
+    with pools_lock:
+        pool = pools.get(wrapper.alias)
+
+        if pool is None or pool.name != name or pool.pid != os.getpid():
+            # Connections inherited from the parent process are the parent's to close
+            if pool is not None and pool.pid == os.getpid():
+                pool.close_idle()
+
+            pool = pools[wrapper.alias] = ConnectionPool(name, get_options())
+
+        return pool
+
+
+def snapshots() -> dict:
+    with pools_lock:
+        current = dict(pools)
+
+    return {alias: pool.snapshot() for alias, pool in current.items()}
+
+
+class PooledDatabaseWrapper:
+    """
+    A mixin for a database backend's `DatabaseWrapper` that takes connections from the
+    process's `ConnectionPool` for its alias instead of opening them, and returns them there
+    when Django closes them, see `ledger.backends`. Django still closes connections at the end
+    of every request (`CONN_MAX_AGE = 0`); the pool is what keeps them open.
+    """
+
+    def get_new_connection(self, conn_params):
+        return get_pool(self).acquire(lambda: super(PooledDatabaseWrapper, self).get_new_connection(conn_params))
+
+    def connect_unpooled(self):
+        return super().get_new_connection(self.get_connection_params())
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self).release(self.connection, reusable=not self.errors_occurred or self.is_usable())
+
+
+def warm_up() -> int:
+    """
+    > It opens `MIN_SIZE` connections to every pooled database, so the first requests a worker
+    serves do not pay for connecting. Call it once per worker process, after it has forked, see
+    `warm_up_worker`
+
+    :return: The number of connections opened
+    """
+    opened = 0
+
+    for alias in connections:
+        wrapper = connections[alias]
+
+        if isinstance(wrapper, PooledDatabaseWrapper):
+            opened += get_pool(wrapper).fill(wrapper.connect_unpooled, get_options()["MIN_SIZE"])
+
+    return opened
+
+
+warmed_up_pid = None
+warm_up_lock = threading.Lock()
+
+
+def warm_up_worker(**kwargs) -> None:
+    """
+    > It runs `warm_up` on the first request a process handles, as a `request_started` receiver.
+    Warming up at import time would open the connections in the parent of a server that imports
+    the application before forking its workers, like gunicorn with `--preload`
+    """
+    global warmed_up_pid
+    pid = os.getpid()
+
+    if warmed_up_pid == pid:
+        return
+
+    with warm_up_lock:
+        if warmed_up_pid == pid:
+            return
+
+        warmed_up_pid = pid
+
+    try:
+        warm_up()
+    except DatabaseError:
+        # The request connects by itself; only the head start is lost
+        logger.exception("Warming up the database connection pools failed.")
@@ -0,0 +1,380 @@
+# Standard Library Imports
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+from typing import NamedTuple
+
+# Django Imports
+from django.conf import settings
+from django.db import connections, transaction, DatabaseError, OperationalError
+from django.db.models import F, Subquery
+from django.utils import timezone
+
+# App Imports
+from ledger.models import Account, JournalEntry, UserSummary
+from ledger.sharding import shard_for_id, shard_for_user
+from ledger import hot
+
+
+# Blocking lock acquisitions slower than this are counted as lock waits
+LOCK_WAIT_THRESHOLD = 0.001
+
+# The SQLSTATE PostgreSQL raises when `FOR UPDATE NOWAIT` finds a row locked (lock_not_available)
+LOCK_NOT_AVAILABLE = "55P03"
+
+DEFAULT_TRANSFER_LOCKING = {
+    "NOWAIT": False,
+    "SKIP_LOCKED": False,
+    "RETRIES": 3,
+    "BACKOFF": 0.005,
+}
+
+
+class LockNotAvailable(DatabaseError):
+    """
+    Raised when a `nowait`/`skip_locked` attempt could not lock every account of a transfer.
+    """
+
+
+class Leg(NamedTuple):
+    """
+    A single balance change: the lookup that identifies exactly one account
+    and the signed amount to add to its available amount.
+    """
+    lookup: dict
+    amount: Decimal
+
+
+class PostingStats:
+    """
+    Process-wide counters for the posting engine, used to measure how many
+    UPDATE statements and changed rows each posting costs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.postings = 0
+            self.statements = 0
+            self.rows_updated = 0
+            self.failed = 0
+            self.lock_acquisitions = 0
+            self.lock_waits = 0
+            self.lock_wait_seconds = 0.0
+            self.lock_retries = 0
+
+    def record_lock(self, seconds:float, retried:bool=False) -> None:
+        with self._lock:
+            self.lock_acquisitions += 1
+            self.lock_wait_seconds += seconds
+            self.lock_waits += int(seconds >= LOCK_WAIT_THRESHOLD)
+            self.lock_retries += int(retried)
+
+    def record(self, statements:int, rows_updated:int, failed:bool=False) -> None:
+        with self._lock:
+            self.postings += 1
+            self.statements += statements
+            self.rows_updated += rows_updated
+            self.failed += int(failed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "postings": self.postings,
+                "statements": self.statements,
+                "rows_updated": self.rows_updated,
+                "failed": self.failed,
+                "lock_acquisitions": self.lock_acquisitions,
+                "lock_waits": self.lock_waits,
+                "lock_wait_seconds": self.lock_wait_seconds,
+                "lock_retries": self.lock_retries,
+            }
+
+
+stats = PostingStats()
+
+
+def credit(amount:Decimal, **lookup) -> Leg:
+    return Leg(lookup=lookup, amount=amount)
+
+
+def debit(amount:Decimal, **lookup) -> Leg:
+    return Leg(lookup=lookup, amount=-amount)
+
+
+def leg_user_id(leg:Leg):
+    user = leg.lookup.get("user_id", leg.lookup.get("user"))
+    return getattr(user, "pk", user)
+
+
+def leg_shard(leg:Leg) -> str:
+    pk = leg.lookup.get("pk", leg.lookup.get("id"))
+    return shard_for_id(pk) if pk is not None else shard_for_user(leg_user_id(leg))
+
+
+def leg_account_id(leg:Leg) -> int:
+    pk = leg.lookup.get("pk", leg.lookup.get("id"))
+    return pk if pk is not None else Account.objects.using(leg_shard(leg)).values_list("pk", flat=True).get(**leg.lookup)
+
+
+def apply_user_deltas(user_deltas:dict, batch_size:int=None, using:str=None) -> int:
+    """
+    > It adds net balance changes to the users' `UserSummary` rows in user primary key order, with
+    one F() UPDATE per user for small postings and one locked read plus `bulk_update` otherwise
+
+    :param user_deltas: The signed amount to add to each user's balance, keyed by user primary key
+    :type user_deltas: dict
+    :param batch_size: The number of summaries written per UPDATE statement
+    :type batch_size: int
+    :param using: The shard of the users
+    :type using: str
+    :return: The number of statements executed
+    """
+    user_deltas = {user_id: delta for user_id, delta in user_deltas.items() if delta}
+
+    if len(user_deltas) <= 2:
+        for user_id in sorted(user_deltas):
+            UserSummary.objects.using(using).filter(user_id=user_id).update(
+                balance=F("balance") + user_deltas[user_id]
+            )
+        return len(user_deltas)
+
+    summaries = list(
+        UserSummary.objects.using(using).select_for_update()
+        .filter(user_id__in=sorted(user_deltas))
+        .order_by("user_id")
+        .only("pk", "user_id", "balance")
+    )
+
+    for summary in summaries:
+        summary.balance += user_deltas[summary.user_id]
+
+    UserSummary.objects.using(using).bulk_update(summaries, ["balance"], batch_size=batch_size)
+    return 1 + (-(-len(summaries) // batch_size) if batch_size else 1)
+
+
+def apply_leg(leg:Leg, using:str=None) -> int:
+    """
+    > It applies a leg as one `UPDATE accounts SET available_amount = available_amount + %s`
+    statement, without loading the account first
+
+    :param leg: The balance change to apply
+    :type leg: Leg
+    :param using: The shard of the account
+    :type using: str
+    :return: The number of rows changed
+    """
+    return Account.objects.using(using).filter(**leg.lookup).update(
+        available_amount=F("available_amount") + leg.amount,
+        date_update=timezone.now(),
+    )
+
+
+def post(*legs:Leg, source=None) -> int:
+    """
+    > It applies every leg, the net change to each owner's `UserSummary` balance and the legs'
+    journal entries inside one atomic block on the shard of the first leg, rolling all of them
+    back and raising `Account.DoesNotExist` if any leg does not match exactly one account there
+
+    :param legs: The balance changes making up the posting
+    :type legs: Leg
+    :param source: The `Transaction` the legs are journaled under
+    :type source: Transaction
+    :return: The total number of rows changed
+    """
+    statements = rows_updated = 0
+    user_deltas = defaultdict(Decimal)
+    using = leg_shard(legs[0])
+
+    try:
+        with transaction.atomic(using=using, savepoint=False):
+            for leg in legs:
+                # A hot account takes the leg on one of its slots, outside its owner's UserSummary
+                if hot.apply_leg(leg, using=using):
+                    statements += 1
+                    rows_updated += 1
+                    continue
+                
+                changed = apply_leg(leg, using=using)
+                statements += 1
+
+                if changed != 1:
+                    raise Account.DoesNotExist(
+                        "Account matching {} does not exist.".format(leg.lookup)
+                    )
+                rows_updated += changed
+
+                if leg_user_id(leg) is not None:
+                    user_deltas[leg_user_id(leg)] += leg.amount
+                else:
+                    # The owner is not part of the lookup, so find it with a subquery
+                    UserSummary.objects.using(using).filter(
+                        user_id=Subquery(Account.objects.using(using).filter(**leg.lookup).values("user_id")[:1])
+                    ).update(balance=F("balance") + leg.amount)
+                    statements += 1
+
+            statements += apply_user_deltas(user_deltas, using=using)
+
+            JournalEntry.record(
+                [(leg_account_id(leg), leg.amount) for leg in legs],
+                transaction_id=getattr(source, "pk", None),
+                using=using,
+            )
+            statements += 1
+    except Account.DoesNotExist:
+        stats.record(statements=statements, rows_updated=0, failed=True)
+        raise
+
+    stats.record(statements=statements, rows_updated=rows_updated)
+    return rows_updated
+
+
+def post_deltas(deltas:dict, batch_size:int=None, using:str=None) -> int:
+    """
+    > It applies net balance changes keyed by account primary key: the accounts are locked and
+    read in primary key order with one query and written back with `bulk_update`, and the net
+    change per owner is added to their `UserSummary` balance. Hot accounts take the change on
+    their account row too, once per chunk rather than once per posting
+
+    :param deltas: The signed amount to add to each account, keyed by account primary key
+    :type deltas: dict
+    :param batch_size: The number of accounts written per UPDATE statement
+    :type batch_size: int
+    :param using: The shard of the accounts
+    :type using: str
+    :return: The number of rows changed
+    """
+    now = timezone.now()
+
+    with transaction.atomic(using=using, savepoint=False):
+        accounts = list(
+            Account.objects.using(using).select_for_update()
+            .filter(pk__in=sorted(deltas))
+            .order_by("pk")
+            .only("pk", "user_id", "available_amount", "date_update")
+        )
+        user_deltas = defaultdict(Decimal)
+
+        for account in accounts:
+            account.available_amount += deltas[account.pk]
+            account.date_update = now
+            user_deltas[account.user_id] += deltas[account.pk]
+
+        rows_updated = Account.objects.using(using).bulk_update(
+            accounts, ["available_amount", "date_update"], batch_size=batch_size
+        )
+        statements = apply_user_deltas(user_deltas, batch_size=batch_size, using=using)
+
+    statements += 1 + (-(-len(accounts) // batch_size) if batch_size else 1)
+    stats.record(statements=statements, rows_updated=rows_updated)
+    return rows_updated
+
+
+def lock_accounts(pks:list, nowait:bool=False, skip_locked:bool=False, using:str=None) -> None:
+    """
+    > It takes `SELECT ... FOR UPDATE` locks on the given accounts in primary key order, so two
+    transfers touching the same accounts always lock them in the same order and cannot deadlock
+
+    :param pks: The primary keys of the accounts to lock
+    :type pks: list
+    :param nowait: Fail instead of waiting for a row locked by another transaction
+    :type nowait: bool
+    :param skip_locked: Skip rows locked by another transaction instead of waiting for them
+    :type skip_locked: bool
+    :param using: The shard of the accounts
+    :type using: str
+    """
+    started = time.perf_counter()
+
+    try:
+        locked = list(
+            Account.objects.using(using).select_for_update(nowait=nowait, skip_locked=skip_locked)
+            .filter(pk__in=pks)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+    except DatabaseError as error:
+        stats.record_lock(time.perf_counter() - started, retried=is_lock_failure(error, using=using))
+        raise
+
+    if skip_locked and len(locked) < len(pks):
+        stats.record_lock(time.perf_counter() - started, retried=True)
+        raise LockNotAvailable("Could not lock accounts {}.".format(pks))
+
+    stats.record_lock(time.perf_counter() - started)
+
+
+def is_lock_failure(error:DatabaseError, using:str=None) -> bool:
+    """
+    > It tells whether a failed transfer attempt only lost the race for its locks, and is worth
+    retrying, rather than failing for any other reason
+
+    :param error: The error the attempt raised
+    :type error: DatabaseError
+    :param using: The shard the attempt ran on
+    :type using: str
+    :return: True for `LockNotAvailable`, PostgreSQL's lock_not_available and SQLite's locked database
+    """
+    if isinstance(error, LockNotAvailable):
+        return True
+
+    if not isinstance(error, OperationalError):
+        return False
+
+    vendor = connections[using or "default"].vendor
+
+    if vendor == "postgresql":
+        return getattr(error.__cause__, "pgcode", None) == LOCK_NOT_AVAILABLE
+
+    return vendor == "sqlite" and "locked" in str(error)
+
+
+def transfer(*legs:Leg, source=None, **options) -> int:
+    """
+    > It posts legs that each look an account up by `pk`, locking every account in primary key
+    order first, except hot accounts, whose slots take the legs without the account row. With
+    `NOWAIT` or `SKIP_LOCKED` an attempt that could not take its locks is rolled back to its
+    savepoint and retried with backoff, and the last attempt waits for the locks; any other error
+    is raised at once. Every account must be on the same shard; `ledger.outbox` moves money
+    between shards
+
+    :param legs: The balance changes making up the transfer
+    :type legs: Leg
+    :param source: The `Transaction` the legs are journaled under
+    :type source: Transaction
+    :param options: Overrides for the `LEDGER_TRANSFER_LOCKING` setting
+    :return: The total number of rows changed
+    """
+    options = {
+        **DEFAULT_TRANSFER_LOCKING,
+        **getattr(settings, "LEDGER_TRANSFER_LOCKING", {}),
+        **options,
+    }
+    legs = sorted(legs, key=lambda leg: leg.lookup["pk"])
+    pks = sorted({leg.lookup["pk"] for leg in legs})
+    retries = options["RETRIES"] if options["NOWAIT"] or options["SKIP_LOCKED"] else 0
+    using = shard_for_id(pks[0])
+
+    if shard_for_id(pks[-1]) != using:
+        raise ValueError("Accounts {} are on different shards.".format(pks))
+
+    pks = [pk for pk in pks if not hot.slot_count(pk, using=using)]
+
+    for attempt in range(retries):
+        try:
+            with transaction.atomic(using=using):
+                lock_accounts(pks, nowait=options["NOWAIT"], skip_locked=options["SKIP_LOCKED"], using=using)
+                return post(*legs, source=source)
+        except DatabaseError as error:
+            if not is_lock_failure(error, using=using):
+                raise
+
+            time.sleep(options["BACKOFF"] * 2 ** attempt)
+
+    with transaction.atomic(using=using, savepoint=False):
+        lock_accounts(pks, using=using)
+        return post(*legs, source=source)
@@ -0,0 +1,204 @@
+# Standard Library Imports
+from collections import defaultdict
+from decimal import Decimal
+from typing import NamedTuple
+
+# Django Imports
+from django.db.models import BigIntegerField, Case, F, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+
+# App Imports
+from ledger.models import Account, Transaction, MONEY_DECIMAL_PLACES
+from ledger import archive, hot
+
+# Third Party Imports
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+MINOR_UNITS = 10 ** MONEY_DECIMAL_PLACES
+DEFAULT_CHUNK_SIZE = 100000
+
+
+class Mismatch(NamedTuple):
+    account_id: int
+    stored: Decimal
+    expected: Decimal
+
+
+class ReconciliationResult(NamedTuple):
+    engine: str
+    transactions: int
+    accounts: int
+    mismatches: list
+
+
+def minor_units(field:str):
+    """
+    > It converts a money column to integer minor units inside the database, so rows reach Python
+    as plain integers
+    """
+    return Cast(Round(F(field) * MINOR_UNITS), output_field=BigIntegerField())
+
+
+def iter_legs(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None):
+    """
+    > It reads the `transactions` table and then its archive tables in primary key order with
+    keyset pagination, yielding one list of `(pk, account_id, sign, to_account_id, amount)`
+    integer tuples per chunk, amounts in minor units. Deposits and refunds credit `account` (sign
+    1), withdrawals debit it (sign -1) and transfers debit `account` and credit `to_account`; a
+    missing account is reported as 0
+    """
+    for model in [Transaction] + [partition.model for partition in archive.partitions(using)]:
+        queryset = model.objects.using(using).annotate(
+            from_id=Coalesce("account_id", Value(0)),
+            to_id=Case(
+                When(type="transfer", to_account__isnull=False, then=F("to_account_id")),
+                default=Value(0),
+            ),
+            sign=Case(When(type="deposit", then=Value(1)), When(type="refund", then=Value(1)), default=Value(-1)),
+            minor=minor_units("amount"),
+        ).order_by("pk")
+        last_pk = 0
+
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_pk)
+                .values_list("pk", "from_id", "sign", "to_id", "minor")[:chunk_size]
+            )
+
+            if not rows:
+                break
+
+            last_pk = rows[-1][0]
+            yield rows
+
+
+def iter_balances(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None):
+    queryset = Account.objects.using(using).annotate(minor=minor_units("available_amount")).order_by("pk")
+    last_pk = 0
+
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list("pk", "minor")[:chunk_size])
+
+        if not rows:
+            return
+
+        last_pk = rows[-1][0]
+        slots = hot.slot_balances([pk for pk, _ in rows], using=using)
+
+        if slots:
+            # A hot account's balance includes its slots, see ledger.hot
+            rows = [(pk, minor + int(slots.get(pk, 0) * MINOR_UNITS)) for pk, minor in rows]
+
+        yield rows
+
+
+def group_sum(ids, amounts) -> tuple:
+    """
+    > It sums int64 `amounts` per distinct id with a sort and `add.reduceat`, which stays exact
+    where a float `bincount` would round
+    """
+    order = numpy.argsort(ids, kind="stable")
+    ids, amounts = ids[order], amounts[order]
+
+    if not len(ids):
+        return ids, amounts
+
+    starts = numpy.flatnonzero(numpy.r_[True, ids[1:] != ids[:-1]])
+    return ids[starts], numpy.add.reduceat(amounts, starts)
+
+
+def reconcile_numpy(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None) -> ReconciliationResult:
+    total_ids = numpy.empty(0, dtype=numpy.int64)
+    total_sums = numpy.empty(0, dtype=numpy.int64)
+    transactions = accounts = 0
+    mismatches = []
+
+    for rows in iter_legs(chunk_size, using=using):
+        legs = numpy.array(rows, dtype=numpy.int64)
+        transactions += len(legs)
+
+        ids = numpy.concatenate([legs[:, 1], legs[:, 3]])
+        amounts = numpy.concatenate([legs[:, 2] * legs[:, 4], legs[:, 4]])
+        keep = ids != 0
+
+        total_ids, total_sums = group_sum(
+            numpy.concatenate([total_ids, ids[keep]]),
+            numpy.concatenate([total_sums, amounts[keep]]),
+        )
+
+    for rows in iter_balances(chunk_size, using=using):
+        balances = numpy.array(rows, dtype=numpy.int64)
+        accounts += len(balances)
+
+        expected = numpy.zeros(len(balances), dtype=numpy.int64)
+
+        if len(total_ids):
+            index = numpy.searchsorted(total_ids, balances[:, 0]).clip(max=len(total_ids) - 1)
+            expected = numpy.where(total_ids[index] == balances[:, 0], total_sums[index], 0)
+
+        for row in numpy.flatnonzero(expected != balances[:, 1]):
+            mismatches.append(
+                Mismatch(
+                    account_id=int(balances[row, 0]),
+                    stored=Decimal(int(balances[row, 1])) / MINOR_UNITS,
+                    expected=Decimal(int(expected[row])) / MINOR_UNITS,
+                )
+            )
+
+    return ReconciliationResult("numpy", transactions, accounts, mismatches)
+
+
+def reconcile_python(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None) -> ReconciliationResult:
+    totals = defaultdict(int)
+    transactions = accounts = 0
+    mismatches = []
+
+    for rows in iter_legs(chunk_size, using=using):
+        transactions += len(rows)
+
+        for _, from_id, sign, to_id, amount in rows:
+            totals[from_id] += sign * amount
+            totals[to_id] += amount
+
+    for rows in iter_balances(chunk_size, using=using):
+        accounts += len(rows)
+
+        for account_id, stored in rows:
+            if totals.get(account_id, 0) != stored:
+                mismatches.append(
+                    Mismatch(
+                        account_id=account_id,
+                        stored=Decimal(stored) / MINOR_UNITS,
+                        expected=Decimal(totals.get(account_id, 0)) / MINOR_UNITS,
+                    )
+                )
+
+    return ReconciliationResult("python", transactions, accounts, mismatches)
+
+
+def reconcile(chunk_size:int=DEFAULT_CHUNK_SIZE, engine:str="auto", using:str=None) -> ReconciliationResult:
+    """
+    > It recomputes every account's balance from the `transactions` table and its archive tables
+    in integer minor units and compares it with the stored available amount. The vectorized NumPy
+    engine is used when NumPy is installed, otherwise a pure Python one. On a sharded ledger each
+    shard is reconciled on its own; transfer legs of accounts on other shards are ignored
+
+    :param chunk_size: The number of rows read per query
+    :type chunk_size: int
+    :param engine: "numpy", "python" or "auto"
+    :type engine: str
+    :param using: The shard to reconcile
+    :type using: str
+    :return: The counts of rows checked and the accounts whose balance disagrees
+    """
+    if engine == "numpy" and numpy is None:
+        raise ImportError("The numpy reconciliation engine needs NumPy installed.")
+
+    if engine == "numpy" or (engine == "auto" and numpy is not None):
+        return reconcile_numpy(chunk_size, using=using)
+
+    return reconcile_python(chunk_size, using=using)
@@ -0,0 +1,52 @@
+# Standard Library Imports
+import time
+
+# Rest Framework Imports
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# App Imports
+from ledger import metrics
+
+# Third Party Imports
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    A `JSONRenderer` that encodes with orjson when it is installed. Types orjson does not know,
+    such as `Decimal`, go through DRF's encoder, and indented output (the browsable API) is left
+    to the standard renderer.
+    """
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        rendered = orjson.dumps(data, default=self.encoder.default, option=orjson.OPT_NON_STR_KEYS)
+
+        # Like the standard renderer, escape the separators that are invalid in JavaScript strings
+        return rendered.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class TimedJSONRenderer(FastJSONRenderer):
+    """
+    A `FastJSONRenderer` that adds its rendering time to the render time of the sampled request.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        sample = metrics.current.get()
+
+        if sample is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        started = time.perf_counter()
+
+        try:
+            return super().render(data, accepted_media_type, renderer_context)
+        finally:
+            sample.render_seconds += time.perf_counter() - started
@@ -0,0 +1,188 @@
+# Standard Library Imports
+import itertools
+import math
+import sqlite3
+import threading
+
+# Django Imports
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import JournalEntry
+
+
+DEFAULT_REPLICAS = {
+    # Read replica aliases of each primary database alias
+    "DATABASES": {},
+    # How long a user's reads stay on the primary after they post
+    "STICKY_SECONDS": 5.0,
+    "PIN_MAXSIZE": 100000,
+    # Alias of a Django cache shared between processes holding the pins, or None
+    "BACKEND": None,
+}
+
+KEY_PREFIX = "ledger:pinned:"
+
+
+def get_options() -> dict:
+    return {**DEFAULT_REPLICAS, **getattr(settings, "LEDGER_REPLICAS", {})}
+
+
+def replicas_of(primary:str) -> list:
+    return list(get_options()["DATABASES"].get(primary, ()))
+
+
+def is_replica(alias:str) -> bool:
+    return any(alias in replicas for replicas in get_options()["DATABASES"].values())
+
+
+class ReplicaStats:
+    """
+    Counters of where the replica-eligible reads went.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.replica_reads = 0
+            self.pinned_reads = 0
+            self.primary_reads = 0
+            self.pins = 0
+
+    def incr(self, counter:str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "replica_reads": self.replica_reads,
+                "pinned_reads": self.pinned_reads,
+                "primary_reads": self.primary_reads,
+                "pins": self.pins,
+            }
+
+
+stats = ReplicaStats()
+pins = LRUCache(maxsize=get_options()["PIN_MAXSIZE"], ttl=get_options()["STICKY_SECONDS"])
+rotation = itertools.count()
+
+
+def shared_cache():
+    backend = get_options()["BACKEND"]
+    return caches[backend] if backend else None
+
+
+def pin(user_id:int) -> None:
+    """
+    > It sends the user's reads to the primary for the next `STICKY_SECONDS`, so they see their
+    own postings before the replicas have caught up
+    """
+    pins.set(user_id, True)
+    shared = shared_cache()
+
+    if shared is not None:
+        shared.set(KEY_PREFIX + str(user_id), True, timeout=math.ceil(get_options()["STICKY_SECONDS"]))
+
+    stats.incr("pins")
+
+
+def is_pinned(user_id:int) -> bool:
+    if pins.get(user_id):
+        return True
+
+    shared = shared_cache()
+    return shared is not None and bool(shared.get(KEY_PREFIX + str(user_id)))
+
+
+def read_db(primary:str, user_id:int=None) -> str:
+    """
+    > It picks the database a read of `primary` data on behalf of a user goes to: one of the
+    primary's replicas in turn, or the primary itself when it has none or the user is pinned
+
+    :param primary: The alias of the database holding the data
+    :type primary: str
+    :param user_id: The primary key of the user the read is for
+    :type user_id: int
+    :return: A database alias
+    """
+    replicas = replicas_of(primary)
+
+    if not replicas:
+        stats.incr("primary_reads")
+        return primary
+
+    if user_id is not None and is_pinned(user_id):
+        stats.incr("pinned_reads")
+        return primary
+
+    stats.incr("replica_reads")
+    return replicas[next(rotation) % len(replicas)]
+
+
+def lag(primary:str, replica:str) -> tuple:
+    """
+    > It measures how far a replica is behind its primary on the journal: the number of entries
+    the replica does not have yet and how long ago the oldest of them was written
+
+    :return: A `(seconds, entries)` tuple, `(0.0, 0)` for a replica that is up to date
+    """
+    replicated = JournalEntry.objects.using(replica).order_by("-id").values_list("id", flat=True).first() or 0
+    missing = JournalEntry.objects.using(primary).filter(id__gt=replicated)
+    oldest = missing.order_by("id").values_list("date_created", flat=True).first()
+
+    if oldest is None:
+        return 0.0, 0
+
+    return max((timezone.now() - oldest).total_seconds(), 0.0), missing.count()
+
+
+def lags() -> dict:
+    """
+    > It measures the lag of every replica, leaving out the ones that cannot be read, such as a
+    replica that has never been synced
+    """
+    measured = {}
+
+    for primary, replicas in get_options()["DATABASES"].items():
+        for replica in replicas:
+            try:
+                measured[primary, replica] = lag(primary, replica)
+            except DatabaseError:
+                continue
+
+    return measured
+
+
+def copy_sqlite(primary:str, replica:str) -> None:
+    """
+    > It refreshes a SQLite replica with an online backup of its primary, standing in for
+    replication when both are local files
+    """
+    source = connections[primary]
+    source.ensure_connection()
+    target = sqlite3.connect(connections[replica].settings_dict["NAME"])
+
+    try:
+        source.connection.backup(target)
+    finally:
+        target.close()
+
+    connections[replica].close()
+
+
+class ReplicaRouter:
+    """
+    Keeps migrations off the replicas, which receive the schema from their primary. Reads only
+    go to a replica where a view asks for it with `read_db`, so a posting never reads stale rows.
+    """
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if is_replica(db) else None
@@ -0,0 +1,239 @@
+# Standard Library Imports
+from collections import defaultdict
+from datetime import date
+
+# Django Imports
+from django.db import transaction
+from django.db.models import Case, Count, F, Max, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import TruncDate
+
+# App Imports
+from ledger.models import DailyRollup, JournalEntry, ZERO
+from ledger.reconciliation import minor_units
+from ledger.journal import settled_entry_id, to_money
+
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def high_water_mark(using:str=None) -> int:
+    return DailyRollup.objects.using(using).aggregate(last=Max("last_entry_id"))["last"] or 0
+
+
+def day_totals(entries) -> list:
+    """
+    > It totals journal entries per account and day inside the database
+
+    :return: A list of `(account_id, day, credits, debits, entries)` tuples in account and day
+    order, debits as a positive amount
+    """
+    return [
+        (account_id, day, to_money(credits), -to_money(debits), count)
+        for account_id, day, credits, debits, count in entries
+        .annotate(day=TruncDate("date_created"))
+        .values("account_id", "day")
+        .annotate(
+            credits=Sum(Case(When(amount__gt=0, then=minor_units("amount")), default=Value(0))),
+            debits=Sum(Case(When(amount__lt=0, then=minor_units("amount")), default=Value(0))),
+            count=Count("id"),
+        )
+        .order_by("account_id", "day")
+        .values_list("account_id", "day", "credits", "debits", "count")
+    ]
+
+
+def latest_rollups(account_ids:list, using:str=None) -> dict:
+    """
+    > It locks and returns the rollup of the latest day of each account, keyed by account primary
+    key
+    """
+    newest = DailyRollup.objects.using(using).filter(account_id=OuterRef("account_id"))\
+        .order_by("-day").values("pk")[:1]
+
+    return {
+        rollup.account_id: rollup
+        for rollup in DailyRollup.objects.using(using).select_for_update()
+        .filter(account_id__in=account_ids, pk=Subquery(newest))
+    }
+
+
+def roll_back_day(account_id:int, day:date, credits, debits, entries:int, last_entry_id:int, using:str) -> None:
+    """
+    > It adds totals to a day before an account's latest rollup, for entries written with an
+    earlier date than the ones already rolled up, and carries their net into the later days'
+    balances
+    """
+    net = credits - debits
+    rollup = DailyRollup.objects.using(using).filter(account_id=account_id, day=day).first()
+
+    if rollup is None:
+        previous = DailyRollup.objects.using(using).filter(account_id=account_id, day__lt=day)\
+            .order_by("-day").values_list("closing_balance", flat=True).first() or ZERO
+        rollup = DailyRollup(account_id=account_id, day=day, opening_balance=previous, closing_balance=previous)
+
+    rollup.credits += credits
+    rollup.debits += debits
+    rollup.entries += entries
+    rollup.closing_balance += net
+    rollup.last_entry_id = last_entry_id
+    rollup.save(using=using)
+
+    DailyRollup.objects.using(using).filter(account_id=account_id, day__gt=day).update(
+        opening_balance=F("opening_balance") + net, closing_balance=F("closing_balance") + net
+    )
+
+
+def refresh_chunk(high_water:int, last_entry_id:int, using:str=None) -> int:
+    """
+    > It adds the journal entries `(high_water, last_entry_id]` to the rollups, inside one atomic
+    block, and returns the number of rollups written. Nothing is written if another refresh
+    moved the high-water mark in the meantime. `last_entry_id` must be settled, see
+    `ledger.journal.settled_entry_id`, or entries committing late below it are never rolled up
+    """
+    totals = day_totals(
+        JournalEntry.objects.using(using).filter(
+            id__gt=high_water, id__lte=last_entry_id, account__isnull=False
+        )
+    )
+    by_account = defaultdict(list)
+
+    for account_id, *row in totals:
+        by_account[account_id].append(row)
+
+    with transaction.atomic(using=using):
+        latest = latest_rollups(sorted(by_account), using=using)
+
+        # A refresh running at the same time has rolled these entries up already; its new days
+        # would fail the (account, day) constraint instead
+        if high_water_mark(using=using) != high_water:
+            return 0
+
+        created, updated = [], {}
+
+        for account_id, days in by_account.items():
+            rollup = latest.get(account_id)
+
+            # Days come in order, so only the first ones can fall before the latest rollup
+            for day, credits, debits, entries in days:
+                if rollup is not None and day < rollup.day:
+                    roll_back_day(account_id, day, credits, debits, entries, last_entry_id, using=using)
+                    rollup.opening_balance += credits - debits
+                    rollup.closing_balance += credits - debits
+                    rollup.last_entry_id = last_entry_id
+                    updated[rollup.pk] = rollup
+                    continue
+
+                if rollup is None or day > rollup.day:
+                    opening = rollup.closing_balance if rollup is not None else ZERO
+                    rollup = DailyRollup(
+                        account_id=account_id, day=day,
+                        opening_balance=opening, closing_balance=opening,
+                    )
+                    created.append(rollup)
+                elif rollup.pk is not None:
+                    updated[rollup.pk] = rollup
+
+                rollup.credits += credits
+                rollup.debits += debits
+                rollup.entries += entries
+                rollup.closing_balance += credits - debits
+                rollup.last_entry_id = last_entry_id
+
+        DailyRollup.objects.using(using).bulk_create(created)
+        DailyRollup.objects.using(using).bulk_update(
+            list(updated.values()), ["credits", "debits", "entries", "opening_balance", "closing_balance", "last_entry_id"]
+        )
+
+    return len(created) + len(updated)
+
+
+def refresh(chunk_size:int=DEFAULT_CHUNK_SIZE, using:str=None) -> int:
+    """
+    > It brings the daily rollups of a shard up to date with the journal, reading only the
+    entries written since the high-water mark, `chunk_size` entries (and one transaction) at a
+    time so a long backlog is not rolled up in one go. It stops at the settled part of the
+    journal; `statement` reads the newer entries from the journal's tail
+
+    :param chunk_size: The number of journal entries rolled up per transaction
+    :type chunk_size: int
+    :param using: The shard to refresh
+    :type using: str
+    :return: The number of rollups written
+    """
+    written = 0
+    settled = settled_entry_id(using=using)
+
+    while True:
+        high_water = high_water_mark(using=using)
+        ids = list(
+            JournalEntry.objects.using(using).filter(id__gt=high_water, id__lte=settled, account__isnull=False)
+            .order_by("id").values_list("id", flat=True)[:chunk_size]
+        )
+
+        if not ids:
+            return written
+
+        written += refresh_chunk(high_water, ids[-1], using=using)
+
+
+def statement(account_id:int, start:date, end:date, using:str=None) -> dict:
+    """
+    > It builds an account's statement for the days `start` to `end`, both included, from its
+    rollups in the range and the closing balance of the day before, plus the journal entries
+    written since the last refresh, so the statement is current while only the journal's tail
+    is read
+
+    :param account_id: The primary key of the account
+    :type account_id: int
+    :param start: The first day of the statement
+    :type start: date
+    :param end: The last day of the statement
+    :type end: date
+    :param using: The database to read, the account's shard or one of its replicas
+    :type using: str
+    :return: The opening and closing balances, the totals of the range and one row per day with
+    postings
+    """
+    rollups = DailyRollup.objects.using(using).filter(account_id=account_id)
+    high_water = high_water_mark(using=using)
+    opening = rollups.filter(day__lt=start).order_by("-day").values_list("closing_balance", flat=True).first() or ZERO
+    days = {
+        day: [credits, debits, entries]
+        for day, credits, debits, entries in rollups.filter(day__gte=start, day__lte=end)
+        .values_list("day", "credits", "debits", "entries")
+    }
+
+    tail = JournalEntry.objects.using(using).filter(account_id=account_id, id__gt=high_water)
+
+    for _, day, credits, debits, entries in day_totals(tail):
+        if day < start:
+            opening += credits - debits
+        elif day <= end:
+            totals = days.setdefault(day, [ZERO, ZERO, 0])
+            totals[0] += credits
+            totals[1] += debits
+            totals[2] += entries
+
+    rows = []
+    balance = opening
+
+    for day in sorted(days):
+        credits, debits, entries = days[day]
+        rows.append({
+            "day": day,
+            "credits": credits,
+            "debits": debits,
+            "entries": entries,
+            "opening_balance": balance,
+            "closing_balance": balance + credits - debits,
+        })
+        balance += credits - debits
+
+    return {
+        "opening_balance": opening,
+        "closing_balance": balance,
+        "credits": sum((row["credits"] for row in rows), ZERO),
+        "debits": sum((row["debits"] for row in rows), ZERO),
+        "entries": sum(row["entries"] for row in rows),
+        "days": rows,
+    }
@@ -1,12 +1,41 @@
+# Standard Library Imports
+from collections.abc import Mapping
+
+# Django Imports
+from django.core.exceptions import ValidationError as DjangoValidationError
+
 # Rest Framework Imports
 from rest_framework import serializers
+from rest_framework.fields import SkipField, empty, get_error_detail
+from rest_framework.relations import PKOnlyObject
+from rest_framework.settings import api_settings
 
 # App Imports
-from ledger.models import Transaction, User, Account
+from ledger.models import Transaction, User, Account, MONEY_MAX_DIGITS, MONEY_DECIMAL_PLACES
+from ledger import cache, metrics
+
+
+class CachedAccountField(serializers.PrimaryKeyRelatedField):
+    """
+    Resolves an account primary key through `ledger.cache` instead of querying on every request.
+    """
+    
+    def to_internal_value(self, data):
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        
+        try:
+            return cache.get_account(pk=int(data))
+        except Account.DoesNotExist:
+            self.fail("does_not_exist", pk_value=data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
 
 
 class DepositWithdrawTransactionSerializer(serializers.ModelSerializer):
     
+    account = CachedAccountField(queryset=Account.objects.all())
+    
     class Meta:
         model = Transaction
         fields = ("account", "amount", "type")
@@ -14,6 +43,8 @@ class DepositWithdrawTransactionSerializer(serializers.ModelSerializer):
 
 class TransferUserTransactionSerializer(serializers.ModelSerializer):
     
+    account = CachedAccountField(queryset=Account.objects.all())
+    
     class Meta:
         model = Transaction
         fields = ("account", "amount", "type")
@@ -21,11 +52,26 @@ class TransferUserTransactionSerializer(serializers.ModelSerializer):
 
 class TransferTransactionSerializer(serializers.ModelSerializer):
     
+    account = CachedAccountField(queryset=Account.objects.all())
+    to_account = CachedAccountField(queryset=Account.objects.all())
+    
     class Meta:
         model = Transaction
         fields = ("account", "to_account", "amount", "type")
 
 
+class TransactionHistorySerializer(serializers.ModelSerializer):
+    
+    account = serializers.CharField(source="account.name", allow_null=True, read_only=True)
+    to_account = serializers.CharField(source="to_account.name", allow_null=True, read_only=True)
+    user = serializers.CharField(source="user.username", allow_null=True, read_only=True)
+    to_user = serializers.CharField(source="to_user.username", allow_null=True, read_only=True)
+    
+    class Meta:
+        model = Transaction
+        fields = ("id", "date_created", "type", "amount", "account", "to_account", "user", "to_user")
+
+
 class AccountSerializer(serializers.ModelSerializer):
     
     class Meta:
@@ -44,4 +90,166 @@ class UserSerializer(serializers.ModelSerializer):
         user = User.objects.create(**validated_data)
         user.set_password(validated_data.get("password"))
         user.save()
-        return user
\ No newline at end of file
+        return user
+
+# The transaction types a client can post; refunds are only written by `ledger.outbox`
+POSTING_TYPES = ("deposit", "withdraw", "transfer")
+
+
+class BatchOperationSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=POSTING_TYPES)
+    account = serializers.SlugField()
+    to_account = serializers.SlugField(required=False)
+    amount = serializers.DecimalField(
+        max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES, min_value=0
+    )
+    
+    def validate(self, attrs):
+        if attrs["type"] == "transfer" and not attrs.get("to_account"):
+            raise serializers.ValidationError({"to_account": "This field is required for transfers."})
+        
+        if attrs["type"] != "transfer" and attrs.get("to_account"):
+            raise serializers.ValidationError({"to_account": "Only transfers have a receiving account."})
+        
+        return attrs
+
+
+def money_field() -> serializers.DecimalField:
+    return serializers.DecimalField(max_digits=MONEY_MAX_DIGITS, decimal_places=MONEY_DECIMAL_PLACES)
+
+
+class StatementDaySerializer(serializers.Serializer):
+    day = serializers.DateField()
+    credits = money_field()
+    debits = money_field()
+    entries = serializers.IntegerField()
+    opening_balance = money_field()
+    closing_balance = money_field()
+
+
+class AccountStatementSerializer(serializers.Serializer):
+    account = serializers.CharField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    opening_balance = money_field()
+    closing_balance = money_field()
+    credits = money_field()
+    debits = money_field()
+    entries = serializers.IntegerField()
+    days = StatementDaySerializer(many=True)
+
+
+class CompiledSerializer:
+    """
+    A slots-based stand-in for a DRF serializer with a fixed, flat schema. The fields of `schema`
+    are built once per class, instead of being introspected from the model and deep-copied on
+    every instantiation, and validation and representation call them directly. Model-level
+    validators of `schema` are not run, so it only suits schemas that have none. Validation and
+    representation count towards the serializer time of a sampled request.
+    """
+    __slots__ = ("instance", "initial_data", "many", "validated_data", "errors", "_data")
+    schema = None
+    
+    def __init__(self, instance=None, data=empty, many:bool=False):
+        self.instance = instance
+        self.initial_data = data
+        self.many = many
+        self.validated_data = {}
+        self.errors = {}
+        self._data = None
+    
+    @classmethod
+    def fields(cls) -> tuple:
+        compiled = cls.__dict__.get("compiled_fields")
+        
+        if compiled is None:
+            compiled = tuple(cls.schema().fields.items())
+            cls.compiled_fields = compiled
+        
+        return compiled
+    
+    @metrics.timed("serializer_seconds")
+    def is_valid(self, raise_exception:bool=False) -> bool:
+        validated, errors = {}, {}
+        
+        if not isinstance(self.initial_data, Mapping):
+            errors[api_settings.NON_FIELD_ERRORS_KEY] = [
+                "Invalid data. Expected a dictionary, but got {}.".format(type(self.initial_data).__name__)
+            ]
+        else:
+            for name, field in self.fields():
+                if field.read_only:
+                    continue
+                
+                try:
+                    validated[field.source] = field.run_validation(field.get_value(self.initial_data))
+                except serializers.ValidationError as error:
+                    errors[name] = error.detail
+                except DjangoValidationError as error:
+                    errors[name] = get_error_detail(error)
+                except SkipField:
+                    pass
+        
+        self.validated_data, self.errors = ({}, errors) if errors else (validated, {})
+        
+        if errors and raise_exception:
+            raise serializers.ValidationError(errors)
+        
+        return not errors
+    
+    def save(self, **kwargs):
+        self.instance = self.schema.Meta.model.objects.create(**self.validated_data, **kwargs)
+        self._data = None
+        return self.instance
+    
+    def to_representation(self, instance) -> dict:
+        representation = {}
+        
+        for name, field in self.fields():
+            if field.write_only:
+                continue
+            
+            try:
+                attribute = field.get_attribute(instance)
+            except SkipField:
+                continue
+            
+            check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+            representation[name] = None if check_for_none is None else field.to_representation(attribute)
+        
+        return representation
+    
+    @property
+    @metrics.timed("serializer_seconds")
+    def data(self):
+        if self._data is None:
+            source = self.instance if self.instance is not None else self.validated_data
+            self._data = [self.to_representation(item) for item in source] if self.many \
+                else self.to_representation(source)
+        
+        return self._data
+
+
+class FastDepositWithdrawSerializer(CompiledSerializer):
+    __slots__ = ()
+    schema = DepositWithdrawTransactionSerializer
+
+
+class FastTransferUserSerializer(CompiledSerializer):
+    __slots__ = ()
+    schema = TransferUserTransactionSerializer
+
+
+class FastTransferSerializer(CompiledSerializer):
+    __slots__ = ()
+    schema = TransferTransactionSerializer
+
+
+class FastAccountSerializer(CompiledSerializer):
+    __slots__ = ()
+    schema = AccountSerializer
+
+
+class FastTransactionHistorySerializer(CompiledSerializer):
+    __slots__ = ()
+    schema = TransactionHistorySerializer
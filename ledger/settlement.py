@@ -0,0 +1,165 @@
+# Standard Library Imports
+import csv
+import json
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import chain, islice
+from operator import itemgetter
+
+# Django Imports
+from django.db import transaction
+
+# Rest Framework Imports
+from rest_framework.exceptions import ValidationError
+
+# App Imports
+from ledger.models import InboxMessage, Transaction
+from ledger.serializers import BatchOperationSerializer
+from ledger.sharding import get_shards, is_sharded, shard_for_user
+from ledger import archive, batch, history
+
+
+DEFAULT_CHUNK_SIZE = 5000
+
+FORMATS = ("csv", "ndjson")
+IMPORT_FIELDS = ("type", "account", "to_account", "amount")
+
+
+def read_rows(stream, file_format:str):
+    """
+    > It reads a settlement file one line at a time, yielding `(line number, row)` pairs. A CSV
+    file needs a header naming the `IMPORT_FIELDS`; empty cells and NDJSON lines are skipped
+
+    :param stream: A text stream of the file
+    :param file_format: "csv" or "ndjson"
+    :type file_format: str
+    """
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+
+        for row in reader:
+            yield reader.line_num, {field: value for field, value in row.items() if value not in ("", None)}
+        return
+
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            yield number, json.loads(line)
+        except ValueError as error:
+            yield number, error
+
+
+def chunks(iterable, chunk_size:int):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def error_message(detail) -> str:
+    if isinstance(detail, dict):
+        return "; ".join("{}: {}".format(field, error_message(value)) for field, value in detail.items())
+
+    if isinstance(detail, list):
+        return " ".join(error_message(value) for value in detail)
+
+    return str(detail)
+
+
+def import_chunk(rows:list) -> list:
+    """
+    > It validates a chunk of `(line number, row)` pairs, resolves all of their account names with
+    one query per shard, and posts the valid operations of each shard with one `batch.post_chunk`,
+    on behalf of the sending accounts' owners. The chunk commits once per shard it touches
+
+    :param rows: `(line number, row)` pairs as yielded by `read_rows`
+    :type rows: list
+    :return: One `(line number, transaction id, error message)` tuple per row
+    """
+    validator = BatchOperationSerializer()
+    results = {}
+    valid = []
+
+    for number, row in rows:
+        if not isinstance(row, dict):
+            results[number] = (number, None, "Invalid line: {}".format(row))
+            continue
+
+        try:
+            valid.append((number, validator.run_validation(row)))
+        except ValidationError as error:
+            results[number] = (number, None, error_message(error.detail))
+
+    accounts = batch.resolve_accounts(
+        [operation["account"] for _, operation in valid] +
+        [operation["to_account"] for _, operation in valid if operation.get("to_account")]
+    )
+    by_shard = defaultdict(list)
+
+    for number, operation in valid:
+        account = accounts.get(operation["account"])
+
+        if account is None:
+            results[number] = (number, None, "Opps. Account does not exist!")
+        else:
+            by_shard[shard_for_user(account[1])].append((number, operation))
+
+    with ExitStack() as stack:
+        for shard in sorted(by_shard):
+            stack.enter_context(transaction.atomic(using=shard))
+
+        for operations in by_shard.values():
+            posted = batch.post_chunk(None, [operation for _, operation in operations], accounts)
+
+            for (number, _), result in zip(operations, posted):
+                results[number] = (number, result["id"], result["message"])
+
+    return [results[number] for number, _ in rows]
+
+
+def import_rows(rows, chunk_size:int=DEFAULT_CHUNK_SIZE):
+    """
+    > It posts a stream of `(line number, row)` pairs one chunk at a time, so memory use is bounded
+    by the chunk size rather than the file size, yielding the results of each chunk
+    """
+    for chunk in chunks(rows, chunk_size):
+        yield import_chunk(chunk)
+
+
+def export_rows(start:datetime, end:datetime, chunk_size:int=history.EXPORT_CHUNK_SIZE):
+    """
+    > It streams the transactions created in `[start, end)` from every shard and its archive
+    tables, oldest first, as tuples of `history.EXPORT_FIELDS`. Each table is read with
+    `.iterator(chunk_size=...)`, a server-side cursor where the database has them, and the shards
+    are merged on the fly. The copies of cross-shard transfers kept for the receiver's history are
+    left out
+    """
+    streams = []
+
+    for shard in get_shards():
+        def build(model, shard=shard):
+            queryset = model.objects.using(shard).filter(date_created__gte=start, date_created__lt=end)
+
+            if is_sharded():
+                # Archive tables have no reverse relation to the inbox, so this is a subquery
+                queryset = queryset.exclude(pk__in=InboxMessage.objects.using(shard).values("transaction_id"))
+
+            return queryset.order_by("date_created", "id")\
+                .values_list(*history.EXPORT_FIELDS, "account_id", "to_account_id")
+
+        streams.append(build(Transaction).iterator(chunk_size=chunk_size))
+        # The archive tables of a shard hold months that do not overlap, oldest first
+        streams.append(chain.from_iterable(
+            queryset.iterator(chunk_size=chunk_size)
+            for queryset in archive.querysets(build, shard, start=start, end=end)
+        ))
+
+    return history.with_account_names(history.merge(streams, key=itemgetter(1, 0)))
@@ -0,0 +1,154 @@
+# Django Imports
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, models, router
+
+
+# Account and transaction primary keys of shard `n` are allocated from `n * ID_STRIDE` upwards,
+# so the shard of a row is known from its primary key alone
+ID_STRIDE = 10 ** 12
+
+# Models whose rows live on the shard of the user they belong to. Everything else, users included,
+# is written to `default`; users are copied to every shard so foreign keys to them still hold.
+SHARDED_MODELS = {
+    "account", "transaction", "usersummary", "journalentry", "balancesnapshot",
+    "outboxmessage", "inboxmessage", "balanceslot", "dailyrollup", "idempotencykey",
+}
+
+# Tables whose primary keys are allocated per shard, see `reserve_id_ranges`
+ID_RANGE_TABLES = ("accounts", "transactions")
+
+
+def get_shards() -> list:
+    return list(getattr(settings, "LEDGER_SHARDS", None) or [DEFAULT_DB_ALIAS])
+
+
+def is_sharded() -> bool:
+    return len(get_shards()) > 1
+
+
+def shard_for_user(user_id:int) -> str:
+    shards = get_shards()
+    return shards[user_id % len(shards)] if user_id is not None else shards[0]
+
+
+def shard_for_id(pk:int) -> str:
+    """
+    > It returns the shard holding the account or transaction with the primary key `pk`
+    """
+    shards = get_shards()
+    return shards[min(pk // ID_STRIDE, len(shards) - 1)] if pk is not None else shards[0]
+
+
+def shard_for_instance(instance) -> str:
+    if getattr(instance, "user_id", None) is not None:
+        return shard_for_user(instance.user_id)
+
+    for field in ("account_id", "transaction_id"):
+        if getattr(instance, field, None) is not None:
+            return shard_for_id(getattr(instance, field))
+
+    return get_shards()[0]
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    A queryset whose `create()` saves the new row on the shard of its user, unless `.using(...)`
+    named a database. The stock one saves to the database the queryset would write to, which
+    without an instance to route by is `default`.
+    """
+
+    def create(self, **kwargs):
+        if self._db is not None:
+            return super().create(**kwargs)
+
+        instance = self.model(**kwargs)
+        self._for_write = True
+        instance.save(force_insert=True, using=router.db_for_write(self.model, instance=instance))
+        return instance
+
+
+class ShardRouter:
+    """
+    Routes the ledger's per-user models to the shard of their user, `user_id % len(LEDGER_SHARDS)`,
+    and everything else to `default`. Querysets carry no instance, so code reading sharded models
+    picks the shard itself with `.using(...)`; saves are routed from the instance.
+    """
+
+    def route(self, model, hints:dict) -> str:
+        if model._meta.model_name not in SHARDED_MODELS:
+            return DEFAULT_DB_ALIAS
+
+        instance = hints.get("instance")
+
+        if instance is None:
+            return None
+
+        # A new row goes to the shard of its own user, even when a related row of another
+        # shard was assigned to it first
+        if instance._state.db and not instance._state.adding:
+            return instance._state.db
+
+        return shard_for_instance(instance)
+
+    def db_for_read(self, model, **hints):
+        return self.route(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self.route(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Rows only refer to rows of other shards by primary key, see `Transaction.to_account`
+        return True
+
+
+def reserve_id_ranges(using:str) -> None:
+    """
+    > It moves the primary key sequences of `ID_RANGE_TABLES` on a shard to the start of the
+    shard's range, unless they are already past it
+    """
+    shards = get_shards()
+
+    if using not in shards or not shards.index(using):
+        return
+
+    start = shards.index(using) * ID_STRIDE
+    connection = connections[using]
+
+    with connection.cursor() as cursor:
+        for table in ID_RANGE_TABLES:
+            if connection.vendor == "sqlite":
+                cursor.execute("DELETE FROM sqlite_sequence WHERE name = %s AND seq < %s", [table, start])
+                cursor.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) SELECT %s, %s "
+                    "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = %s)",
+                    [table, start, table],
+                )
+            elif connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+                    "GREATEST(%s, (SELECT COALESCE(MAX(id), 0) FROM {}) + 1), false)".format(
+                        connection.ops.quote_name(table)
+                    ),
+                    [table, start],
+                )
+            else:
+                raise NotImplementedError("Cannot reserve id ranges on {}.".format(connection.vendor))
+
+
+def replicate_users(users, using:str=None) -> None:
+    """
+    > It copies users to every shard (or just `using`) without their passwords, which only
+    `default` checks
+    """
+    shards = [using] if using else get_shards()[1:]
+
+    for shard in shards:
+        for user in users:
+            type(user).objects.using(shard).update_or_create(
+                pk=user.pk,
+                defaults={
+                    field.attname: getattr(user, field.attname)
+                    for field in user._meta.concrete_fields
+                    if field.attname not in ("id", "password")
+                },
+            )
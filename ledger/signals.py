@@ -0,0 +1,61 @@
+# Django Imports
+from django.db.backends.signals import connection_created
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_migrate, post_save, post_delete
+from django.dispatch import receiver
+
+# App Imports
+from ledger.models import Account, ApiKey, UserSummary
+from ledger import authentication, cache, group_commit, sharding
+
+
+@receiver(post_save, sender=Account)
+@receiver(post_delete, sender=Account)
+def invalidate_account_cache(sender, instance:Account, **kwargs) -> None:
+    cache.invalidate(instance)
+
+
+@receiver(post_delete, sender=Account)
+def release_account_slot(sender, instance:Account, **kwargs) -> None:
+    UserSummary.release_account(instance.user_id, balance=instance.available_amount)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs) -> None:
+    if connection.vendor == "sqlite" and group_commit.get_options()["ENABLED"]:
+        group_commit.tune_sqlite(connection)
+
+
+@receiver(post_save, sender=ApiKey)
+@receiver(post_delete, sender=ApiKey)
+def invalidate_api_key(sender, instance:ApiKey, **kwargs) -> None:
+    authentication.invalidate(instance.prefix)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_api_keys(sender, instance:User, created:bool, using:str, **kwargs) -> None:
+    # A deactivated user must not keep authenticating from this process's cache until the TTL runs out
+    if not created and using == DEFAULT_DB_ALIAS:
+        authentication.invalidate_user(instance)
+
+
+@receiver(post_save, sender=User)
+def replicate_user(sender, instance:User, using:str, **kwargs) -> None:
+    if using == DEFAULT_DB_ALIAS and sharding.is_sharded():
+        sharding.replicate_users([instance])
+
+
+@receiver(post_delete, sender=User)
+def delete_user_replicas(sender, instance:User, using:str, **kwargs) -> None:
+    if using == DEFAULT_DB_ALIAS:
+        for shard in sharding.get_shards()[1:]:
+            User.objects.using(shard).filter(pk=instance.pk).delete()
+
+
+@receiver(post_migrate)
+def prepare_shard(sender, using:str, **kwargs) -> None:
+    # A new shard starts its id range and receives the users registered so far
+    if sender.name == "ledger" and using != DEFAULT_DB_ALIAS and using in sharding.get_shards():
+        sharding.reserve_id_ranges(using)
+        sharding.replicate_users(User.objects.using(DEFAULT_DB_ALIAS).iterator(), using=using)
@@ -0,0 +1,9 @@
+# Standard Library Imports
+from unittest import skipIf
+
+# App Imports
+from ledger.sharding import get_shards
+
+
+# Tests reading and writing the default database only; they are skipped under LEDGER_SHARDS
+single_database = skipIf(len(get_shards()) > 1, "runs against a single database")
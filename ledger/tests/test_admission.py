@@ -0,0 +1,136 @@
+# Standard Library Imports
+import threading
+import time
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account
+from ledger import admission, cache
+from ledger.tests import single_database
+
+
+class ThrottleTests(SimpleTestCase):
+
+    def setUp(self):
+        admission.buckets.clear()
+        caches["default"].clear()
+
+    @override_settings(LEDGER_ADMISSION={"RATE": 2.0, "BURST": 2})
+    def test_bucket_refills_at_the_rate(self):
+        self.assertEqual(admission.take_token("client", now=0.0), 0)
+        self.assertEqual(admission.take_token("client", now=0.0), 0)
+        self.assertAlmostEqual(admission.take_token("client", now=0.0), 0.5)
+        self.assertAlmostEqual(admission.take_token("client", now=0.25), 0.25)
+        self.assertEqual(admission.take_token("client", now=0.75), 0)
+
+        # Other clients have buckets of their own
+        self.assertEqual(admission.take_token("other", now=0.75), 0)
+
+    @override_settings(LEDGER_ADMISSION={"RATE": 1.0, "BURST": 3})
+    def test_shared_windows_count_every_process(self):
+        shared = caches["default"]
+        now = 3000.1
+
+        self.assertEqual([admission.take_shared_token("client", shared, now=now) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(admission.take_shared_token("client", shared, now=now + 1), 1.9)
+
+        # The next window starts from zero
+        self.assertEqual(admission.take_shared_token("client", shared, now=now + 3), 0)
+        self.assertEqual(shared.get("{}client:1001".format(admission.KEY_PREFIX)), 1)
+
+
+class AdmissionGateTests(SimpleTestCase):
+
+    def setUp(self):
+        admission.stats.reset()
+
+    def test_postings_queue_for_a_free_slot(self):
+        gate = admission.AdmissionGate(max_concurrent=1, latency_budget=5.0)
+        self.assertTrue(gate.enter())
+        entered = []
+
+        waiter = threading.Thread(target=lambda: entered.append(gate.enter()))
+        waiter.start()
+        time.sleep(0.05)
+        gate.leave(0.01)
+        waiter.join(5.0)
+
+        self.assertEqual(entered, [True])
+        self.assertEqual(admission.stats.snapshot()["queued"], 1)
+
+    def test_queued_postings_time_out(self):
+        gate = admission.AdmissionGate(max_concurrent=1, latency_budget=0.05)
+        self.assertTrue(gate.enter())
+
+        started = time.monotonic()
+        self.assertFalse(gate.enter())
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        self.assertEqual(admission.stats.snapshot()["shed_timeouts"], 1)
+        self.assertEqual(gate.waiting, 0)
+
+    def test_slow_queues_are_shed_at_once(self):
+        gate = admission.AdmissionGate(max_concurrent=1, latency_budget=0.5)
+        self.assertTrue(gate.enter())
+        gate.service_time = 1.0
+
+        started = time.monotonic()
+        self.assertFalse(gate.enter())
+
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertEqual(admission.stats.snapshot()["shed"], 1)
+
+
+@single_database
+class AdmittedTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        admission.buckets.clear()
+        admission.stats.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def deposit(self):
+        return self.client.post(
+            "/api/deposit/", {"account": self.main.pk, "amount": "1", "type": "deposit"}, format="json"
+        )
+
+    def test_disabled_admission_lets_everything_through(self):
+        for _ in range(5):
+            self.assertEqual(self.deposit().status_code, 201)
+
+        self.assertEqual(admission.stats.snapshot()["admitted"], 0)
+
+    @override_settings(LEDGER_ADMISSION={"ENABLED": True, "RATE": 0.5, "BURST": 2})
+    def test_throttled_clients_are_told_when_to_retry(self):
+        self.assertEqual([self.deposit().status_code for _ in range(3)], [201, 201, 429])
+
+        response = self.deposit()
+        self.assertEqual(response.status_code, 429)
+        self.assertIn(response["Retry-After"], ("1", "2"))
+        self.assertEqual(admission.stats.snapshot()["throttled"], 2)
+
+    @override_settings(LEDGER_ADMISSION={"ENABLED": True})
+    def test_shed_postings_are_told_when_to_retry(self):
+        gate = admission.gate
+        in_flight, gate.in_flight = gate.in_flight, gate.max_concurrent
+        service_time, gate.service_time = gate.service_time, 60.0
+
+        try:
+            response = self.deposit()
+        finally:
+            gate.in_flight, gate.service_time = in_flight, service_time
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+        self.assertEqual(admission.stats.snapshot()["shed"], 1)
@@ -0,0 +1,101 @@
+# Standard Library Imports
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, JournalEntry, Transaction
+from ledger.sharding import get_shards
+from ledger import archive, cache, history, journal
+
+
+# SQLite cannot create tables inside the test case's transaction, hence TransactionTestCase
+@override_settings(LEDGER_ARCHIVE={"REFRESH_SECONDS": 0, "BATCH_SIZE": 4})
+class ArchiveTests(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        archive.registry.clear()
+        self.user = User.objects.create_user("alice", password="alice")
+        self.account = Account.objects.create(name="main", user=self.user)
+        self.shard = self.account._state.db
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.now = timezone.now()
+
+        for index in range(12):
+            response = self.client.post(
+                "/api/deposit/", {"account": self.account.pk, "amount": "1", "type": "deposit"}, format="json"
+            )
+            self.assertEqual(response.status_code, 201, response.content)
+
+        # One transaction every ten days, going back four months
+        for index, pk in enumerate(Transaction.objects.using(self.shard).order_by("-pk").values_list("pk", flat=True)):
+            Transaction.objects.using(self.shard).filter(pk=pk).update(date_created=self.now - timedelta(days=index * 10))
+
+    def tearDown(self):
+        # Archive tables are not managed by Django, so the test flush leaves them behind
+        for shard in get_shards():
+            with connections[shard].schema_editor() as editor:
+                for partition in archive.partitions(shard):
+                    editor.delete_model(partition.model)
+
+        archive.registry.clear()
+
+    def history(self) -> list:
+        pks, cursor = [], None
+
+        while True:
+            transactions, cursor = history.page(self.account.pk, cursor=cursor, page_size=5)
+            pks.extend(transaction.pk for transaction in transactions)
+
+            if not cursor:
+                return pks
+
+    def test_history_reads_the_archive(self):
+        before = self.history()
+        exported = list(history.export_rows(self.account.pk))
+        cutoff = self.now - timedelta(days=45)
+
+        moved = archive.archive(cutoff, using=self.shard)
+
+        self.assertEqual(moved, 7)
+        self.assertEqual(Transaction.objects.using(self.shard).count(), 5)
+        self.assertGreaterEqual(len(archive.partitions(self.shard)), 2)
+
+        for partition in archive.partitions(self.shard):
+            for date_created in partition.model.objects.using(self.shard).values_list("date_created", flat=True):
+                self.assertTrue(partition.start <= date_created < partition.end)
+
+        self.assertEqual(self.history(), before)
+        self.assertEqual(list(history.export_rows(self.account.pk)), exported)
+
+        response = self.client.get("/api/accounts/main/transactions/?page_size=50")
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(response.json()["data"]["results"]), 12)
+
+    def test_balances_are_left_alone(self):
+        call_command("archive_transactions", "--older-than-days", "45", stdout=StringIO())
+
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.available_amount, Decimal("12"))
+        self.assertEqual(JournalEntry.objects.using(self.shard).filter(account=self.account).count(), 12)
+        self.assertEqual(journal.verify(full=True, using=self.shard).mismatches, [])
+
+        # A second run finds nothing left to move, and postings go on as before
+        self.assertEqual(archive.archive(self.now - timedelta(days=45), using=self.shard), 0)
+        response = self.client.post(
+            "/api/deposit/", {"account": self.account.pk, "amount": "1", "type": "deposit"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
@@ -0,0 +1,62 @@
+# Standard Library Imports
+import asyncio
+from decimal import Decimal
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase, override_settings
+
+# App Imports
+from ledger.models import Account
+from ledger import async_views, cache
+from ledger.tests import single_database
+
+
+class DbWorkersTests(SimpleTestCase):
+
+    @override_settings(LEDGER_ASYNC_DB_WORKERS=32, LEDGER_DB_POOL={"ENABLED": False, "MAX_SIZE": 10})
+    def test_workers_without_a_pool(self):
+        self.assertEqual(async_views.db_workers(), 32)
+
+    @override_settings(LEDGER_ASYNC_DB_WORKERS=32, LEDGER_DB_POOL={"ENABLED": True, "MAX_SIZE": 10})
+    def test_workers_never_outnumber_pooled_connections(self):
+        self.assertEqual(async_views.db_workers(), 10)
+
+    @override_settings(LEDGER_ASYNC_DB_WORKERS=4, LEDGER_DB_POOL={"ENABLED": True, "MAX_SIZE": 10})
+    def test_smaller_worker_counts_are_kept(self):
+        self.assertEqual(async_views.db_workers(), 4)
+
+
+@single_database
+class AsyncViewTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.client = AsyncClient()
+        self.client.force_login(self.alice)
+
+    def test_postings_and_balances(self):
+        async def run():
+            # One at a time: the in-memory test database locks whole tables between connections
+            for _ in range(5):
+                response = await self.client.post(
+                    "/api/async/deposit/", {"account": self.main.pk, "amount": "2", "type": "deposit"},
+                    content_type="application/json",
+                )
+                self.assertEqual(response.status_code, 201, response.content)
+
+            response = await self.client.get("/api/async/user-balance/")
+            self.assertEqual(response.status_code, 202, response.content)
+            self.assertIn("10", response.json()["message"])
+
+            response = await self.client.get("/api/async/account-balance/nope/")
+            self.assertEqual(response.status_code, 400, response.content)
+
+            response = await AsyncClient().get("/api/async/user-balance/")
+            self.assertIn(response.status_code, (401, 403))
+
+        asyncio.run(run())
+        self.main.refresh_from_db()
+        self.assertEqual(self.main.available_amount, Decimal("10"))
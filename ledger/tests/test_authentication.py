@@ -0,0 +1,85 @@
+# Standard Library Imports
+from datetime import timedelta
+from io import StringIO
+
+# Django Imports
+from django.contrib.auth.models import User, update_last_login
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+# App Imports
+from ledger.models import Account, ApiKey
+from ledger import authentication, cache
+from ledger.tests import single_database
+
+
+@single_database
+class ApiKeyAuthenticationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        authentication.local.clear()
+        authentication.user_prefixes.clear()
+        authentication.stats.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.api_key, self.key = authentication.generate(self.alice)
+
+    def deposit(self, key:str=None):
+        return self.client.post(
+            "/api/deposit/", {"account": self.main.pk, "amount": "1", "type": "deposit"},
+            content_type="application/json", HTTP_AUTHORIZATION="ApiKey {}".format(key or self.key),
+        )
+
+    def test_keys_authenticate_from_the_cache(self):
+        self.assertEqual(self.deposit().status_code, 201)
+        self.assertEqual(self.deposit().status_code, 201)
+
+        snapshot = authentication.stats.snapshot()
+        self.assertEqual((snapshot["misses"], snapshot["hits"]), (1, 1))
+
+    def test_wrong_and_expired_keys_are_rejected(self):
+        self.assertEqual(self.deposit(self.key + "x").status_code, 401)
+        self.assertEqual(self.deposit("unknown").status_code, 401)
+
+        _, expired = authentication.generate(self.alice, expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.deposit(expired).status_code, 401)
+
+    def test_revoking_a_key_invalidates_it(self):
+        self.assertEqual(self.deposit().status_code, 201)
+
+        self.api_key.revoked = True
+        self.api_key.save()
+
+        self.assertEqual(self.deposit().status_code, 401)
+
+    def test_deactivating_the_user_invalidates_their_keys(self):
+        self.assertEqual(self.deposit().status_code, 201)
+
+        self.alice.is_active = False
+        self.alice.save()
+        self.assertEqual(self.deposit().status_code, 401)
+
+        self.alice.is_active = True
+        self.alice.save()
+        self.assertEqual(self.deposit().status_code, 201)
+
+    def test_unrelated_user_saves_keep_keys_cached(self):
+        self.assertEqual(self.deposit().status_code, 201)
+
+        with self.assertNumQueries(1):
+            update_last_login(None, self.alice)
+
+        self.alice.first_name = "Alice"
+        self.alice.save()
+
+        self.assertIsNotNone(authentication.local.get(self.api_key.prefix))
+
+    def test_create_api_key_command(self):
+        out = StringIO()
+        call_command("create_api_key", "alice", stdout=out)
+        key = out.getvalue().strip().splitlines()[-1]
+
+        self.assertEqual(self.deposit(key).status_code, 201)
+        self.assertEqual(ApiKey.objects.filter(user=self.alice).count(), 2)
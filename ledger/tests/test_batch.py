@@ -0,0 +1,97 @@
+# Standard Library Imports
+import json
+from decimal import Decimal
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, Transaction
+from ledger import cache
+from ledger.tests import single_database
+
+
+@single_database
+class BatchPostingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.bob = User.objects.create_user("bob", password="bob")
+        self.main = Account.objects.create(name="main", user=self.alice)
+        self.savings = Account.objects.create(name="savings", user=self.alice)
+        self.bobs = Account.objects.create(name="bobs", user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def balance(self, account:Account) -> Decimal:
+        account.refresh_from_db()
+        return account.available_amount
+
+    def test_all_posted(self):
+        response = self.client.post("/api/batch/", [
+            {"type": "deposit", "account": "main", "amount": "100"},
+            {"type": "withdraw", "account": "main", "amount": "5"},
+            {"type": "transfer", "account": "main", "to_account": "savings", "amount": "10"},
+            {"type": "transfer", "account": "main", "to_account": "bobs", "amount": "20"},
+        ], format="json")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(
+            [result["status"] for result in response.json()["data"]["results"]], ["success"] * 4
+        )
+        self.assertEqual(self.balance(self.main), Decimal("65"))
+        self.assertEqual(self.balance(self.savings), Decimal("10"))
+        self.assertEqual(self.balance(self.bobs), Decimal("20"))
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_partial_failure_returns_multi_status(self):
+        response = self.client.post("/api/batch/", [
+            {"type": "deposit", "account": "main", "amount": "10"},
+            {"type": "deposit", "account": "missing", "amount": "10"},
+            {"type": "deposit", "account": "bobs", "amount": "10"},
+            {"type": "transfer", "account": "main", "to_account": "savings", "amount": "4"},
+        ], format="json")
+
+        self.assertEqual(response.status_code, 207, response.content)
+        self.assertEqual(
+            [result["status"] for result in response.json()["data"]["results"]],
+            ["success", "error", "error", "success"],
+        )
+        self.assertEqual(self.balance(self.main), Decimal("6"))
+        self.assertEqual(self.balance(self.savings), Decimal("4"))
+        self.assertEqual(self.balance(self.bobs), Decimal("0"))
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_ndjson(self):
+        body = "".join(json.dumps(operation) + "\n" for operation in [
+            {"type": "deposit", "account": "main", "amount": "3"},
+            {"type": "deposit", "account": "savings", "amount": "4"},
+        ])
+
+        response = self.client.post("/api/batch/", body, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.balance(self.main) + self.balance(self.savings), Decimal("7"))
+
+    def test_invalid_operation_rejects_the_batch(self):
+        response = self.client.post("/api/batch/", [
+            {"type": "deposit", "account": "main", "amount": "3"},
+            {"type": "transfer", "account": "main", "amount": "1"},
+        ], format="json")
+
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_refunds_cannot_be_posted(self):
+        response = self.client.post("/api/batch/", [
+            {"type": "refund", "account": "main", "amount": "5"},
+        ], format="json")
+
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertIn("type", response.json()["message"][0])
+        self.assertEqual(self.balance(self.main), Decimal("0"))
@@ -0,0 +1,131 @@
+# Standard Library Imports
+import json
+import os
+import tempfile
+from io import StringIO
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+# App Imports
+from ledger.benchmarks import workload
+from ledger.benchmarks.harness import Benchmark, percentile
+from ledger.models import Account
+from ledger import cache
+from ledger.tests import single_database
+
+
+@single_database
+class HarnessTests(TestCase):
+
+    def test_percentile(self):
+        latencies = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+        self.assertEqual(percentile(latencies, 0.0), 1.0)
+        self.assertEqual(percentile(latencies, 0.5), 3.0)
+        self.assertEqual(percentile(latencies, 1.0), 5.0)
+
+    def test_rounds_record_latency_and_queries(self):
+        benchmark = Benchmark("count", driver="test")
+
+        def two_queries():
+            return User.objects.exists() or Account.objects.exists() or True
+
+        result = benchmark.pedantic(two_queries, rounds=5, warmup_rounds=2)
+
+        stats = benchmark.stats
+        self.assertIs(result, True)
+        self.assertEqual((stats["name"], stats["driver"], stats["rounds"], stats["errors"]), ("count", "test", 5, 0))
+        self.assertEqual((stats["queries_per_request"], stats["max_queries"]), (2, 2))
+        self.assertLessEqual(stats["min_ms"], stats["p50_ms"])
+        self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+        self.assertGreater(stats["requests_per_second"], 0)
+
+    def test_false_results_count_as_errors(self):
+        benchmark = Benchmark("failing")
+        benchmark(lambda: False)
+        benchmark(lambda: None)
+
+        combined = Benchmark.combine("mix", [benchmark, Benchmark("empty")])
+
+        self.assertEqual((combined.stats["rounds"], combined.stats["errors"]), (2, 1))
+        self.assertEqual(Benchmark("empty").stats, {"name": "empty", "rounds": 0})
+
+
+@single_database
+@override_settings(ALLOWED_HOSTS=["testserver"])
+class WorkloadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seeded = workload.seed(3, 2, prefix="test")
+
+    def test_seed(self):
+        self.assertEqual(len(self.seeded), 3)
+        self.assertEqual(Account.objects.filter(user__username__startswith="test-").count(), 6)
+        self.assertTrue(all(
+            account.available_amount == workload.OPENING_BALANCE for _, accounts in self.seeded for account in accounts
+        ))
+
+    def test_parse_mix(self):
+        self.assertEqual(workload.parse_mix("deposit=4,withdraw"), {"deposit": 4, "withdraw": 1})
+
+        with self.assertRaises(ValueError):
+            workload.parse_mix("refund=1")
+
+    def test_generate_is_reproducible(self):
+        first = workload.generate(workload.DEFAULT_MIX, self.seeded, 40, seed_value=7)
+        second = workload.generate(workload.DEFAULT_MIX, self.seeded, 40, seed_value=7)
+
+        self.assertEqual([(request.operation, request.path, request.data) for request in first],
+                         [(request.operation, request.path, request.data) for request in second])
+        self.assertEqual({request.operation for request in first}, set(workload.OPERATIONS))
+
+    def test_drivers_post_every_operation(self):
+        requests = workload.generate(workload.DEFAULT_MIX, self.seeded, 20, seed_value=1)
+
+        for driver in (workload.ClientDriver(), workload.ClientDriver(auth="apikey"), workload.ViewDriver()):
+            benchmark = Benchmark("mix", driver=driver.name)
+
+            for request in requests:
+                benchmark(driver, request)
+
+            self.assertEqual((benchmark.stats["rounds"], benchmark.stats["errors"]), (20, 0), driver.name)
+
+
+@single_database
+class BenchmarkCommandTests(TestCase):
+
+    def test_writes_comparable_results(self):
+        out = StringIO()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            call_command("benchmark_ledger", users=3, requests=20, warmup=2, output=path, stdout=out)
+
+            with open(path) as results:
+                document = json.load(results)
+
+        self.assertEqual(document["meta"]["options"]["requests"], 20)
+        self.assertLessEqual(
+            {("client", "mix"), ("view", "mix")}, {(result["driver"], result["name"]) for result in document["results"]}
+        )
+
+        for result in document["results"]:
+            self.assertEqual(result["errors"], 0, result)
+
+        self.assertIn("req/s", out.getvalue())
+
+        # Everything the run seeded is rolled back
+        self.assertFalse(User.objects.filter(username__startswith="bench-").exists())
+
+    def test_deposit_queries(self):
+        out = StringIO()
+        call_command("benchmark_deposit_queries", iterations=5, stdout=out)
+        queries = {line[:28].strip(): line[28:].split()[0] for line in out.getvalue().splitlines()}
+
+        self.assertEqual(queries["Account.save() (old)"], "3.00")
+        self.assertEqual(queries["F() update (new)"], "1.00")
+        self.assertFalse(Account.objects.filter(name="benchmark-deposit-queries").exists())
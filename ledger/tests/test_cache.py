@@ -0,0 +1,99 @@
+# Standard Library Imports
+from unittest import mock
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import SimpleTestCase, TestCase, override_settings
+
+# App Imports
+from ledger.cache import LRUCache
+from ledger.models import Account
+from ledger import cache
+from ledger.tests import single_database
+
+
+class LRUCacheTests(SimpleTestCase):
+
+    def test_least_recently_used_entries_are_evicted(self):
+        entries = LRUCache(maxsize=2, ttl=60)
+        entries.set("a", 1)
+        entries.set("b", 2)
+        entries.get("a")
+        entries.set("c", 3)
+
+        self.assertEqual((entries.get("a"), entries.get("b"), entries.get("c")), (1, None, 3))
+        self.assertEqual(len(entries), 2)
+
+    def test_entries_expire(self):
+        entries = LRUCache(maxsize=2, ttl=60)
+
+        with mock.patch("ledger.cache.time.monotonic", return_value=0.0):
+            entries.set("a", 1)
+
+        with mock.patch("ledger.cache.time.monotonic", return_value=59.0):
+            self.assertEqual(entries.get("a"), 1)
+
+        with mock.patch("ledger.cache.time.monotonic", return_value=61.0):
+            self.assertIsNone(entries.get("a"))
+
+
+@single_database
+class AccountCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        caches["default"].clear()
+        cache.stats.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+
+    def test_lookups_are_cached(self):
+        cache.get_account(pk=self.main.pk)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get_account(pk=self.main.pk).name, self.main.name)
+            self.assertEqual(cache.get_account(name=self.main.name).pk, self.main.pk)
+            self.assertEqual(cache.get_account(name=self.main.name, user_id=self.alice.pk).pk, self.main.pk)
+
+        self.assertEqual(cache.stats.snapshot()["misses"], 1)
+
+    def test_balances_are_not_cached(self):
+        account = cache.get_account(pk=self.main.pk)
+        Account.objects.filter(pk=self.main.pk).update(available_amount=5)
+
+        self.assertEqual(account.available_amount, 5)
+
+    def test_renames_and_deletes_invalidate(self):
+        old_name = self.main.name
+        cache.get_account(pk=self.main.pk)
+
+        self.main.name = "alice-spending"
+        self.main.save()
+
+        self.assertEqual(cache.get_account(pk=self.main.pk).name, "alice-spending")
+
+        with self.assertRaises(Account.DoesNotExist):
+            cache.get_account(name=old_name)
+
+        pk = self.main.pk
+        self.main.delete()
+
+        with self.assertRaises(Account.DoesNotExist):
+            cache.get_account(pk=pk)
+
+    @override_settings(LEDGER_ACCOUNT_CACHE={"BACKEND": "default"})
+    def test_shared_cache(self):
+        cache.get_account(pk=self.main.pk)
+        cache.clear()
+
+        with self.assertNumQueries(0):
+            cache.get_account(pk=self.main.pk)
+
+        self.assertEqual(cache.stats.snapshot()["shared_hits"], 1)
+
+        self.main.name = "alice-spending"
+        self.main.save()
+        cache.clear()
+
+        self.assertEqual(cache.get_account(pk=self.main.pk).name, "alice-spending")
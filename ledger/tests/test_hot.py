@@ -0,0 +1,96 @@
+# Standard Library Imports
+from decimal import Decimal
+from io import StringIO
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, BalanceSlot, UserSummary
+from ledger import cache, hot, journal
+from ledger.tests import single_database
+
+
+@single_database
+class HotAccountTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        hot.registry.clear()
+        self.merchant = User.objects.create_user("merchant", password="merchant")
+        self.payer = User.objects.create_user("payer", password="payer")
+        self.shop = Account.objects.create(name="shop", user=self.merchant)
+        self.wallet = Account.objects.create(name="wallet", user=self.payer)
+        self.client = self.client_for(self.merchant)
+        self.post("/api/deposit/", {"account": self.shop.pk, "amount": "100", "type": "deposit"})
+        self.client_for(self.payer).post(
+            "/api/deposit/", {"account": self.wallet.pk, "amount": "1000", "type": "deposit"}, format="json"
+        )
+        call_command("hot_account", "shop", "--slots", "4", stdout=StringIO())
+        hot.stats.reset()
+
+    def client_for(self, user:User) -> APIClient:
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def post(self, path:str, data:dict, client:APIClient=None):
+        response = (client or self.client).post(path, data, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+        return response
+
+    def balances(self) -> tuple:
+        self.shop.refresh_from_db()
+        slots = sum(BalanceSlot.objects.filter(account=self.shop).values_list("amount", flat=True))
+        return self.shop.available_amount, slots
+
+    def test_postings_land_on_the_slots(self):
+        payer = self.client_for(self.payer)
+
+        for _ in range(10):
+            self.post(
+                "/api/account-to-user-transfer/shop/{}/".format(self.merchant.pk),
+                {"account": self.wallet.pk, "amount": "5", "type": "transfer"}, client=payer,
+            )
+
+        self.post("/api/deposit/", {"account": self.shop.pk, "amount": "7", "type": "deposit"})
+        self.post("/api/withdraw/", {"account": self.shop.pk, "amount": "5", "type": "withdraw"})
+
+        self.assertEqual(BalanceSlot.objects.filter(account=self.shop).count(), 4)
+        self.assertEqual(self.balances(), (Decimal("100"), Decimal("52")))
+        self.assertFalse(BalanceSlot.objects.filter(amount__lt=0).exists())
+        self.assertEqual(UserSummary.objects.get(user=self.merchant).balance, Decimal("100"))
+
+        # Reads add the slots to the account row and the owner's summary
+        self.assertIn("152", self.client.get("/api/account-balance/shop/").json()["message"])
+        self.assertIn("152", self.client.get("/api/user-balance/").json()["message"])
+        self.assertEqual(journal.verify(full=True).mismatches, [])
+
+    def test_debits_no_slot_covers_go_to_the_account(self):
+        self.post("/api/deposit/", {"account": self.shop.pk, "amount": "8", "type": "deposit"})
+        self.post("/api/withdraw/", {"account": self.shop.pk, "amount": "50", "type": "withdraw"})
+
+        self.assertEqual(self.balances(), (Decimal("50"), Decimal("8")))
+        self.assertEqual(hot.stats.snapshot()["account_postings"], 1)
+
+    def test_the_owner_is_still_enforced(self):
+        response = self.client_for(self.payer).post(
+            "/api/deposit/", {"account": self.shop.pk, "amount": "7", "type": "deposit"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400, response.content)
+        self.assertEqual(self.balances(), (Decimal("100"), Decimal("0")))
+
+    def test_cooling_down_folds_the_slots_back(self):
+        self.post("/api/deposit/", {"account": self.shop.pk, "amount": "20", "type": "deposit"})
+        call_command("hot_account", "shop", "--slots", "0", stdout=StringIO())
+
+        self.assertEqual(self.balances(), (Decimal("120"), Decimal("0")))
+        self.assertFalse(BalanceSlot.objects.exists())
+        self.assertEqual(UserSummary.objects.get(user=self.merchant).balance, Decimal("120"))
+        self.assertEqual(journal.verify(full=True).mismatches, [])
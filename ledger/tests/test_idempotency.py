@@ -0,0 +1,94 @@
+# Standard Library Imports
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, IdempotencyKey, Transaction
+from ledger import cache, idempotency
+from ledger.tests import single_database
+
+
+@single_database
+class IdempotencyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        idempotency.local.clear()
+        self.user = User.objects.create_user("alice", password="alice")
+        self.account = Account.objects.create(name="main", user=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.body = {"account": self.account.pk, "amount": "5", "type": "deposit"}
+
+    def deposit(self, body:dict, key:str="key-1"):
+        return self.client.post("/api/deposit/", body, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def balance(self) -> Decimal:
+        self.account.refresh_from_db()
+        return self.account.available_amount
+
+    def test_retry_replays_the_stored_response(self):
+        first = self.deposit(self.body)
+        self.assertEqual(first.status_code, 201, first.content)
+
+        # Once from the process cache, once from the database
+        for _ in range(2):
+            retry = self.deposit(self.body)
+            self.assertEqual(retry.status_code, 201)
+            self.assertEqual(retry.json(), first.json())
+            self.assertEqual(retry["Idempotent-Replayed"], "true")
+            idempotency.local.clear()
+
+        self.assertEqual(self.balance(), Decimal("5"))
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_reused_key_with_another_body_is_rejected(self):
+        self.deposit(self.body)
+
+        response = self.deposit({**self.body, "amount": "6"})
+
+        self.assertEqual(response.status_code, 422, response.content)
+        self.assertEqual(self.balance(), Decimal("5"))
+
+    def test_retry_while_the_first_request_runs_conflicts(self):
+        self.deposit(self.body)
+        IdempotencyKey.objects.update(status_code=None, response=None)
+        idempotency.local.clear()
+
+        response = self.deposit(self.body)
+
+        self.assertEqual(response.status_code, 409, response.content)
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    def test_rejected_request_does_not_keep_the_key(self):
+        response = self.deposit({**self.body, "type": "withdraw"}, key="key-2")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.filter(key="key-2").exists())
+
+    def test_batch_is_posted_once(self):
+        operations = [{"type": "deposit", "account": "main", "amount": "1"}]
+
+        for _ in range(2):
+            response = self.client.post("/api/batch/", operations, format="json", HTTP_IDEMPOTENCY_KEY="key-3")
+            self.assertEqual(response.status_code, 201, response.content)
+
+        self.assertEqual(self.balance(), Decimal("1"))
+
+    def test_expired_keys_are_pruned(self):
+        self.deposit(self.body)
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command("prune_idempotency_keys", "--batch-size", "1", stdout=StringIO())
+
+        self.assertFalse(IdempotencyKey.objects.exists())
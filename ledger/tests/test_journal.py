@@ -0,0 +1,97 @@
+# Standard Library Imports
+from datetime import timedelta
+from decimal import Decimal
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.forms import ValidationError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, BalanceSnapshot, JournalEntry, Transaction
+from ledger import cache, journal
+from ledger.tests import single_database
+
+
+@single_database
+@override_settings(LEDGER_JOURNAL={"SETTLE_SECONDS": 0})
+class JournalTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.bob = User.objects.create_user("bob", password="bob")
+        self.main = Account.objects.create(name="main", user=self.alice)
+        self.savings = Account.objects.create(name="savings", user=self.alice)
+        self.bobs = Account.objects.create(name="bobs", user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def post(self, path:str, data:dict) -> None:
+        response = self.client.post(path, data, format="json")
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_every_transaction_balances(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "100.10", "type": "deposit"})
+        self.post("/api/withdraw/", {"account": self.main.pk, "amount": "0.20", "type": "withdraw"})
+        self.post("/api/account-to-account-transfer/", {"account": self.main.pk, "to_account": self.savings.pk, "amount": "0.10", "type": "transfer"})
+        self.post("/api/account-to-user-transfer/bobs/{}/".format(self.bob.pk), {"account": self.main.pk, "amount": "10", "type": "transfer"})
+
+        for transaction in Transaction.objects.all():
+            self.assertTrue(transaction.entries.exists())
+            self.assertEqual(sum(entry.amount for entry in transaction.entries.all()), 0)
+
+        result = journal.verify(full=True)
+        self.assertEqual((result.accounts, result.mismatches, result.unbalanced), (3, [], []))
+
+    def test_balance_as_of_with_and_without_snapshots(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "100", "type": "deposit"})
+        moment = timezone.now()
+        self.post("/api/withdraw/", {"account": self.main.pk, "amount": "30", "type": "withdraw"})
+
+        # From the journal alone, then from the snapshot and the entries after it
+        for take_snapshot in (False, True):
+            if take_snapshot:
+                self.assertEqual(journal.take_snapshots(), 1)
+
+            self.assertEqual(journal.balance_as_of(self.main.pk, moment), Decimal("100"))
+            self.assertEqual(journal.balance_as_of(self.main.pk), Decimal("70"))
+            self.assertEqual(journal.balance_as_of(self.main.pk, moment - timedelta(days=1)), Decimal("0"))
+
+        response = self.client.get("/api/account-balance/main/", {"as_of": moment.isoformat()})
+        self.assertIn("100", response.json()["message"])
+        self.assertEqual(self.client.get("/api/account-balance/main/", {"as_of": "yesterday"}).status_code, 400)
+
+    def test_verify_finds_drifted_balances(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "5", "type": "deposit"})
+        Account.objects.filter(pk=self.savings.pk).update(available_amount=Decimal("9"))
+
+        mismatches = journal.verify().mismatches
+
+        self.assertEqual(len(mismatches), 1)
+
+    def test_entries_are_append_only(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "5", "type": "deposit"})
+        entry = JournalEntry.objects.first()
+
+        with self.assertRaises(ValidationError):
+            entry.save()
+
+        with self.assertRaises(ValidationError):
+            entry.delete()
+
+    @override_settings(LEDGER_JOURNAL={"SETTLE_SECONDS": 60})
+    def test_unsettled_entries_wait_for_the_next_snapshot(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "7", "type": "deposit"})
+
+        self.assertEqual(journal.take_snapshots(), 0)
+        self.assertEqual(journal.balance_as_of(self.main.pk), Decimal("7"))
+
+        JournalEntry.objects.update(date_created=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(journal.take_snapshots(), 1)
+        self.assertEqual(BalanceSnapshot.objects.get(account=self.main).balance, Decimal("7"))
@@ -0,0 +1,102 @@
+# Standard Library Imports
+import asyncio
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import AsyncClient, RequestFactory, TestCase, TransactionTestCase, override_settings
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.middleware import QueryMetricsMiddleware
+from ledger.models import Account
+from ledger import cache, metrics
+from ledger.tests import single_database
+
+
+@single_database
+@override_settings(LEDGER_METRICS={"ENABLED": True, "SAMPLE_RATE": 1.0})
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def deposit(self):
+        response = self.client.post(
+            "/api/deposit/", {"account": self.main.pk, "amount": "5", "type": "deposit"}, format="json"
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_requests_are_recorded_per_view(self):
+        for _ in range(3):
+            self.deposit()
+
+        labels = ("ledger:deposit", "POST")
+        self.assertEqual(sum(metrics.request_seconds.series[labels][0]), 3)
+
+        for histogram in (metrics.db_seconds, metrics.serializer_seconds, metrics.render_seconds):
+            counts, seconds = histogram.series[labels]
+            self.assertEqual(sum(counts), 3)
+            self.assertGreater(seconds, 0)
+
+    def test_exposition(self):
+        self.deposit()
+        response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
+        text = response.content.decode()
+
+        for name in ("request_seconds", "db_seconds", "serializer_seconds", "render_seconds", "db_queries"):
+            self.assertIn('ledger_{}_count{{view="ledger:deposit",method="POST"}} 1'.format(name), text)
+
+        self.assertIn("# TYPE ledger_posting_postings_total counter", text)
+        self.assertIn("ledger_metrics_sample_rate 1.0", text)
+
+    @override_settings(LEDGER_METRICS={"ENABLED": True, "SAMPLE_RATE": 0.0})
+    def test_unsampled_requests_are_not_recorded(self):
+        self.deposit()
+        self.assertEqual(metrics.request_seconds.series, {})
+
+
+@single_database
+@override_settings(LEDGER_METRICS={"ENABLED": True, "SAMPLE_RATE": 1.0})
+class AsyncMetricsTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+
+    def test_middleware_follows_the_chain(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(asyncio.iscoroutinefunction(QueryMetricsMiddleware(get_response)))
+        self.assertFalse(asyncio.iscoroutinefunction(QueryMetricsMiddleware(lambda request: HttpResponse())))
+
+        response = asyncio.run(QueryMetricsMiddleware(get_response)(RequestFactory().get("/")))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(("unmatched", "GET"), metrics.request_seconds.series)
+
+    def test_async_views_count_their_queries(self):
+        client = AsyncClient()
+        client.force_login(self.alice)
+
+        response = asyncio.run(client.post(
+            "/api/async/deposit/", {"account": self.main.pk, "amount": "5", "type": "deposit"},
+            content_type="application/json",
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+
+        counts, queries = metrics.db_queries.series[("ledger:async-deposit", "POST")]
+        self.assertEqual(sum(counts), 1)
+        self.assertGreater(queries, 0)
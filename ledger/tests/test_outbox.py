@@ -0,0 +1,132 @@
+# Standard Library Imports
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, InboxMessage, OutboxMessage, Transaction
+from ledger.sharding import get_shards, shard_for_user
+from ledger import cache, outbox, posting, reconciliation
+from ledger.tests import single_database
+
+
+@single_database
+class OutboxTests(TestCase):
+    """
+    The outbox driven directly, on a single database where the sending and the receiving shard
+    are the same one.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.bob = User.objects.create_user("bob", password="bob")
+        self.sender = Account.objects.create(name="alices", user=self.alice, available_amount=Decimal("100"))
+        Transaction.objects.create(account=self.sender, user=self.alice, amount=Decimal("100"), type="deposit")
+        self.receiver = Account.objects.create(name="bobs", user=self.bob)
+        self.receiver_id = self.receiver.pk
+
+    def send(self, amount:Decimal) -> OutboxMessage:
+        sent = Transaction.objects.create(
+            account=self.sender, to_account_id=self.receiver_id, user=self.alice, to_user=self.bob,
+            amount=amount, type="transfer",
+        )
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic(using=sent._state.db):
+            message = outbox.send(sent, posting.debit(amount, pk=self.sender.pk, user=self.alice))
+
+        return OutboxMessage.objects.select_related("transaction").get(pk=message.pk)
+
+    def balance(self, account:Account) -> Decimal:
+        account.refresh_from_db()
+        return account.available_amount
+
+    def test_delivered_after_commit(self):
+        message = self.send(Decimal("30"))
+
+        self.assertIsNotNone(message.date_delivered)
+        self.assertEqual(self.balance(self.sender), Decimal("70"))
+        self.assertEqual(self.balance(self.receiver), Decimal("30"))
+        self.assertEqual(InboxMessage.objects.get().message_id, message.pk)
+
+    def test_redelivery_credits_once(self):
+        message = self.send(Decimal("30"))
+
+        self.assertTrue(outbox.deliver(message))
+        self.assertEqual(outbox.relay(), (0, 0))
+
+        self.assertEqual(self.balance(self.receiver), Decimal("30"))
+        self.assertEqual(InboxMessage.objects.count(), 1)
+
+    def test_missing_receiver_refunds_the_sender(self):
+        self.receiver.delete()
+
+        message = self.send(Decimal("30"))
+
+        self.assertIsNone(message.date_delivered)
+        self.assertIsNotNone(message.date_failed)
+        self.assertEqual(message.refund.type, "refund")
+        self.assertEqual(message.refund.amount, Decimal("30"))
+        self.assertEqual(self.balance(self.sender), Decimal("100"))
+        self.assertFalse(InboxMessage.objects.exists())
+
+        # A failed message is neither refunded again nor relayed
+        self.assertFalse(outbox.refund(message))
+        self.assertEqual(outbox.relay(), (0, 0))
+        self.assertEqual(self.balance(self.sender), Decimal("100"))
+
+        for engine in ("python", "auto"):
+            self.assertEqual(reconciliation.reconcile(engine=engine).mismatches, [], engine)
+
+    def test_relay_delivers_pending_messages(self):
+        sent = Transaction.objects.create(
+            account=self.sender, to_account_id=self.receiver_id, user=self.alice, to_user=self.bob,
+            amount=Decimal("12"), type="transfer",
+        )
+
+        # Without running the on-commit delivery, as if the process died right after committing
+        with transaction.atomic(using=sent._state.db):
+            outbox.send(sent, posting.debit(Decimal("12"), pk=self.sender.pk, user=self.alice))
+
+        out = StringIO()
+        call_command("relay_outbox", stdout=out)
+
+        self.assertIn("Delivered 1 outbox messages.", out.getvalue())
+        self.assertEqual(self.balance(self.receiver), Decimal("12"))
+
+
+@skipUnless(len(get_shards()) > 1, "needs LEDGER_SHARDS=2 or more")
+class CrossShardTransferTests(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        users = [User.objects.create_user("user-{}".format(index), password="pw") for index in range(8)]
+        self.alice = users[0]
+        self.bob = next(user for user in users if shard_for_user(user.pk) != shard_for_user(self.alice.pk))
+        self.sender = Account.objects.create(name="alices", user=self.alice, available_amount=Decimal("100"))
+        self.receiver = Account.objects.create(name="bobs", user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def test_transfer_is_delivered_to_the_other_shard(self):
+        response = self.client.post(
+            "/api/account-to-user-transfer/bobs/{}/".format(self.bob.pk),
+            {"account": self.sender.pk, "amount": "25", "type": "transfer"}, format="json",
+        )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        source, destination = self.sender._state.db, self.receiver._state.db
+        self.assertEqual(Account.objects.using(source).get(pk=self.sender.pk).available_amount, Decimal("75"))
+        self.assertEqual(Account.objects.using(destination).get(pk=self.receiver.pk).available_amount, Decimal("25"))
+        self.assertIsNotNone(OutboxMessage.objects.using(source).get().date_delivered)
+        self.assertEqual(InboxMessage.objects.using(destination).get().source, source)
@@ -0,0 +1,148 @@
+# Standard Library Imports
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+# Django Imports
+from django.test import SimpleTestCase
+
+# App Imports
+from ledger.pool import ConnectionPool, PoolTimeout, DEFAULT_DB_POOL
+from ledger import pool
+
+
+class FakeConnection:
+
+    def __init__(self, broken:bool=False):
+        self.broken = broken
+        self.closed = False
+
+    def cursor(self):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+        return mock.Mock()
+
+    def rollback(self):
+        if self.broken:
+            raise ConnectionError("server closed the connection")
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **options) -> ConnectionPool:
+        return ConnectionPool("test", {**DEFAULT_DB_POOL, **options})
+
+    def test_connections_are_reused(self):
+        connections = self.make_pool()
+        raw = connections.acquire(FakeConnection)
+        connections.release(raw)
+
+        self.assertIs(connections.acquire(FakeConnection), raw)
+        self.assertEqual(connections.snapshot()["opened"], 1)
+        self.assertEqual(connections.snapshot()["in_use"], 1)
+
+    def test_checkout_times_out(self):
+        connections = self.make_pool(MAX_SIZE=1, TIMEOUT=0.05)
+        connections.acquire(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            connections.acquire(FakeConnection)
+
+        snapshot = connections.snapshot()
+        self.assertEqual((snapshot["size"], snapshot["timeouts"]), (1, 1))
+
+    def test_waiters_get_released_connections(self):
+        connections = self.make_pool(MAX_SIZE=1, TIMEOUT=5.0)
+        raw = connections.acquire(FakeConnection)
+        acquired = []
+
+        waiter = threading.Thread(target=lambda: acquired.append(connections.acquire(FakeConnection)))
+        waiter.start()
+        time.sleep(0.05)
+        connections.release(raw)
+        waiter.join(5.0)
+
+        self.assertEqual(acquired, [raw])
+        self.assertEqual(connections.snapshot()["waits"], 1)
+
+    def test_expired_connections_are_replaced(self):
+        connections = self.make_pool(MAX_AGE=60.0)
+        old = connections.acquire(FakeConnection)
+        connections.release(old)
+        connections.max_age = 0.0
+
+        new = connections.acquire(FakeConnection)
+
+        self.assertIsNot(new, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(connections.snapshot()["size"], 1)
+
+    def test_failed_health_checks_are_replaced(self):
+        connections = self.make_pool(HEALTH_CHECK_IDLE=0.0)
+        old = connections.acquire(FakeConnection)
+        connections.release(old)
+        old.broken = True
+
+        new = connections.acquire(FakeConnection)
+
+        self.assertIsNot(new, old)
+        self.assertTrue(old.closed)
+        snapshot = connections.snapshot()
+        self.assertEqual((snapshot["health_check_failures"], snapshot["closed"], snapshot["size"]), (1, 1, 1))
+
+    def test_broken_connections_are_not_returned(self):
+        connections = self.make_pool()
+        raw = connections.acquire(FakeConnection)
+        raw.broken = True
+        connections.release(raw)
+
+        self.assertTrue(raw.closed)
+        self.assertEqual(connections.snapshot()["size"], 0)
+
+    def test_failed_connects_free_their_slot(self):
+        connections = self.make_pool(MAX_SIZE=1, TIMEOUT=0.05)
+
+        def refuse():
+            raise ConnectionError("connection refused")
+
+        for _ in range(2):
+            with self.assertRaises(ConnectionError):
+                connections.acquire(refuse)
+
+        self.assertEqual(connections.snapshot()["size"], 0)
+        self.assertIsInstance(connections.acquire(FakeConnection), FakeConnection)
+
+
+class GetPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.wrapper = SimpleNamespace(alias="pool-test", settings_dict={"NAME": "ledger"})
+        self.addCleanup(pool.pools.pop, self.wrapper.alias, None)
+
+    def test_one_pool_per_alias_and_database(self):
+        connections = pool.get_pool(self.wrapper)
+        self.assertIs(pool.get_pool(self.wrapper), connections)
+
+        raw = connections.acquire(FakeConnection)
+        connections.release(raw)
+        self.wrapper.settings_dict = {"NAME": "test_ledger"}
+
+        self.assertIsNot(pool.get_pool(self.wrapper), connections)
+        self.assertTrue(raw.closed)
+
+    def test_forked_processes_start_their_own_pool(self):
+        connections = pool.get_pool(self.wrapper)
+        raw = connections.acquire(FakeConnection)
+        connections.release(raw)
+
+        with mock.patch("ledger.pool.os.getpid", return_value=connections.pid + 1):
+            forked = pool.get_pool(self.wrapper)
+
+        self.assertIsNot(forked, connections)
+        self.assertEqual(forked.pid, connections.pid + 1)
+        # The parent's connection is left open for the parent
+        self.assertFalse(raw.closed)
@@ -0,0 +1,138 @@
+# Standard Library Imports
+from decimal import Decimal
+from unittest import mock
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError
+from django.test import TestCase
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, JournalEntry, Transaction, UserSummary
+from ledger import cache, posting
+from ledger.tests import single_database
+
+
+@single_database
+class PostingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.bob = User.objects.create_user("bob", password="bob")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.savings = Account.objects.create(name="Alice Savings", user=self.alice)
+        self.bobs = Account.objects.create(name="Bob Main", user=self.bob)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def balance(self, account:Account) -> Decimal:
+        account.refresh_from_db()
+        return account.available_amount
+
+    def post(self, path:str, data:dict):
+        return self.client.post(path, data, format="json")
+
+    def test_deposit_and_withdraw(self):
+        response = self.post("/api/deposit/", {"account": self.main.pk, "amount": "100.50", "type": "deposit"})
+        self.assertEqual(response.status_code, 201, response.content)
+
+        response = self.post("/api/withdraw/", {"account": self.main.pk, "amount": "30.25", "type": "withdraw"})
+        self.assertEqual(response.status_code, 201, response.content)
+
+        self.assertEqual(self.balance(self.main), Decimal("70.25"))
+        self.assertEqual(UserSummary.objects.get(user=self.alice).balance, Decimal("70.25"))
+        self.assertEqual(Transaction.objects.filter(account=self.main).count(), 2)
+        self.assertEqual(JournalEntry.objects.filter(account=self.main).count(), 2)
+
+    def test_wrong_type_and_foreign_account_are_rejected(self):
+        response = self.post("/api/deposit/", {"account": self.main.pk, "amount": "10", "type": "withdraw"})
+        self.assertEqual(response.status_code, 400, response.content)
+
+        response = self.post("/api/deposit/", {"account": self.bobs.pk, "amount": "10", "type": "deposit"})
+        self.assertEqual(response.status_code, 400, response.content)
+
+        self.assertEqual(self.balance(self.bobs), Decimal("0"))
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_account_to_account_transfer(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "50", "type": "deposit"})
+
+        response = self.post(
+            "/api/account-to-account-transfer/",
+            {"account": self.main.pk, "to_account": self.savings.pk, "amount": "20", "type": "transfer"},
+        )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.balance(self.main), Decimal("30"))
+        self.assertEqual(self.balance(self.savings), Decimal("20"))
+        self.assertEqual(UserSummary.objects.get(user=self.alice).balance, Decimal("50"))
+
+    def test_account_to_user_transfer(self):
+        self.post("/api/deposit/", {"account": self.main.pk, "amount": "50", "type": "deposit"})
+
+        response = self.post(
+            "/api/account-to-user-transfer/{}/{}/".format(self.bobs.name, self.bob.pk),
+            {"account": self.main.pk, "amount": "15", "type": "transfer"},
+        )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(self.balance(self.main), Decimal("35"))
+        self.assertEqual(self.balance(self.bobs), Decimal("15"))
+        self.assertEqual(UserSummary.objects.get(user=self.bob).balance, Decimal("15"))
+
+        response = self.client.get("/api/user-balance/")
+        self.assertIn("35", response.json()["message"])
+
+
+@single_database
+class TransferLockingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.savings = Account.objects.create(name="Alice Savings", user=self.alice)
+
+    def transfer(self):
+        return posting.transfer(
+            posting.debit(Decimal("5"), pk=self.main.pk), posting.credit(Decimal("5"), pk=self.savings.pk),
+            NOWAIT=True, BACKOFF=0,
+        )
+
+    def test_lock_failures_are_retried(self):
+        failures = [posting.LockNotAvailable(), OperationalError("database is locked")]
+
+        def lock_accounts(pks, **kwargs):
+            if failures:
+                raise failures.pop(0)
+
+        with mock.patch.object(posting, "lock_accounts", side_effect=lock_accounts) as lock:
+            self.assertEqual(self.transfer(), 2)
+
+        self.assertEqual(lock.call_count, 3)
+        self.savings.refresh_from_db()
+        self.assertEqual(self.savings.available_amount, Decimal("5"))
+
+    def test_other_errors_are_raised_at_once(self):
+        for error in (IntegrityError("constraint failed"), OperationalError("no such table: accounts")):
+            with mock.patch.object(posting, "lock_accounts", side_effect=error) as lock:
+                with self.assertRaises(type(error)):
+                    self.transfer()
+
+            self.assertEqual(lock.call_count, 1)
+
+    def test_postgresql_lock_not_available(self):
+        def driver_error(pgcode:str) -> OperationalError:
+            cause = Exception()
+            cause.pgcode = pgcode
+            error = OperationalError()
+            error.__cause__ = cause
+            return error
+
+        with mock.patch.object(posting.connections["default"], "vendor", "postgresql"):
+            self.assertTrue(posting.is_lock_failure(driver_error(posting.LOCK_NOT_AVAILABLE)))
+            self.assertFalse(posting.is_lock_failure(driver_error("57014")))
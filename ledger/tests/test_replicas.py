@@ -0,0 +1,81 @@
+# Standard Library Imports
+import asyncio
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account
+from ledger import cache, replicas
+from ledger.tests import single_database
+
+
+# The primary stands in for its own replica, so reads routed to it see every posting
+REPLICAS = {"DATABASES": {"default": ["default"]}}
+
+
+@single_database
+@override_settings(LEDGER_REPLICAS=REPLICAS)
+class ReplicaPinningTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        replicas.pins.clear()
+        replicas.stats.reset()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.client = APIClient()
+        self.client.force_authenticate(self.alice)
+
+    def deposit(self, account:int):
+        return self.client.post(
+            "/api/deposit/", {"account": account, "amount": "5", "type": "deposit"}, format="json"
+        )
+
+    def test_posting_pins_the_user(self):
+        self.assertEqual(replicas.read_db("default", self.alice.pk), "default")
+        self.assertEqual(replicas.stats.snapshot()["replica_reads"], 1)
+
+        self.assertEqual(self.deposit(self.main.pk).status_code, 201)
+        self.assertTrue(replicas.is_pinned(self.alice.pk))
+
+        replicas.read_db("default", self.alice.pk)
+        self.assertEqual(replicas.stats.snapshot()["pinned_reads"], 1)
+
+    def test_reads_and_failures_do_not_pin(self):
+        self.assertEqual(self.client.get("/api/user-balance/").status_code, 202)
+        self.assertEqual(self.deposit(self.main.pk + 100).status_code, 400)
+
+        self.assertFalse(replicas.is_pinned(self.alice.pk))
+        self.assertEqual(replicas.stats.snapshot()["pins"], 0)
+
+    @override_settings(LEDGER_REPLICAS={"DATABASES": {}})
+    def test_nothing_is_pinned_without_replicas(self):
+        self.assertEqual(self.deposit(self.main.pk).status_code, 201)
+        self.assertFalse(replicas.is_pinned(self.alice.pk))
+
+
+@single_database
+@override_settings(LEDGER_REPLICAS=REPLICAS)
+class AsyncReplicaPinningTests(TransactionTestCase):
+
+    def setUp(self):
+        cache.clear()
+        replicas.pins.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+
+    def test_async_posting_pins_the_user(self):
+        client = AsyncClient()
+        client.force_login(self.alice)
+
+        response = asyncio.run(client.post(
+            "/api/async/deposit/", {"account": self.main.pk, "amount": "5", "type": "deposit"},
+            content_type="application/json",
+        ))
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertTrue(replicas.is_pinned(self.alice.pk))
@@ -0,0 +1,104 @@
+# Standard Library Imports
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, DailyRollup, JournalEntry
+from ledger import cache, posting, rollups
+from ledger.tests import single_database
+
+
+@single_database
+class RollupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", password="alice")
+        self.account = Account.objects.create(name="main", user=self.user)
+
+    def post_on(self, day:date, *amounts:str) -> None:
+        """
+        > It posts the amounts to the account and dates their journal entries `day`, at noon UTC
+        """
+        newest = JournalEntry.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+        for amount in amounts:
+            amount = Decimal(amount)
+            leg = posting.credit(amount, pk=self.account.pk) if amount > 0 else posting.debit(-amount, pk=self.account.pk)
+            posting.post(leg)
+
+        JournalEntry.objects.filter(id__gt=newest).update(
+            date_created=datetime.combine(day, datetime.min.time(), tzinfo=dt_timezone.utc) + timedelta(hours=12)
+        )
+
+    def test_statement_from_rollups_and_tail(self):
+        self.post_on(date(2026, 8, 31), "100")
+        self.post_on(date(2026, 9, 2), "10", "-4")
+        self.post_on(date(2026, 9, 5), "20")
+        rollups.refresh(chunk_size=2)
+        self.assertEqual(DailyRollup.objects.count(), 3)
+
+        # Not refreshed yet, read from the journal's tail
+        self.post_on(date(2026, 9, 5), "-6")
+
+        statement = rollups.statement(self.account.pk, date(2026, 9, 1), date(2026, 9, 30))
+
+        self.assertEqual(statement["opening_balance"], Decimal("100"))
+        self.assertEqual(statement["closing_balance"], Decimal("120"))
+        self.assertEqual((statement["credits"], statement["debits"], statement["entries"]), (Decimal("30"), Decimal("10"), 4))
+        self.assertEqual(
+            [(row["day"], row["credits"], row["debits"], row["entries"]) for row in statement["days"]],
+            [(date(2026, 9, 2), Decimal("10"), Decimal("4"), 2), (date(2026, 9, 5), Decimal("20"), Decimal("6"), 2)],
+        )
+
+    def test_late_entries_are_carried_into_later_days(self):
+        self.post_on(date(2026, 9, 1), "50")
+        self.post_on(date(2026, 9, 3), "5")
+        rollups.refresh()
+
+        self.post_on(date(2026, 9, 2), "-20")
+        rollups.refresh()
+
+        days = list(DailyRollup.objects.filter(account=self.account).order_by("day").values_list("day", "opening_balance", "closing_balance"))
+        self.assertEqual(days, [
+            (date(2026, 9, 1), Decimal("0"), Decimal("50")),
+            (date(2026, 9, 2), Decimal("50"), Decimal("30")),
+            (date(2026, 9, 3), Decimal("30"), Decimal("35")),
+        ])
+        self.assertEqual(rollups.refresh(), 0)
+
+    def test_statement_endpoint(self):
+        self.post_on(date(2026, 9, 2), "10")
+        rollups.refresh()
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.get("/api/accounts/main/statement/?from=2026-09-01&to=2026-09-30")
+
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Decimal(response.json()["data"]["closing_balance"]), Decimal("10"))
+        self.assertEqual(client.get("/api/accounts/main/statement/?from=2026-09-31").status_code, 400)
+        self.assertEqual(client.get("/api/accounts/missing/statement/").status_code, 400)
+
+    @override_settings(LEDGER_JOURNAL={"SETTLE_SECONDS": 60})
+    def test_unsettled_entries_wait_for_the_next_run(self):
+        posting.post(posting.credit(Decimal("7"), pk=self.account.pk))
+
+        self.assertEqual(rollups.refresh(), 0)
+
+        # Still read from the tail meanwhile
+        today = timezone.now().date()
+        self.assertEqual(rollups.statement(self.account.pk, today, today)["closing_balance"], Decimal("7"))
+
+        JournalEntry.objects.update(date_created=timezone.now() - timedelta(seconds=61))
+
+        self.assertEqual(rollups.refresh(), 1)
+        self.assertEqual(DailyRollup.objects.get(account=self.account).closing_balance, Decimal("7"))
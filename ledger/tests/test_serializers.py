@@ -0,0 +1,89 @@
+# Standard Library Imports
+import json
+
+# Django Imports
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+# Rest Framework Imports
+from rest_framework.test import APIClient
+
+# App Imports
+from ledger.models import Account, Transaction
+from ledger.serializers import AccountSerializer, DepositWithdrawTransactionSerializer, \
+    TransferUserTransactionSerializer, TransferTransactionSerializer, TransactionHistorySerializer, \
+        FastAccountSerializer, FastDepositWithdrawSerializer, FastTransferUserSerializer, FastTransferSerializer, \
+            FastTransactionHistorySerializer
+from ledger import cache
+from ledger.tests import single_database
+
+
+@single_database
+class CompiledSerializerTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user("alice", password="alice")
+        self.main = Account.objects.create(name="Alice Main", user=self.alice)
+        self.savings = Account.objects.create(name="Alice Savings", user=self.alice)
+
+    def test_posting_serializers_match_drf(self):
+        inputs = [
+            {"account": self.main.pk, "amount": "1.5", "type": "deposit"},
+            {"account": self.main.pk, "amount": 1.25, "type": "withdraw"},
+            {"account": self.main.pk, "to_account": self.savings.pk, "amount": "3", "type": "transfer"},
+            {"account": self.main.pk + 100, "amount": "1", "type": "deposit"},
+            {"account": "abc", "amount": "x", "type": "nope"},
+            {"amount": "1.234", "type": "deposit"},
+            {"account": None, "amount": "12345678901234567890", "type": "deposit"},
+            {"account": self.main.pk},
+            {},
+            [],
+            "text",
+        ]
+        pairs = (
+            (DepositWithdrawTransactionSerializer, FastDepositWithdrawSerializer),
+            (TransferUserTransactionSerializer, FastTransferUserSerializer),
+            (TransferTransactionSerializer, FastTransferSerializer),
+        )
+
+        for drf, compiled in pairs:
+            for data in inputs:
+                expected, actual = drf(data=data), compiled(data=data)
+
+                self.assertEqual(expected.is_valid(), actual.is_valid(), (compiled, data))
+                self.assertEqual(json.loads(json.dumps(expected.errors)), actual.errors, (compiled, data))
+
+                if actual.errors:
+                    continue
+
+                self.assertEqual(dict(expected.validated_data), actual.validated_data)
+                expected.save(user=self.alice)
+                actual.save(user=self.alice)
+                self.assertEqual(dict(expected.data), actual.data)
+
+    def test_read_serializers_match_drf(self):
+        Transaction.objects.create(account=self.main, to_account=self.savings, user=self.alice, amount=5, type="transfer")
+        history = list(Transaction.objects.select_related("account", "to_account", "user", "to_user"))
+
+        self.assertEqual(dict(AccountSerializer(self.main).data), FastAccountSerializer(self.main).data)
+        self.assertEqual(
+            [dict(item) for item in TransactionHistorySerializer(history, many=True).data],
+            FastTransactionHistorySerializer(history, many=True).data,
+        )
+
+    def test_postings_without_an_account_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        requests = (
+            ("/api/deposit/", {"amount": "5", "type": "deposit"}),
+            ("/api/withdraw/", {"account": None, "amount": "5", "type": "withdraw"}),
+            ("/api/account-to-account-transfer/", {"account": self.main.pk, "amount": "5", "type": "transfer"}),
+            ("/api/account-to-user-transfer/{}/{}/".format(self.savings.name, self.alice.pk), {"amount": "5", "type": "transfer"}),
+        )
+
+        for path, data in requests:
+            response = client.post(path, data, format="json")
+            self.assertEqual(response.status_code, 400, (path, response.content))
+
+        self.assertFalse(Transaction.objects.exists())
@@ -2,9 +2,10 @@
 from django.urls import path
 
 # App Imports
+from ledger import async_views
 from ledger.views import LedgerAPI, Deposit, Withdraw, CreateUserAccount, \
     AccountToAccountTransfer, AccountToUserTransfer,\
-    GetUserBalance, GetAccountBalance
+    GetUserBalance, GetAccountBalance, BatchPosting, AccountTransactions, AccountStatement
 
 
 app_name = "ledger"
@@ -16,7 +17,18 @@ urlpatterns = [
     path("withdraw/", Withdraw.as_view(), name="withdraw"),
     path("account-to-user-transfer/<str:user_account>/<int:to_user>/", AccountToUserTransfer.as_view(), name="account-to-user-transfer"),
     path("account-to-account-transfer/", AccountToAccountTransfer.as_view(), name="account-to-user-transfer"),
+    path("batch/", BatchPosting.as_view(), name="batch"),
     path("create-user-account/", CreateUserAccount.as_view(), name="create-account"),
     path("user-balance/", GetUserBalance.as_view(), name="user-balance"),
     path("account-balance/<str:name>/", GetAccountBalance.as_view(), name="account-balance"),
+    path("accounts/<str:name>/transactions/", AccountTransactions.as_view(), name="account-transactions"),
+    path("accounts/<str:name>/statement/", AccountStatement.as_view(), name="account-statement"),
+    
+    # ASGI-native handlers, see ledger.async_views
+    path("async/deposit/", async_views.deposit, name="async-deposit"),
+    path("async/withdraw/", async_views.withdraw, name="async-withdraw"),
+    path("async/account-to-user-transfer/<str:user_account>/<int:to_user>/", async_views.account_to_user_transfer, name="async-account-to-user-transfer"),
+    path("async/account-to-account-transfer/", async_views.account_to_account_transfer, name="async-account-to-account-transfer"),
+    path("async/user-balance/", async_views.get_user_balance, name="async-user-balance"),
+    path("async/account-balance/<str:name>/", async_views.get_account_balance, name="async-account-balance"),
 ]
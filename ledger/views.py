@@ -1,23 +1,47 @@
 # Django Imports
+import functools
+import hashlib
 import json
 from typing import final
-from django.db.models import Sum
+from django.db import DEFAULT_DB_ALIAS
 from django.contrib.auth.models import User
-from django.http import HttpRequest
+from django.forms import ValidationError
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_date, parse_datetime
 
 # Rest Framework Imports
 from rest_framework import views, response, status
+from rest_framework.parsers import JSONParser
 
 # App Imports
-from ledger.serializers import AccountSerializer, TransferUserTransactionSerializer, UserSerializer, \
-    TransferTransactionSerializer, \
-        DepositWithdrawTransactionSerializer
-from ledger.models import Account
+from ledger.serializers import AccountSerializer, UserSerializer, BatchOperationSerializer, \
+    FastAccountSerializer, FastDepositWithdrawSerializer, FastTransferSerializer, FastTransferUserSerializer, \
+        FastTransactionHistorySerializer, AccountStatementSerializer
+from ledger.models import Account, UserSummary
+from ledger.admission import admitted
+from ledger.idempotency import idempotent
+from ledger.parsers import NDJSONParser
+from ledger.sharding import shard_for_id, shard_for_user
+from ledger import batch, cache, group_commit, history, hot, idempotency, journal, metrics, outbox, posting, replicas, rollups
 
 # Third Part Imports
 from rest_api_payload import success_response, error_response
 
 
+def balance_etag(user_id:int, balance) -> str:
+    return '"{}"'.format(hashlib.sha1("{}:{!r}".format(user_id, balance).encode()).hexdigest())
+
+
+def prometheus_metrics(request:HttpRequest) -> HttpResponse:
+    """
+    > It serves the sampled request histograms and the ledger's counters in the Prometheus text
+    format, for a scraper to poll
+    """
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 class LedgerAPI(views.APIView):
     
     PROTOCOL = "http://"
@@ -36,17 +60,41 @@ class LedgerAPI(views.APIView):
                 "withdraw": BASE_URL + "api/withdraw/",
                 "account-user": BASE_URL + "api/account-to-user-transfer/<str:user_account/<int:to_user>/",
                 "account-account": BASE_URL + "api/account-to-account-transfer/",
+                "batch": BASE_URL + "api/batch/",
                 "create-user-account": BASE_URL +"api/create-user-account/",
                 "user-balance": BASE_URL + "api/user-balance/",
                 "account-balance": BASE_URL + "api/account-balance/<str:name>/",
+                "account-transactions": BASE_URL + "api/accounts/<str:name>/transactions/",
+                "account-statement": BASE_URL + "api/accounts/<str:name>/statement/?from=<date>&to=<date>",
+                "async-deposit": BASE_URL + "api/async/deposit/",
+                "async-withdraw": BASE_URL + "api/async/withdraw/",
+                "async-account-user": BASE_URL + "api/async/account-to-user-transfer/<str:user_account/<int:to_user>/",
+                "async-account-account": BASE_URL + "api/async/account-to-account-transfer/",
+                "async-user-balance": BASE_URL + "api/async/user-balance/",
+                "async-account-balance": BASE_URL + "api/async/account-balance/<str:name>/",
             },
         }
         return response.Response(data=welcome_data, status=status.HTTP_200_OK)
 
 
-class Deposit(views.APIView):
-    serializer_class = DepositWithdrawTransactionSerializer
+class AccountAPIView(views.APIView):
+    """
+    Base view for the endpoints that look up one of the user's accounts
+    """
+    
+    def account_does_not_exist(self) -> response.Response:
+        payload = error_response(
+            status="error",
+            message="Opps. Account does not exist!"
+        )
+        return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+
+
+class Deposit(AccountAPIView):
+    serializer_class = FastDepositWithdrawSerializer
     
+    @admitted
+    @idempotent
     def post(self, request:HttpRequest) -> response.Response:
         """
         > The function checks if the transaction type is deposit, 
@@ -67,13 +115,21 @@ class Deposit(views.APIView):
                 account_name = serializer.validated_data.get("account")
                 amount = serializer.validated_data.get("amount")
                 
-                # Get user account and update available amount
-                user_account = Account.objects.get(name=account_name, user=request.user)
-                user_account.available_amount += amount
-                user_account.save()
+                shard = shard_for_user(request.user.pk)
                 
-                # Save serialized data
-                serializer.save(user=request.user)
+                def write():
+                    idempotency.claim(request, using=shard)
+                    
+                    # Save serialized data first, so the journal entries can point at it
+                    deposit = serializer.save(user=request.user)
+                    
+                    # Add amount to the user account's available amount in a single UPDATE
+                    posting.post(posting.credit(amount, pk=account_name.pk, user=request.user), source=deposit)
+                
+                try:
+                    group_commit.run(shard, write)
+                except Account.DoesNotExist:
+                    return self.account_does_not_exist()
                 
                 payload = success_response(
                     status="success",
@@ -99,9 +155,11 @@ class Deposit(views.APIView):
             return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
         
         
-class Withdraw(views.APIView):
-    serializer_class = DepositWithdrawTransactionSerializer
+class Withdraw(AccountAPIView):
+    serializer_class = FastDepositWithdrawSerializer
     
+    @admitted
+    @idempotent
     def post(self, request:HttpRequest) -> response.Response:
         """
         > It validates the data sent in the request, checks if the transaction type is `withdraw`, 
@@ -122,13 +180,21 @@ class Withdraw(views.APIView):
                 account_name = serializer.validated_data.get("account")
                 amount = serializer.validated_data.get("amount")
                 
-                # Get user account and subtract amount from available amount
-                user_account = Account.objects.get(name=account_name, user=request.user)
-                user_account.available_amount -= amount
-                user_account.save()
+                shard = shard_for_user(request.user.pk)
                 
-                # Save serialized data
-                serializer.save(user=request.user)
+                def write():
+                    idempotency.claim(request, using=shard)
+                    
+                    # Save serialized data first, so the journal entries can point at it
+                    withdrawal = serializer.save(user=request.user)
+                    
+                    # Subtract amount from the user account's available amount in a single UPDATE
+                    posting.post(posting.debit(amount, pk=account_name.pk, user=request.user), source=withdrawal)
+                
+                try:
+                    group_commit.run(shard, write)
+                except Account.DoesNotExist:
+                    return self.account_does_not_exist()
                 
                 payload = success_response(
                     status="success",
@@ -154,13 +220,15 @@ class Withdraw(views.APIView):
             return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
     
     
-class AccountToUserTransfer(views.APIView):
-    serializer_class = TransferUserTransactionSerializer
+class AccountToUserTransfer(AccountAPIView):
+    serializer_class = FastTransferUserSerializer
     
-    def get_user_account(self, user_account:str):
+    def get_user_account(self, user_account:str, reader_id:int=None):
         
         try:
-            user_account = Account.objects.get(name=user_account)   
+            user_account = cache.get_account(
+                name=user_account, read_db=functools.partial(replicas.read_db, user_id=reader_id)
+            )
             return user_account
         except Exception:
             payload = error_response(
@@ -170,16 +238,18 @@ class AccountToUserTransfer(views.APIView):
             return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
     
     def get(self, request, to_user:int, user_account:str):
-        user_account =  self.get_user_account(user_account=user_account)
-        serializer = AccountSerializer(user_account)
+        user_account =  self.get_user_account(user_account=user_account, reader_id=request.user.pk)
+        serializer = FastAccountSerializer(user_account)
         
         payload = success_response(
             status="success", message="This account belongs to {}!"\
-                .format(User.objects.get(id=to_user)),
+                .format(User.objects.using(replicas.read_db(DEFAULT_DB_ALIAS, request.user.pk)).get(id=to_user)),
             data=serializer.data
         )
         return response.Response(data=payload)
     
+    @admitted
+    @idempotent
     def post(self, request:HttpRequest, to_user:int, user_account:str) -> response.Response:
         serializer = self.serializer_class(data=request.data)
         
@@ -191,29 +261,43 @@ class AccountToUserTransfer(views.APIView):
                 from_account_name = serializer.validated_data.get("account")
                 from_account_user = request.user
                 
-                # Get send (logged in) data 
-                to_account_name = user_account
-                to_account_user = User.objects.get(id=to_user)
-                
                 # Get amount
                 amount = serializer.validated_data.get("amount")
                 
-                # Get send account, deduct amount from available amomut and save to database
-                sender_account = Account.objects.get(name=from_account_name, user=from_account_user)
-                sender_account.available_amount -= amount
-                sender_account.save()
-                
-                # Get receiver account, add amount to available amount and save to database
-                receiver_account = Account.objects.get(name=to_account_name, user=to_account_user)
-                receiver_account.available_amount += amount
-                receiver_account.save()
-                
-                # Save serialized data
-                serializer.save(
-                    user=request.user,
-                    to_user=to_account_user,
-                    to_account=Account.objects.get(name=user_account)
-                )
+                try:
+                    # Get send (logged in) data 
+                    to_account_name = user_account
+                    to_account_user = User.objects.get(id=to_user)
+                    receiver_account = cache.get_account(name=to_account_name, user_id=to_account_user.pk)
+                    
+                    sender_shard = shard_for_user(request.user.pk)
+                    
+                    def write():
+                        idempotency.claim(request, using=sender_shard)
+                        
+                        # Save serialized data first, so the journal entries can point at it
+                        transfer = serializer.save(
+                            user=request.user,
+                            to_user=to_account_user,
+                            to_account=receiver_account
+                        )
+                        
+                        if shard_for_id(receiver_account.pk) == sender_shard:
+                            # Deduct amount from the sender account and add it to the receiver account,
+                            # locking both accounts in primary key order
+                            posting.transfer(
+                                posting.debit(amount, pk=from_account_name.pk, user=from_account_user),
+                                posting.credit(amount, pk=receiver_account.pk, user_id=receiver_account.user_id),
+                                source=transfer,
+                            )
+                        else:
+                            # The receiver is on another shard: deduct amount here and leave the
+                            # credit to the outbox, which delivers it once this transaction commits
+                            outbox.send(transfer, posting.debit(amount, pk=from_account_name.pk, user=from_account_user))
+                    
+                    group_commit.run(sender_shard, write)
+                except (User.DoesNotExist, Account.DoesNotExist):
+                    return self.account_does_not_exist()
                 
                 payload = success_response(
                     status="success",
@@ -240,9 +324,11 @@ class AccountToUserTransfer(views.APIView):
             return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
     
 
-class AccountToAccountTransfer(views.APIView):
-    serializer_class = TransferTransactionSerializer
+class AccountToAccountTransfer(AccountAPIView):
+    serializer_class = FastTransferSerializer
     
+    @admitted
+    @idempotent
     def post(self, request:HttpRequest) -> response.Response:
         serializer = self.serializer_class(data=request.data)
         
@@ -255,18 +341,26 @@ class AccountToAccountTransfer(views.APIView):
                 to_account_name = serializer.validated_data.get("to_account")
                 amount = serializer.validated_data.get("amount")
                 
-                # Get account to send money from
-                sender_account = Account.objects.get(name=from_account_name, user=request.user)
-                sender_account.available_amount -= amount
-                sender_account.save()
+                shard = shard_for_user(request.user.pk)
                 
-                # Get account to receive money 
-                receiver_account = Account.objects.get(name=to_account_name, user=request.user)
-                receiver_account.available_amount += amount
-                receiver_account.save()
+                def write():
+                    idempotency.claim(request, using=shard)
+                    
+                    # Save serialized data first, so the journal entries can point at it
+                    transfer = serializer.save(user=request.user, to_user=request.user)
+                    
+                    # Move amount from the account to send money from to the account to receive money,
+                    # locking both accounts in primary key order
+                    posting.transfer(
+                        posting.debit(amount, pk=from_account_name.pk, user=request.user),
+                        posting.credit(amount, pk=to_account_name.pk, user=request.user),
+                        source=transfer,
+                    )
                 
-                # Save serialized data
-                serializer.save(user=request.user, to_user=request.user)
+                try:
+                    group_commit.run(shard, write)
+                except Account.DoesNotExist:
+                    return self.account_does_not_exist()
                 
                 payload = success_response(
                     status="success",
@@ -293,35 +387,92 @@ class AccountToAccountTransfer(views.APIView):
             return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
     
     
+class BatchPosting(AccountAPIView):
+    serializer_class = BatchOperationSerializer
+    parser_classes = (JSONParser, NDJSONParser)
+    
+    @admitted
+    @idempotent
+    def post(self, request:HttpRequest) -> response.Response:
+        """
+        > It validates a JSON list (or NDJSON stream) of deposits, withdrawals and transfers and
+        posts them in chunks, returning one result per operation
+        
+        :param request: This is the request object that is passed to the view
+        :type request: HttpRequest
+        :return: A response object
+        """
+        serializer = self.serializer_class(data=request.data, many=True)
+        
+        if serializer.is_valid():
+            
+            # Chunks commit one by one, so the key is claimed before the first; a retry after a
+            # failure part way through gets 409 instead of posting the committed chunks again
+            idempotency.claim(request, using=shard_for_user(request.user.pk))
+            results = batch.post_batch(request.user, serializer.validated_data)
+            posted = sum(result["status"] == "success" for result in results)
+            
+            payload = success_response(
+                status="success",
+                message="{} of {} operations have been posted!".format(posted, len(results)),
+                data={"results": results}
+            )
+            return response.Response(
+                data=payload,
+                status=status.HTTP_201_CREATED if posted == len(results) else status.HTTP_207_MULTI_STATUS
+            )
+        
+        payload = error_response(
+            status="error",
+            message=serializer.errors
+        )
+        return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+    
+    
 class GetUserBalance(views.APIView):
     
     def get(self, request:HttpRequest) -> response.Response:
         """
-        It gets the sum of all the available amounts of all the accounts of the user making the request
+        It reads the total of all the available amounts of all the accounts of the user making the
+        request from their `UserSummary`, plus the slots of their hot accounts, answering `If-None-Match` with 304 while it is unchanged.
+        The read goes to a replica unless the user posted within the last `STICKY_SECONDS`
         
         :param request: This is the request object that is passed to the view
         :type request: HttpRequest
         :return: A response object
         """
         
-        user_accounts = Account.objects.filter(user=request.user).aggregate(Sum("available_amount"))
+        using = replicas.read_db(shard_for_user(request.user.pk), request.user.pk)
+        balance = UserSummary.objects.using(using).filter(user=request.user)\
+            .values_list("balance", flat=True).first()
+        
+        if balance is not None:
+            balance += hot.user_slot_balance(request.user.pk, using=using)
+        etag = balance_etag(request.user.pk, balance)
+        
+        not_modified = get_conditional_response(request, etag=etag)
+        
+        if not_modified is not None:
+            not_modified["ETag"] = etag
+            return not_modified
         
         payload = success_response(
             status="success",
             message="Your total balance is ₦{}"\
-                .format(user_accounts["available_amount__sum"]),
+                .format(balance),
             data={}
         )
-        return response.Response(data=payload, status=status.HTTP_202_ACCEPTED)
+        return response.Response(data=payload, status=status.HTTP_202_ACCEPTED, headers={"ETag": etag})
     
 
 class GetAccountBalance(views.APIView):
-    serializer_class = AccountSerializer
+    serializer_class = FastAccountSerializer
     
     def get(self, request:HttpRequest, name:str) -> response.Response:
         """
         > It gets the account of the user with the name `name` and returns a response with the
-        serialized account data
+        serialized account data. With `?as_of=<ISO 8601 datetime>` the balance is the one the
+        journal had at that time
         
         :param request: This is the request object that is passed to the view
         :type request: HttpRequest
@@ -329,18 +480,146 @@ class GetAccountBalance(views.APIView):
         :type name: str
         :return: A response object.
         """
-        account = Account.objects.get(name=name, user=request.user)
+        using = replicas.read_db(shard_for_user(request.user.pk), request.user.pk)
+        account = Account.objects.using(using).get(name=name, user=request.user)
+        account.available_amount = hot.account_balance(account, using=using)
         serializer = self.serializer_class(account)
+        balance = account.available_amount
+        
+        if request.query_params.get("as_of"):
+            try:
+                as_of = parse_datetime(request.query_params["as_of"])
+            except ValueError:
+                as_of = None
+            
+            if as_of is None:
+                payload = error_response(
+                    status="error",
+                    message="Invalid as_of date!"
+                )
+                return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+            
+            if timezone.is_naive(as_of):
+                as_of = timezone.make_aware(as_of)
+            
+            balance = journal.balance_as_of(account.pk, when=as_of, using=using)
         
         payload = success_response(
             status="success",
             message="You have ₦{} in your wallet."\
-                .format(account.available_amount),
+                .format(balance),
             data=serializer.data
         )
         return response.Response(data=payload, status=status.HTTP_202_ACCEPTED)
     
     
+class AccountTransactions(AccountAPIView):
+    serializer_class = FastTransactionHistorySerializer
+    
+    EXPORTS = {
+        "ndjson": (history.export_ndjson, "application/x-ndjson"),
+        "csv": (history.export_csv, "text/csv"),
+    }
+    
+    def get(self, request:HttpRequest, name:str) -> response.Response:
+        """
+        > It returns a page of the transactions sent or received by one of the user's accounts,
+        newest first. `?cursor=` takes the `next_cursor` of the previous page and `?page_size=`
+        caps at `history.MAX_PAGE_SIZE`; `?export=ndjson` or `?export=csv` instead streams the
+        whole history, oldest first
+        
+        :param request: This is the request object that is passed to the view
+        :type request: HttpRequest
+        :param name: The name of the account
+        :type name: str
+        :return: A response object
+        """
+        try:
+            account = cache.get_account(name=name, user_id=request.user.pk)
+        except Account.DoesNotExist:
+            return self.account_does_not_exist()
+        
+        export = request.query_params.get("export")
+        using = replicas.read_db(shard_for_id(account.pk), request.user.pk)
+        
+        if export in self.EXPORTS:
+            render, content_type = self.EXPORTS[export]
+            streaming_response = StreamingHttpResponse(
+                render(history.export_rows(account.pk, using=using)), content_type=content_type
+            )
+            streaming_response["Content-Disposition"] = 'attachment; filename="{}-transactions.{}"'.format(name, export)
+            return streaming_response
+        
+        try:
+            page_size = min(int(request.query_params.get("page_size", history.DEFAULT_PAGE_SIZE)), history.MAX_PAGE_SIZE)
+            transactions, next_cursor = history.page(
+                account.pk, cursor=request.query_params.get("cursor"), page_size=max(page_size, 1), using=using
+            )
+        except ValueError:
+            payload = error_response(
+                status="error",
+                message="Invalid cursor or page size!"
+            )
+            return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+        
+        payload = success_response(
+            status="success",
+            message="{} transactions of {} account.".format(len(transactions), name),
+            data={
+                "results": self.serializer_class(transactions, many=True).data,
+                "next_cursor": next_cursor,
+            }
+        )
+        return response.Response(data=payload, status=status.HTTP_200_OK)
+    
+    
+class AccountStatement(AccountAPIView):
+    serializer_class = AccountStatementSerializer
+    
+    def get(self, request:HttpRequest, name:str) -> response.Response:
+        """
+        > It returns the statement of one of the user's accounts for the days `?from=` to `?to=`
+        (YYYY-MM-DD, both included, this month so far by default): the opening and closing
+        balances, the totals of the range and one row per day with postings, read from the daily
+        rollups instead of the transactions
+        
+        :param request: This is the request object that is passed to the view
+        :type request: HttpRequest
+        :param name: The name of the account
+        :type name: str
+        :return: A response object
+        """
+        try:
+            account = cache.get_account(name=name, user_id=request.user.pk)
+        except Account.DoesNotExist:
+            return self.account_does_not_exist()
+        
+        today = timezone.localdate()
+        
+        try:
+            end = parse_date(request.query_params.get("to") or today.isoformat())
+            start = parse_date(request.query_params.get("from") or end.replace(day=1).isoformat())
+        except (AttributeError, ValueError):
+            start = end = None
+        
+        if start is None or end is None or start > end:
+            payload = error_response(
+                status="error",
+                message="Invalid from or to date!"
+            )
+            return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
+        
+        using = replicas.read_db(shard_for_id(account.pk), request.user.pk)
+        statement = rollups.statement(account.pk, start, end, using=using)
+        
+        payload = success_response(
+            status="success",
+            message="Statement of {} account from {} to {}.".format(name, start, end),
+            data=self.serializer_class({"account": name, "start": start, "end": end, **statement}).data
+        )
+        return response.Response(data=payload, status=status.HTTP_200_OK)
+    
+    
 class CreateUser(views.APIView):
     serializer_class = UserSerializer
     
@@ -370,7 +649,12 @@ class CreateUserAccount(views.APIView):
         serializer = self.serializer_class(data=request.data)
         
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            
+            try:
+                serializer.save(user=request.user)
+            except ValidationError as error:
+                payload = error_response(status="error", message=error.message)
+                return response.Response(data=payload, status=status.HTTP_400_BAD_REQUEST)
             
             payload = success_response(
                 status="success",